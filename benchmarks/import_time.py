@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+# This benchmark measures the time it takes to import sisl, and
+# to access the lazily imported sub-packages.
+# Each import is done in a fresh interpreter.
+
+# This benchmark may be called using:
+#
+#  python $0 [N]
+#
+# where N is the number of repetitions (the minimum time is reported).
+# A detailed break-down of the import may be obtained using:
+#
+#  python -X importtime -c "import sisl"
+#
+
+import sys
+import subprocess
+
+if len(sys.argv) > 1:
+    N = int(sys.argv[1])
+else:
+    N = 10
+print(f"N = {N}")
+
+stmts = {
+    "import sisl": "",
+    "sisl.Hamiltonian": "sisl.Hamiltonian",
+    "sisl.get_sile": "sisl.get_sile",
+    "sisl.geom": "sisl.geom.graphene",
+    "from sisl import *": "exec('from sisl import *')",
+}
+
+code = """
+import time
+t0 = time.perf_counter()
+import sisl
+{stmt}
+print(time.perf_counter() - t0)
+"""
+
+for name, stmt in stmts.items():
+    times = []
+    for _ in range(N):
+        out = subprocess.run([sys.executable, "-c", code.format(stmt=stmt)],
+                             check=True, capture_output=True, text=True)
+        times.append(float(out.stdout.split()[-1]))
+    print(f"{name:>20s}: {min(times) * 1000:8.1f} ms")
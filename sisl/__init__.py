@@ -28,6 +28,7 @@ Generic classes
    Atom
    Atoms
    Geometry
+   Trajectory
    SuperCell
    Grid
 
@@ -90,15 +91,9 @@ from . import constant
 # To make it easier to type ;)
 C = constant
 
-# Specific linear algebra
-from . import linalg
-
 # Utilities
 from . import utils
 
-# Mixing
-from . import mixing
-
 # Below are sisl-specific imports
 from .quaternion import *
 from .shape import *
@@ -108,36 +103,74 @@ from .atom import *
 
 from .orbital import *
 from .geometry import *
+from .trajectory import *
 from .grid import *
 
 from .sparse import *
 from .sparse_geometry import *
 
-# Physical quantities and required classes
-from .physics import *
-
-# The io files requires imports from the above modules
-# Hence, we *must* import it last.
-# This makes one able to get files through:
+# The sub-packages below are slow to import (scipy, netCDF4 probing, all
+# the siles in io, etc.), hence they are imported upon first access (PEP 562).
+# This enables one to still use:
 #  import sisl
 #  sisl.io.tbtgfSileTBtrans
+#  sisl.geom.graphene
+#  sisl.Hamiltonian
 # or
 #  sisl.get_sile
-# This will reduce the cluttering of the separate entities
-# that sisl is made of.
-from . import io
-from .io.sile import (add_sile, get_sile_class, get_sile,
-                      get_siles, SileError,
-                      BaseSile, Sile, SileCDF, SileBin)
-
-# Import the default geom structure
-# This enables:
-# import sisl
-# sisl.geom.graphene
-from . import geom
-
-# Make these things publicly available
-__all__ = [s for s in dir() if not s.startswith('_')]
-__all__ += [f'__{s}__' for s in ['bibtex', 'version', 'major', 'minor', 'micro']]
-__all__ += [f'__{s}__' for s in ['git_revision']]
-__all__ += [f'__{s}__' for s in ['author', 'copyright']]
+# while scripts only using the basic classes need not import them.
+_lazy_submodules = ('linalg', 'mixing', 'physics', 'io', 'geom')
+
+# Physical quantities and required classes are exposed from physics.
+# The io files requires imports from the above modules.
+# Only these io-objects are exposed to reduce the cluttering of the
+# separate entities that sisl is made of.
+_lazy_io = ('add_sile', 'get_sile_class', 'get_sile', 'get_siles', 'SileError',
+            'BaseSile', 'Sile', 'SileCDF', 'SileBin')
+
+
+def _import_lazy(name):
+    """ Import the lazily loaded sub-package `name` """
+    from importlib import import_module
+    return import_module(f".{name}", __name__)
+
+
+def __getattr__(name):
+    if name in _lazy_submodules:
+        return _import_lazy(name)
+    if name == '__all__':
+        globals()['__all__'] = _all = _build_all()
+        return _all
+    if name in _lazy_io:
+        _import_lazy('io')
+        attr = getattr(_import_lazy('io.sile'), name)
+    elif name.startswith('_'):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    else:
+        # Physical quantities
+        physics = _import_lazy('physics')
+        if name not in physics.__all__:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        attr = getattr(physics, name)
+    # Subsequent look-ups are direct
+    globals()[name] = attr
+    return attr
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__getattr__('__all__')))
+
+
+def _build_all():
+    """ Public names of the sisl namespace (this imports all lazy sub-packages) """
+    physics = _import_lazy('physics')
+    for name in _lazy_submodules:
+        _import_lazy(name)
+    names = set(s for s in globals() if not s.startswith('_'))
+    names.update(physics.__all__)
+    names.update(_lazy_io)
+    _all = sorted(names)
+    _all += [f'__{s}__' for s in ['bibtex', 'version', 'major', 'minor', 'micro']]
+    _all += [f'__{s}__' for s in ['git_revision']]
+    _all += [f'__{s}__' for s in ['author', 'copyright']]
+    return _all
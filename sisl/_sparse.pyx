@@ -8,7 +8,8 @@ cimport numpy as np
 from sisl._indices cimport in_1d
 
 __all__ = ["fold_csr_matrix", "fold_csr_matrix_nc",
-           "fold_csr_diagonal_nc", "sparse_dense"]
+           "fold_csr_diagonal_nc", "sparse_dense",
+           "union_csr_matrix"]
 
 
 @cython.boundscheck(False)
@@ -253,3 +254,80 @@ def _sparse_dense(shape,
                 V[r, col[ind], ix] += D[ind, ix]
 
     return V
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def union_csr_matrix(np.ndarray[np.int32_t, ndim=1, mode='c'] A_PTR,
+                     np.ndarray[np.int32_t, ndim=1, mode='c'] A_NCOL,
+                     np.ndarray[np.int32_t, ndim=1, mode='c'] A_COL,
+                     np.ndarray[np.int32_t, ndim=1, mode='c'] B_PTR,
+                     np.ndarray[np.int32_t, ndim=1, mode='c'] B_NCOL,
+                     np.ndarray[np.int32_t, ndim=1, mode='c'] B_COL,
+                     Py_ssize_t nc):
+    """ Create the union sparsity pattern of two CSR matrices
+
+    The columns in each row need not be sorted. The columns of `A` retain their
+    order and the columns only in `B` are appended (in order).
+
+    Returns
+    -------
+    PTR : pointer of the union pattern (``len(A_NCOL) + 1``)
+    COL : columns of the union pattern
+    A_IDX : for each non-zero element of `A` (in row order), the index in the union pattern
+    B_IDX : for each non-zero element of `B` (in row order), the index in the union pattern
+    """
+    cdef int[::1] a_ptr = A_PTR
+    cdef int[::1] a_ncol = A_NCOL
+    cdef int[::1] a_col = A_COL
+    cdef int[::1] b_ptr = B_PTR
+    cdef int[::1] b_ncol = B_NCOL
+    cdef int[::1] b_col = B_COL
+    # Number of rows
+    cdef Py_ssize_t nr = a_ncol.shape[0]
+    cdef Py_ssize_t a_nnz = _sum(a_ncol)
+    cdef Py_ssize_t b_nnz = _sum(b_ncol)
+
+    cdef np.ndarray[np.int32_t, ndim=1, mode='c'] PTR = np.empty([nr + 1], dtype=np.int32)
+    cdef int[::1] ptr = PTR
+    cdef np.ndarray[np.int32_t, ndim=1, mode='c'] COL = np.empty([a_nnz + b_nnz], dtype=np.int32)
+    cdef int[::1] col = COL
+    cdef np.ndarray[np.int32_t, ndim=1, mode='c'] A_IDX = np.empty([a_nnz], dtype=np.int32)
+    cdef int[::1] a_idx = A_IDX
+    cdef np.ndarray[np.int32_t, ndim=1, mode='c'] B_IDX = np.empty([b_nnz], dtype=np.int32)
+    cdef int[::1] b_idx = B_IDX
+    # Work array holding the union index of the columns in the current row
+    cdef np.ndarray[np.int32_t, ndim=1, mode='c'] POS = np.full([nc], -1, dtype=np.int32)
+    cdef int[::1] pos = POS
+
+    cdef Py_ssize_t r, ind, c, nz, ia, ib
+
+    nz = 0
+    ia = 0
+    ib = 0
+    ptr[0] = 0
+    for r in range(nr):
+        for ind in range(a_ptr[r], a_ptr[r] + a_ncol[r]):
+            c = a_col[ind]
+            pos[c] = nz
+            col[nz] = c
+            a_idx[ia] = nz
+            ia += 1
+            nz += 1
+
+        for ind in range(b_ptr[r], b_ptr[r] + b_ncol[r]):
+            c = b_col[ind]
+            if pos[c] < 0:
+                pos[c] = nz
+                col[nz] = c
+                nz += 1
+            b_idx[ib] = pos[c]
+            ib += 1
+
+        # Reset work array
+        for ind in range(ptr[r], nz):
+            pos[col[ind]] = -1
+        ptr[r + 1] = nz
+
+    return PTR, COL[:nz].copy(), A_IDX, B_IDX
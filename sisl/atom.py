@@ -1323,33 +1323,36 @@ class Atoms:
             # Convert to a list of unique elements
             # We can not use set because that is unordered
             # And we want the same order, always...
-            uatoms = []
-            specie = [0] * len(atoms)
+            # Only the first occurrence of each distinct key (object
+            # or symbol/number) is converted and compared, this is much
+            # faster for many atoms.
             if isinstance(atoms[0], Atom):
-                for i, a in enumerate(atoms):
-                    try:
-                        s = uatoms.index(a)
-                    except:
-                        s = -1
-                    if s < 0:
-                        s = len(uatoms)
-                        uatoms.append(a)
-                    specie[i] = s
-
+                keys = [id(a) for a in atoms]
             elif isinstance(atoms[0], (str, Integral)):
-                for i, a in enumerate(atoms):
-                    a = Atom(a)
-                    try:
-                        s = uatoms.index(a)
-                    except:
-                        s = -1
-                    if s < 0:
-                        s = len(uatoms)
-                        uatoms.append(a)
-                    specie[i] = s
-
+                keys = atoms
             else:
                 raise ValueError('atoms keyword was wrong input')
+            _, first, inv = np.unique(keys, return_index=True, return_inverse=True)
+            # order of first appearance
+            order = np.argsort(first)
+            rank = np.empty_like(order)
+            rank[order] = np.arange(len(order))
+
+            uatoms = []
+            umap = np.empty(len(order), dtype=np.int32)
+            for i, ia in enumerate(first[order]):
+                a = atoms[ia]
+                if not isinstance(a, Atom):
+                    a = Atom(a)
+                try:
+                    s = uatoms.index(a)
+                except:
+                    s = -1
+                if s < 0:
+                    s = len(uatoms)
+                    uatoms.append(a)
+                umap[i] = s
+            specie = umap[rank[inv.ravel()]]
 
         elif isinstance(atoms, (str, Integral)):
             uatoms = [Atom(atoms)]
@@ -7,14 +7,16 @@ from numpy import int32
 from numpy import floor, dot, add, cos, sin
 from numpy import ogrid, take
 from scipy.sparse import diags as sp_diags
+from scipy.sparse import csr_matrix
 from scipy.sparse import SparseEfficiencyWarning
+from scipy.sparse.linalg import LinearOperator
 from scipy.ndimage import zoom as ndimage_zoom
 
 from ._internal import set_module
 from . import _array as _a
 from ._help import dtype_complex_to_real, wrap_filterwarnings
-from .messages import deprecate_method
-from .shape import Shape
+from .messages import deprecate_method, SislError
+from .shape import Shape, Ellipsoid, Cuboid
 from .utils import default_ArgumentParser, default_namespace
 from .utils import cmd, strseq, direction, str_spec
 from .utils import array_arange
@@ -141,7 +143,8 @@ class Grid(SuperCellChild):
         """
         self.grid.fill(val)
 
-    def interp(self, shape, order=1, mode="wrap", **kwargs):
+    @wrap_filterwarnings("ignore", message="The behavior of affine_transform", category=UserWarning)
+    def interp(self, shape, order=1, mode="wrap", chunk=None, nthreads=None, **kwargs):
         """ Interpolate grid values to a new grid of a different shape
 
         It uses the `scipy.ndimage.zoom`, which creates a finer or
@@ -157,6 +160,12 @@ class Grid(SuperCellChild):
         mode: {'wrap', 'mirror', 'constant', 'reflect', 'nearest'}, optional
             determines how to compute the borders of the grid.
             The default is ``"wrap"``, which accounts for periodic conditions.
+            If None, the mode is determined by the boundary conditions (all must be equal).
+        chunk : int, optional
+            interpolate slabs of (approximately) `chunk` output grid points along the first
+            lattice vector, this bounds the memory used for intermediate results.
+        nthreads : int, optional
+            number of threads used to interpolate the slabs
         **kwargs :
             optional arguments passed to the interpolation algorithm
             The interpolation routine is `scipy.ndimage.zoom`
@@ -172,13 +181,52 @@ class Grid(SuperCellChild):
             method = order
         if method is not None:
             order = {'linear': 1}.get(method, 3)
-
-        # And now we do the actual interpolation
-        # Calculate the zoom_factors
-        zoom_factors = np.array(shape) / self.shape
-
-        # Apply the scipy.ndimage.zoom function and return a new grid
-        return self.apply(ndimage_zoom, zoom_factors, mode=mode, order=order, **kwargs)
+        if mode is None:
+            mode = self._bc_mode()
+            if len(set(mode)) > 1:
+                raise ValueError(f"{self.__class__.__name__}.interp requires the same boundary conditions "
+                                 "along all directions when mode is None")
+            mode = mode[0]
+
+        if chunk is None and nthreads is None:
+            # And now we do the actual interpolation
+            # Calculate the zoom_factors
+            zoom_factors = np.array(shape) / self.shape
+
+            # Apply the scipy.ndimage.zoom function and return a new grid
+            return self.apply(ndimage_zoom, zoom_factors, mode=mode, order=order, **kwargs)
+
+        from scipy.ndimage import affine_transform, spline_filter
+        n_in = _a.arrayi(self.shape)
+        n_out = _a.asarrayi(shape).ravel()
+        if n_out.size == 1:
+            n_out = n_in * n_out
+        # same coordinate mapping as scipy.ndimage.zoom
+        scale = np.divide(n_in - 1, n_out - 1, out=np.ones(3), where=n_out > 1)
+
+        data = self.grid
+        npad = 0
+        if kwargs.pop("prefilter", True) and order > 1:
+            # the spline coefficients are calculated on the full grid
+            # since the spline filter has an infinite support.
+            # Same boundary handling as scipy.ndimage.zoom, i.e. modes that
+            # the spline filter cannot handle are padded explicitly
+            if mode == "nearest":
+                npad = 12
+                data = np.pad(data, npad, mode="edge")
+            elif mode == "grid-constant":
+                npad = 12
+                data = np.pad(data, npad, mode="constant", constant_values=kwargs.get("cval", 0.))
+            data = spline_filter(data, order, output=np.result_type(data.dtype, np.float64), mode=mode)
+
+        # each slab of output planes is interpolated from the full grid (no copies)
+        def func(data, o0, o1, a):
+            return affine_transform(data, scale, offset=[o0 * scale[0] + npad, npad, npad],
+                                    output_shape=(o1 - o0, n_out[1], n_out[2]),
+                                    order=order, mode=mode, prefilter=False, **kwargs)
+
+        out = self._apply_slabs(data, func, n_out[0], None, False, chunk, nthreads)
+        return self._new_grid(out)
 
     def isosurface(self, level, step_size=1, **kwargs):
         """Calculates the isosurface for a given value.
@@ -244,7 +292,7 @@ class Grid(SuperCellChild):
 
         return (verts, *returns)
 
-    def smooth(self, r=0.7, method="gaussian", mode="wrap", **kwargs):
+    def smooth(self, r=0.7, method="gaussian", mode="wrap", chunk=None, nthreads=None, out=None, **kwargs):
         """
         Make a smoother grid by applying a filter.
 
@@ -260,10 +308,18 @@ class Grid(SuperCellChild):
         mode: {'wrap', 'mirror', 'constant', 'reflect', 'nearest'}, optional
             determines how to compute the borders of the grid.
             The default is wrap, which accounts for periodic conditions.
+            If None, the mode is determined for each direction by the boundary conditions.
+        chunk : int, optional
+            filter slabs of (approximately) `chunk` grid points along the first lattice vector
+        nthreads : int, optional
+            number of threads used to filter the slabs
+        out : Grid or numpy.ndarray, optional
+            store the result in this grid/array, ``out=self`` smooths the grid in-place
 
         See Also
         --------
         scipy.ndimage.gaussian_filter
+        apply : for details on `chunk`, `nthreads` and `out`
         """
 
         # Normalize the radius input to a list of radius
@@ -277,43 +333,365 @@ class Grid(SuperCellChild):
         # Update the kwargs accordingly
         if method == "gaussian":
             kwargs['sigma'] = pixels_r
+            halo = int(kwargs.get("truncate", 4.) * pixels_r[0] + 0.5)
         elif method == "uniform":
             kwargs['size'] = pixels_r * 2
+            halo = pixels_r[0] + 1
+        else:
+            halo = None
+
+        if mode is None:
+            mode = self._bc_mode()
+        wrap = (mode if isinstance(mode, str) else mode[0]) == "wrap"
 
         # This should raise an import error if the method does not exist
         func = import_attr(f"scipy.ndimage.{method}_filter")
-        return self.apply(func, mode=mode, **kwargs)
+        if halo is None and (chunk is not None or nthreads is not None):
+            raise ValueError(f"{self.__class__.__name__}.smooth cannot determine the filter size "
+                             f"for method={method}, use apply with an explicit halo")
+        return self.apply(func, mode=mode, halo=halo, chunk=chunk, nthreads=nthreads,
+                          out=out, _wrap=wrap, **kwargs)
 
-    def apply(self, function_, *args, **kwargs):
+    def apply(self, function_, *args, halo=None, chunk=None, nthreads=None, out=None, **kwargs):
         """ Applies a function to the grid and returns a new grid.
 
         You can also apply a function that does not return a grid (maybe you want to do
         some measurement). In that case, you will get the result instead of a `Grid`.
 
+        For large grids the function may be applied to slabs along the first lattice vector
+        (by specifying `chunk` and/or `nthreads`). Each slab is padded by `halo` planes
+        from the neighbouring slabs (periodically if the grid is periodic along the first
+        lattice vector), hence the function may only depend on values within `halo`
+        planes, e.g. a filter. It must return an array with the same shape as its input.
+
         Parameters
         -----------
         function_: str or function
             for a string the full module path to the function should be given.
             The function that will be called should have the grid as the first argument in its
             interface.
+        halo : int, optional
+            number of planes along the first lattice vector needed for the function to
+            calculate values in a plane. Only used if `chunk` or `nthreads` is given, defaults to 0.
+        chunk : int, optional
+            apply the function on slabs of (approximately) `chunk` grid points
+        nthreads : int, optional
+            number of threads used to apply the function on the slabs, the speed-up depends on
+            whether `function_` releases the GIL. Defaults to 1 if only `chunk` is given, and
+            ``nthreads`` slabs if only `nthreads` is given.
+        out : Grid or numpy.ndarray, optional
+            store the result in this grid/array, ``out=self`` applies the function in-place
+            (also when using slabs).
         *args and **kwargs:
             arguments that go directly to the function call
         """
         if isinstance(function_, str):
             function_ = import_attr(function_)
+        # whether the halo is periodic (internal use)
+        wrap = kwargs.pop("_wrap", self.bc[0, 0] == self.PERIODIC)
+
+        out_grid = None
+        if isinstance(out, Grid):
+            out_grid = out
+            out = out.grid
+
+        if halo is not None and 2 * halo >= self.shape[0]:
+            # the slabs would (at least) contain the full grid
+            chunk = nthreads = None
+
+        if chunk is None and nthreads is None:
+            result = function_(self.grid, *args, **kwargs)
+
+            # Maybe the result is not a grid, because there are methods that actually
+            # do measurements of the grid
+            # TODO what to do about functions that squeeze shape == 1 dimensions?
+            if not isinstance(result, np.ndarray) or result.ndim != 3:
+                return result
+            if out is not None:
+                out[...] = result
+                result = out
 
-        result = function_(self.grid, *args, **kwargs)
+        else:
+            if halo is None:
+                halo = 0
 
-        # Maybe the result is not a grid, because there are methods that actually
-        # do measurements of the grid
-        # TODO what to do about functions that squeeze shape == 1 dimensions?
-        if not isinstance(result, np.ndarray) or result.ndim != 3:
-            return result
+            def in_rows(o0, o1):
+                return o0 - halo, o1 + halo
 
-        # If the result is a grid, we will generate a copy of this one with the new grid values
-        grid = self.copy()
-        grid.grid = result
+            def func(block, o0, o1, a):
+                result = function_(block, *args, **kwargs)
+                if not isinstance(result, np.ndarray) or result.shape != block.shape:
+                    raise ValueError(f"{self.__class__.__name__}.apply requires the function to return "
+                                     "arrays with the same shape as the input when applied on slabs")
+                return result[o0 - a:o1 - a]
+
+            result = self._apply_slabs(self.grid, func, self.shape[0], in_rows, wrap, chunk, nthreads, out)
+
+        if out_grid is not None:
+            return out_grid
+
+        # If the result is a grid, we will generate a new grid with the new grid values
+        return self._new_grid(result)
 
+    def _bc_mode(self):
+        """ `scipy.ndimage` boundary modes corresponding to the boundary conditions (lower side) """
+        modes = {self.PERIODIC: "wrap",
+                 self.NEUMANN: "reflect",
+                 self.DIRICHLET: "constant",
+                 self.OPEN: "nearest"}
+        return [modes[bc] for bc in self.bc[:, 0]]
+
+    def _new_grid(self, data):
+        """ Create a new grid with the same super cell, geometry and boundary conditions, with `data` as values """
+        d = self.__sc_geometry_dict()
+        d['dtype'] = data.dtype
+        grid = self.__class__([1] * 3, bc=np.copy(self.bc), **d)
+        grid.grid = data
+        return grid
+
+    def _apply_slabs(self, data, func, nout, in_rows, wrap, chunk, nthreads, out=None):
+        """ Internal routine for calculating a function in slabs along the first axis
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            input values (with the same first dimension as the grid)
+        func : callable
+            ``func(block, o0, o1, a)`` returning the output planes ``o0:o1``, `block` contains
+            the input planes ``a:b`` (with ``a, b = in_rows(o0, o1)``)
+        nout : int
+            number of output planes
+        in_rows : callable or None
+            ``a, b = in_rows(o0, o1)`` input planes needed for output planes ``o0:o1``,
+            if None `func` is called with the full input (``a = 0``)
+        wrap : bool
+            whether the input planes are periodic, otherwise they are truncated to the grid
+        chunk, nthreads : int or None
+            number of grid points per slab and number of threads
+        out : numpy.ndarray, optional
+            the output array, may be `data` (in-place)
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        n = data.shape[0]
+
+        # Figure out the slabs
+        if chunk is None:
+            nslabs = nthreads
+        else:
+            npoints = data[0].size * nout / n
+            nslabs = max(1, int(round(nout * npoints / chunk)))
+        nslabs = min(max(1, nslabs), nout)
+        bounds = np.linspace(0, nout, nslabs + 1).astype(np.int64)
+        slabs = list(zip(bounds[:-1], bounds[1:]))
+        if nthreads is None:
+            nthreads = 1
+
+        def rows(o0, o1):
+            a, b = in_rows(o0, o1)
+            if wrap:
+                return a, _a.arangel(a, b) % n
+            a, b = max(a, 0), min(b, n)
+            return a, _a.arangel(a, b)
+
+        inplace = in_rows is not None and out is not None and np.shares_memory(out, data)
+        if inplace:
+            # store the input planes which are overwritten by other slabs
+            saved = []
+            for o0, o1 in slabs:
+                a, idx = rows(o0, o1)
+                halo = (idx < o0) | (o1 <= idx)
+                saved.append(data[idx[halo]])
+
+        def calc(i):
+            o0, o1 = slabs[i]
+            if in_rows is None:
+                return func(data, o0, o1, 0)
+            a, idx = rows(o0, o1)
+            if inplace:
+                # this slab's own planes have not been overwritten
+                block = np.empty((len(idx),) + data.shape[1:], dtype=data.dtype)
+                own = (o0 <= idx) & (idx < o1)
+                block[own] = data[idx[own]]
+                block[~own] = saved[i]
+                saved[i] = None
+            elif not wrap:
+                block = data[idx[0]:idx[-1] + 1]
+            else:
+                block = data[idx]
+            return func(block, o0, o1, a)
+
+        # calculate the first slab to get the output data-type and shape
+        result = calc(0)
+        if out is None:
+            out = np.empty((nout,) + result.shape[1:], dtype=result.dtype)
+
+        def store(i, result):
+            o0, o1 = slabs[i]
+            out[o0:o1] = result
+
+        store(0, result)
+        del result
+        if nthreads > 1:
+            with ThreadPoolExecutor(nthreads) as executor:
+                def calc_store(i):
+                    store(i, calc(i))
+                list(executor.map(calc_store, range(1, len(slabs))))
+        else:
+            for i in range(1, len(slabs)):
+                store(i, calc(i))
+        return out
+
+    def poisson(self, bc=None, workers=None):
+        r""" Solve the Poisson equation with this grid as the source term using fast Fourier transforms
+
+        Solves
+
+        .. math::
+            \nabla^2 V(\mathbf r) = -\rho(\mathbf r)
+
+        with :math:`\rho` being the values of this grid (in units of inverse volume).
+        Multiply the result by :math:`4\pi` (Gaussian units) or :math:`1/\epsilon_0` as appropriate.
+
+        The solution is calculated in reciprocal space, :math:`V(\mathbf G) = \rho(\mathbf G)/|\mathbf G|^2`,
+        which requires :math:`\mathcal O(N\log N)` operations and no matrix assembly.
+        Each lattice direction is transformed according to its boundary condition:
+
+        * ``Grid.PERIODIC``: Fourier transform, any (non-orthogonal) cell is allowed
+        * ``Grid.DIRICHLET``: sine transform, :math:`V=0` one grid spacing outside the grid on both sides
+        * ``Grid.NEUMANN``: cosine transform, zero derivative half a grid spacing outside the grid
+
+        Non-periodic directions must be orthogonal to the other lattice vectors.
+        If no direction has Dirichlet boundary conditions, the average of :math:`\rho` is
+        removed (neutralizing background) and the average of :math:`V` is zero.
+
+        The solution may be used as an initial guess for the `pyamg` solution, see `topyamg`.
+
+        Parameters
+        ----------
+        bc : (3, 2) or (3, ) or int, optional
+           boundary conditions, defaults to the grid boundary conditions, both sides of
+           a direction must have the same boundary condition
+        workers : int, optional
+           number of workers used in the transforms, see `scipy.fft.fftn`
+
+        Returns
+        -------
+        Grid
+            the solution :math:`V` with the same shape as this grid (and data-type,
+            integer grids return a ``float64`` grid)
+
+        Raises
+        ------
+        ValueError : for unsupported boundary conditions, or non-periodic directions not orthogonal to the others
+        """
+        import scipy.fft as fft
+
+        if bc is None:
+            bc = self.bc
+        elif isinstance(bc, Integral):
+            bc = _a.fulli([3, 2], bc)
+        bc = _a.asarrayi(bc).reshape(3, -1)
+        if np.any(bc[:, 0] != bc[:, -1]):
+            raise ValueError(f"{self.__class__.__name__}.poisson requires the same boundary condition "
+                             "on both sides of each direction")
+        bc = bc[:, 0]
+        for b in bc:
+            if b not in (self.PERIODIC, self.DIRICHLET, self.NEUMANN):
+                raise ValueError(f"{self.__class__.__name__}.poisson only allows periodic, Dirichlet "
+                                 "and Neumann boundary conditions")
+
+        shape = _a.arrayi(self.shape)
+        cell = self.cell
+        rcell = self.rcell
+        periodic = [i for i in range(3) if bc[i] == self.PERIODIC]
+
+        # Wave-vector along each direction, G = sum_i q_i v_i
+        q = []
+        v = np.empty([3, 3])
+        for i in range(3):
+            n = shape[i]
+            if bc[i] == self.PERIODIC:
+                v[i] = rcell[i]
+                q.append(fft.fftfreq(n, 1 / n))
+                continue
+            # Ensure the direction is orthogonal to the other lattice vectors
+            for j in range(3):
+                if j != i and abs(dot(cell[i], cell[j])) > 1e-8 * fnorm(cell[i]) * fnorm(cell[j]):
+                    raise ValueError(f"{self.__class__.__name__}.poisson requires non-periodic directions "
+                                     "to be orthogonal to the other lattice vectors")
+            v[i] = rcell[i] / fnorm(rcell[i])
+            h = fnorm(cell[i]) / n
+            if bc[i] == self.DIRICHLET:
+                q.append(pi * _a.aranged(1, n + 1) / ((n + 1) * h))
+            else:
+                q.append(pi * _a.aranged(n) / (n * h))
+
+        real = self.dkind in 'iuf'
+        data = self.grid.astype(np.float64 if real else np.complex128)
+
+        # Transform the non-periodic directions
+        for i in range(3):
+            if bc[i] == self.DIRICHLET:
+                data = fft.dst(data, type=1, axis=i, norm='ortho', workers=workers)
+            elif bc[i] == self.NEUMANN:
+                data = fft.dct(data, type=2, axis=i, norm='ortho', workers=workers)
+
+        # Transform the periodic directions, for real data the last
+        # periodic direction only needs half the frequencies
+        rfft = real and len(periodic) > 0
+        if rfft:
+            data = fft.rfftn(data, axes=periodic, workers=workers)
+            last = periodic[-1]
+            q[last] = q[last][:data.shape[last]]
+        elif len(periodic) > 0:
+            data = fft.fftn(data, axes=periodic, workers=workers)
+
+        # The sign of the Nyquist frequency (even number of points) is ambiguous,
+        # its cross terms are averaged over both signs (i.e. removed) such that
+        # G^2 has the symmetry of real data, and real and complex data are equivalent
+        qx = [qi.copy() for qi in q]
+        for i in periodic:
+            if shape[i] % 2 == 0:
+                qx[i][np.abs(qx[i]) == shape[i] // 2] = 0.
+
+        # Squared length of G (metric tensor of the directions)
+        def reshape(q, i):
+            return q.reshape([-1 if j == i else 1 for j in range(3)])
+
+        vv = v @ v.T
+        qq = [reshape(q[i], i) for i in range(3)]
+        qx = [reshape(qx[i], i) for i in range(3)]
+        G2 = 0.
+        for i in range(3):
+            for j in range(3):
+                if i == j:
+                    G2 = G2 + qq[i] ** 2 * vv[i, i]
+                else:
+                    G2 = G2 + qx[i] * qx[j] * vv[i, j]
+        G2 = np.broadcast_to(G2, data.shape)
+
+        # Remove the G = 0 component (only present without Dirichlet BC)
+        zero = G2 == 0.
+        data = np.divide(data, G2, out=np.zeros_like(data), where=~zero)
+        del G2, zero
+
+        # Transform back
+        if rfft:
+            data = fft.irfftn(data, s=shape[periodic], axes=periodic, workers=workers)
+        elif len(periodic) > 0:
+            data = fft.ifftn(data, axes=periodic, workers=workers)
+        for i in range(3):
+            if bc[i] == self.DIRICHLET:
+                data = fft.idst(data, type=1, axis=i, norm='ortho', workers=workers)
+            elif bc[i] == self.NEUMANN:
+                data = fft.idct(data, type=2, axis=i, norm='ortho', workers=workers)
+
+        if real:
+            data = data.real
+        grid = self.copy()
+        # integer sources have a floating point solution
+        dtype = self.dtype if self.dkind in 'fc' else np.float64
+        grid.grid = data.astype(dtype, copy=False)
         return grid
 
     @property
@@ -530,6 +908,160 @@ class Grid(SuperCellChild):
     # for compatibility
     mean = average
 
+    def integrate_atoms(self, method="voronoi", ret_volume=False, ret_dipole=False, chunk=2 ** 20):
+        r""" Integrate the grid values in the regions belonging to each atom of the attached geometry
+
+        Calculates
+
+        .. math::
+            Q_I = \int w_I(\mathbf r) f(\mathbf r) d\mathbf r
+
+        with :math:`f` the grid values and :math:`w_I` the weight of atom :math:`I`.
+        The grid is processed in slabs along the first lattice vector, such that the
+        memory usage is bounded by `chunk`, and the atoms are located with a `scipy.spatial.cKDTree`
+        including periodic images along the periodic directions (see `bc`). The number of
+        periodic images is determined from the cell, so also skewed cells are handled.
+
+        Parameters
+        ----------
+        method : {"voronoi", "becke"}
+            the partitioning of space. ``"voronoi"`` assigns each grid point to the nearest atom,
+            ``"becke"`` uses the smooth Becke weights (from the 8 nearest atoms).
+        ret_volume : bool, optional
+            also return the volume of each atom region, :math:`\int w_I(\mathbf r)d\mathbf r`,
+            e.g. for the average value of a potential near each atom
+        ret_dipole : bool, optional
+            also return the first moment of each atom, :math:`\int w_I(\mathbf r) f(\mathbf r)
+            (\mathbf r - \mathbf R_I) d\mathbf r`
+        chunk : int, optional
+            approximate number of grid points processed in each slab
+
+        Returns
+        -------
+        integral : numpy.ndarray
+            integral of the grid values for each atom, ``(na,)``
+        volume : numpy.ndarray
+            volume of each atom region, only returned if `ret_volume` is true, ``(na,)``
+        dipole : numpy.ndarray
+            first moment for each atom, only returned if `ret_dipole` is true, ``(na, 3)``
+
+        Examples
+        --------
+        >>> rho = sisl.get_sile("siesta.RHO").read_grid()
+        >>> q = rho.integrate_atoms()
+        """
+        from scipy.spatial import cKDTree
+
+        geom = self.geometry
+        if geom is None:
+            raise SislError(f"{self.__class__.__name__}.integrate_atoms requires a geometry")
+        method = method.lower()
+        if method not in ("voronoi", "becke"):
+            raise ValueError(f"{self.__class__.__name__}.integrate_atoms got unknown method: {method}")
+        na = geom.na
+
+        # Fold atoms into the cell along periodic directions and add the periodic images
+        periodic = self.bc[:, 0] == self.PERIODIC
+        # (relative to the origin of the grid)
+        origo = self.sc.origo
+        fxyz = dot(geom.xyz - origo, self.icell.T)
+        fxyz[:, periodic] %= 1.
+
+        # The nearest image of an atom is at most half the diameter of the periodic
+        # cell away (plus the non-periodic lattice vectors), for Becke all 27 neighbouring
+        # images of this image are required.
+        # An image displaced n lattice vectors along direction i is at least
+        # (|n| - 1) * h_i away, with h_i the distance between the cell faces.
+        cell = self.cell
+        if periodic.any():
+            per = cell[periodic]
+            n = np.stack(np.meshgrid(*[[-1, 0, 1]] * len(per), indexing='ij'), -1).reshape(-1, len(per))
+            diameter = fnorm(n.dot(per)).max()
+        else:
+            diameter = 0.
+        radius = (1.5 if method == "becke" else 0.5) * diameter + fnorm(cell[~periodic]).sum()
+        h = 2 * pi / fnorm(self.rcell)
+        nimg = np.where(periodic, 1 + np.floor(radius / h + 1e-8).astype(np.int32), 0)
+        isc = np.stack(np.meshgrid(*[_a.arangei(-n, n + 1) for n in nimg],
+                                   indexing='ij'), -1).reshape(-1, 3)
+        # primary images first (favoured for equidistant atoms)
+        isc = isc[np.argsort(np.abs(isc).sum(1), kind='stable')]
+        xyz = (fxyz.reshape(1, -1, 3) + isc.reshape(-1, 1, 3)).reshape(-1, 3).dot(self.cell) + origo
+        tree = cKDTree(xyz)
+
+        if method == "becke":
+            k = min(8, len(xyz))
+            chunk = max(1, chunk // (k * k))
+        else:
+            k = 1
+
+        dvolume = self.dvolume
+        dcell = self.dcell
+        shape = self.shape
+        nyz = shape[1] * shape[2]
+        nslab = max(1, chunk // nyz)
+
+        # Coordinates of the yz-plane
+        iyz = np.stack(np.meshgrid(_a.arangei(shape[1]), _a.arangei(shape[2]), indexing='ij'), -1).reshape(-1, 2)
+        yz = iyz.dot(dcell[1:]) + origo
+        del iyz
+
+        def bincount(atom, weights, minlength):
+            if np.iscomplexobj(weights):
+                return (np.bincount(atom, weights.real, minlength) +
+                        1j * np.bincount(atom, weights.imag, minlength))
+            return np.bincount(atom, weights, minlength)
+
+        integral = np.zeros(na, dtype=np.result_type(self.dtype, np.float64))
+        volume = _a.zerosd(na)
+        dipole = np.zeros([na, 3], dtype=integral.dtype)
+
+        for x0 in range(0, shape[0], nslab):
+            x1 = min(x0 + nslab, shape[0])
+            r = (_a.arangei(x0, x1).reshape(-1, 1, 1) * dcell[0].reshape(1, 1, 3) +
+                 yz.reshape(1, -1, 3)).reshape(-1, 3)
+            f = self.grid[x0:x1].reshape(-1) * dvolume
+            dist, img = tree.query(r, k=k)
+
+            if k == 1:
+                w = 1.
+            else:
+                # Becke weights from the k nearest atoms
+                ximg = xyz[img]
+                R = fnorm(ximg[:, :, None, :] - ximg[:, None, :, :])
+                idx = np.arange(k)
+                R[:, idx, idx] = 1.
+                mu = (dist[:, :, None] - dist[:, None, :]) / R
+                del R
+                mu[:, idx, idx] = -1.
+                for _ in range(3):
+                    mu = 1.5 * mu - 0.5 * mu ** 3
+                w = np.prod(0.5 * (1 - mu), axis=2)
+                del mu
+                w /= w.sum(1, keepdims=True)
+                f = f.reshape(-1, 1)
+                r = r.reshape(-1, 1, 3)
+
+            atom = (img % na).ravel()
+            wf = (w * f).ravel()
+            integral += bincount(atom, wf, na)
+            if ret_volume:
+                volume += np.bincount(atom, np.broadcast_to(w * dvolume, img.shape).ravel(), na)
+            if ret_dipole:
+                dr = (r - xyz[img]).reshape(-1, 3)
+                for i in range(3):
+                    dipole[:, i] += bincount(atom, wf * dr[:, i], na)
+                del dr
+
+        ret = (integral,)
+        if ret_volume:
+            ret += (volume,)
+        if ret_dipole:
+            ret += (dipole,)
+        if len(ret) == 1:
+            return ret[0]
+        return ret
+
     def remove_part(self, idx, axis, above):
         """ Removes parts of the grid via above/below designations.
 
@@ -896,6 +1428,191 @@ class Grid(SuperCellChild):
         else:
             return floor(dot(icell[axis, :], coord.reshape(-1, 3).T) * shape[axis]).T.astype(int32, copy=False)
 
+    def index_shapes(self, shapes, tol=1.e-8):
+        """ Find the grid indices of all grid points within each of the shapes, batched
+
+        Equivalent to calling ``index(shape)`` for each shape, but ellipsoids (spheres) and
+        cuboids are handled simultaneously: the grid points in the bounding box of each shape
+        are tested in vectorised chunks. The indices for the shapes are returned in a
+        compressed (CSR-like) format.
+
+        Parameters
+        ----------
+        shapes : list of Shape
+            the shapes, `Ellipsoid`, `Sphere` and `Cuboid` are batched, other shapes are
+            looked up one at a time using `index`
+        tol : float, optional
+            absolute tolerance for the boundaries of the shapes, see `Shape.within_index`
+
+        Returns
+        -------
+        ptr : numpy.ndarray
+            pointer into `index` for each shape, i.e. the indices for shape ``i`` are
+            ``index[ptr[i]:ptr[i+1]]``
+        index : numpy.ndarray
+            grid indices (:, 3) of the points within the shapes, these may be outside the
+            grid (see `index_fold` and `index_truncate`)
+
+        See Also
+        --------
+        index_spheres : faster for spheres specified by coordinates and radii
+        """
+        if isinstance(shapes, Shape):
+            shapes = [shapes]
+        n = len(shapes)
+        center = _a.emptyd([n, 3])
+        v = _a.zerosd([n, 3, 3])
+        iv = _a.zerosd([n, 3, 3])
+        cuboid = np.zeros(n, dtype=np.bool_)
+        other = []
+        for i, shape in enumerate(shapes):
+            if isinstance(shape, Ellipsoid):
+                pass
+            elif isinstance(shape, Cuboid):
+                cuboid[i] = True
+            else:
+                other.append(i)
+                continue
+            center[i] = shape.center
+            v[i] = shape._v
+            iv[i] = shape._iv
+
+        batch = np.ones(n, dtype=np.bool_)
+        batch[other] = False
+        ptr, index = self._index_within(center[batch], v[batch], iv[batch], cuboid[batch], tol)
+        if len(other) == 0:
+            return ptr, index
+
+        # Merge in the non-batched shapes
+        count = _a.zerosl(n)
+        count[batch] = np.diff(ptr)
+        idx_other = [self.index(shapes[i]).reshape(-1, 3) for i in other]
+        count[other] = [len(idx) for idx in idx_other]
+        new_ptr = _a.zerosl(n + 1)
+        _a.cumsuml(count, out=new_ptr[1:])
+        new_index = _a.emptyi([new_ptr[-1], 3])
+        b = batch.nonzero()[0]
+        new_index[array_arange(new_ptr[b], new_ptr[b + 1])] = index
+        for i, idx in zip(other, idx_other):
+            new_index[new_ptr[i]:new_ptr[i+1]] = idx
+        return new_ptr, new_index
+
+    def index_spheres(self, center, R, tol=1.e-8):
+        """ Find the grid indices of all grid points within spheres, batched
+
+        Parameters
+        ----------
+        center : (:, 3) of float
+            centers of the spheres, e.g. ``geometry.xyz``
+        R : float or (:,) of float
+            radii of the spheres, e.g. ``geometry.maxR(all=True)``
+        tol : float, optional
+            absolute tolerance for the boundaries of the spheres (relative to the radius)
+
+        Returns
+        -------
+        ptr : numpy.ndarray
+            pointer into `index` for each sphere, i.e. the indices for sphere ``i`` are
+            ``index[ptr[i]:ptr[i+1]]``
+        index : numpy.ndarray
+            grid indices (:, 3) of the points within the spheres, these may be outside the
+            grid (see `index_fold` and `index_truncate`)
+
+        Examples
+        --------
+        Sum the grid values within the atomic spheres (of radius 1 Ang)
+
+        >>> ptr, idx = grid.index_spheres(grid.geometry.xyz, 1.)
+        >>> idx = grid.index_fold(idx, unique=False)
+        >>> values = grid.grid[idx[:, 0], idx[:, 1], idx[:, 2]]
+        >>> atom_sum = np.add.reduceat(values, ptr[:-1]) # only correct for non-empty spheres
+
+        See Also
+        --------
+        index_shapes : for arbitrary shapes
+        """
+        center = _a.asarrayd(center).reshape(-1, 3)
+        n = len(center)
+        R = np.broadcast_to(_a.asarrayd(R).ravel(), n)
+        v = np.identity(3).reshape(1, 3, 3) * R.reshape(-1, 1, 1)
+        return self._index_within(center, v, None, np.zeros(n, dtype=np.bool_), tol, R=R)
+
+    def _index_within(self, center, v, iv, cuboid, tol, R=None, chunk=2 ** 20):
+        """ Internal routine for batched ellipsoid/cuboid indices, see `index_shapes`
+
+        If `R` is passed all shapes are spheres and `iv` is not used.
+        """
+        n = len(center)
+        shape = _a.arrayi(self.shape)
+        # index coordinate along lattice vector i is shape[i] * icell[i] . r
+        icell = self.icell * shape.reshape(3, 1)
+
+        # half-width of the bounding box in index coordinates
+        vi = np.einsum('sjk,ik->sji', v, icell)
+        w = np.where(cuboid.reshape(-1, 1),
+                     np.abs(vi).sum(1) / 2,
+                     np.sqrt((vi ** 2).sum(1)))
+        # the origin of the cuboids is the corner
+        corner = center - v.sum(1) / 2
+        u = dot(center, icell.T)
+        # bounding boxes (lo is the first index, d the number of indices)
+        lo = np.floor(u - w - tol).astype(np.int64)
+        d = np.floor(u + w + tol).astype(np.int64) - lo + 1
+        del vi, w, u
+
+        dcell = self.dcell
+        count = _a.zerosl(n)
+        chunks = []
+
+        # sort according to shape type and box sizes to reduce the overhead of the box culling
+        order = np.lexsort((d.prod(1), cuboid))
+        origin = np.where(cuboid.reshape(-1, 1), corner, center)
+        i = 0
+        while i < n:
+            # grow the chunk until the number of tested points becomes too large
+            j = i + 1
+            dmax = d[order[i]]
+            is_cuboid = cuboid[order[i]]
+            while j < n and cuboid[order[j]] == is_cuboid:
+                dj = np.maximum(dmax, d[order[j]])
+                if (j + 1 - i) * dj.prod() > chunk:
+                    break
+                dmax = dj
+                j += 1
+            idx = order[i:j]
+            i = j
+
+            # all offsets in the box
+            off = np.stack(np.meshgrid(*[_a.arangel(m) for m in dmax], indexing='ij'), -1).reshape(-1, 3)
+            # only points in the shapes own box
+            di = d[idx]
+            inside = off[:, 0] < di[:, 0:1]
+            inside &= off[:, 1] < di[:, 1:2]
+            inside &= off[:, 2] < di[:, 2:3]
+            # coordinates relative to the shape origin, in units of the shape vectors
+            x = (dot(lo[idx], dcell) - origin[idx]).reshape(-1, 1, 3) + dot(off, dcell).reshape(1, -1, 3)
+            if R is None:
+                x = np.matmul(x, iv[idx])
+            if is_cuboid:
+                inside &= np.logical_and(x > -tol, x <= 1 + tol).all(2)
+            elif R is None:
+                inside &= np.einsum('smk,smk->sm', x, x) <= (1 + tol) ** 2
+            else:
+                inside &= np.einsum('smk,smk->sm', x, x) <= (R[idx].reshape(-1, 1) * (1 + tol)) ** 2
+            del x
+            count[idx] = inside.sum(1)
+            s_idx, m_idx = inside.nonzero()
+            del inside
+            chunks.append((idx, (lo[idx][s_idx] + off[m_idx]).astype(np.int32)))
+            del s_idx, m_idx
+
+        ptr = _a.zerosl(n + 1)
+        _a.cumsuml(count, out=ptr[1:])
+        index = _a.emptyi([ptr[-1], 3])
+        for idx, gidx in chunks:
+            index[array_arange(ptr[idx], ptr[idx + 1])] = gidx
+        return ptr, index
+
     def append(self, other, axis):
         """ Appends other `Grid` to this grid along axis """
         shape = list(self.shape)
@@ -1180,10 +1897,14 @@ class Grid(SuperCellChild):
     def pyamg_fix(self, A, b, pyamg_indices, value):
         r""" Fix values for the stencil to `value`.
 
+        The rows of `A` are cleared and the diagonal set to 1 in-place, the sparsity
+        pattern of `A` is only changed if diagonal elements are not stored.
+
         Parameters
         ----------
-        A : `~scipy.sparse.csr_matrix`/`~scipy.sparse.csc_matrix`
-           sparse matrix describing the LHS for the linear system of equations
+        A : `~scipy.sparse.csr_matrix`/`~scipy.sparse.csc_matrix` or LinearOperator
+           sparse matrix describing the LHS for the linear system of equations, or the
+           stencil operator as returned from `pyamg_operator`
         b : numpy.ndarray
            a vector containing RHS of :math:`A x = b` for the solution of the grid stencil
         pyamg_indices : list of int
@@ -1192,27 +1913,31 @@ class Grid(SuperCellChild):
         value : float
            the value of the grid to fix the value at
         """
+        pyamg_indices = _a.asarrayi(pyamg_indices).ravel()
+        if isinstance(A, _GridStencil):
+            A.fix(pyamg_indices)
+            self.pyamg_source(b, pyamg_indices, value)
+            return
+
         if not A.format in ['csc', 'csr']:
             raise ValueError(self.__class__.__name__ + '.pyamg_fix only works for csr/csc sparse matrices')
 
         # Clean all couplings between the respective indices and all other data
-        s = array_arange(A.indptr[pyamg_indices], A.indptr[pyamg_indices+1])
-        A.data[s] = 0.
-        # clean-up
-        del s
-
-        # Specify that these indices are not to be tampered with
-        d = np.zeros(A.shape[0], dtype=A.dtype)
-        d[pyamg_indices] = 1.
-        # BUG in scipy, sparse matrix += does not do in-place operations
-        # hence we need to overwrite the `A` matrix afterward
-        AA = A + sp_diags(d, format=A.format)
-        del d
-        # Restore data in the A array
-        A.indices = AA.indices
-        A.indptr = AA.indptr
-        A.data = AA.data
-        del AA
+        # and put 1 on the diagonal, all done in-place for stored diagonal elements
+        missing = _csr_set_rows(A, pyamg_indices, pyamg_indices, 1.)
+        if missing.size > 0:
+            # Only the missing diagonal elements require a change of the sparsity pattern
+            d = np.zeros(A.shape[0], dtype=A.dtype)
+            d[missing] = 1.
+            # BUG in scipy, sparse matrix += does not do in-place operations
+            # hence we need to overwrite the `A` matrix afterward
+            AA = A + sp_diags(d, format=A.format)
+            del d
+            # Restore data in the A array
+            A.indices = AA.indices
+            A.indptr = AA.indptr
+            A.data = AA.data
+            del AA
         A.eliminate_zeros()
 
         # force RHS value
@@ -1234,20 +1959,19 @@ class Grid(SuperCellChild):
            with elements corresponding to `Grid.PERIODIC`/`Grid.NEUMANN`...
         """
         def Neumann(idx_bc, idx_p1):
-            # Set all boundary equations to 0
-            s = array_arange(A.indptr[idx_bc], A.indptr[idx_bc+1])
-            A.data[s] = 0
+            # Set all boundary equations to 0 and
             # force the boundary cells to equal the neighbouring cell
-            A[idx_bc, idx_bc] = 1
-            A[idx_bc, idx_p1] = -1
-            A.eliminate_zeros()
+            missing = _csr_set_rows(A, idx_bc, idx_bc, 1)
+            if missing.size > 0:
+                A[missing, missing] = 1
+            _csr_set(A, idx_bc, idx_p1, -1)
             b[idx_bc] = 0.
         def Dirichlet(idx):
             # Default pyamg Poisson matrix has Dirichlet BC
             b[idx] = 0.
         def Periodic(idx1, idx2):
-            A[idx1, idx2] = -1
-            A[idx2, idx1] = -1
+            _csr_set(A, idx1, idx2, -1)
+            _csr_set(A, idx2, idx1, -1)
 
         def sl2idx(sl):
             return self.pyamg_index(self.mgrid(sl))
@@ -1338,17 +2062,54 @@ class Grid(SuperCellChild):
         pyamg_index : convert grid indices into the sparse matrix indices for ``A``
         pyamg_fix : fixes stencil for indices and fixes the source for the RHS matrix (uses `pyamg_source`)
         pyamg_source : fix the RHS matrix ``b`` to a constant value
-        pyamg_boundary_condition : setup the sparse matrix ``A`` to given boundary conditions (called in this routine)
+        pyamg_boundary_condition : setup the sparse matrix ``A`` to given boundary conditions
+        pyamg_operator : matrix-free equivalent of the returned matrix
+        """
+        A, b = self.pyamg_operator(dtype)
+        # Create the CSR matrix directly with the boundary conditions
+        return A.tocsr(), b
+
+    def pyamg_operator(self, dtype=None):
+        r""" Create a matrix-free stencil operator equivalent to the `pyamg` stencil matrix
+
+        The operator is equivalent to the matrix returned by `topyamg` but only stores the
+        grid shape, the boundary conditions and a mask of the fixed grid points.
+        It may be passed directly to the iterative solvers in `scipy.sparse.linalg`.
+        Points may be fixed with `pyamg_fix` (which does not require any sparse matrix).
+
+        Parameters
+        ----------
+        dtype : numpy.dtype, optional
+           data-type used for the operator, default to use the grid data-type
+
+        Returns
+        -------
+        scipy.sparse.linalg.LinearOperator
+            the stencil for the `pyamg` solver, ``A.tocsr()`` returns the sparse matrix
+        numpy.ndarray
+            RHS of the linear system of equations
+
+        Examples
+        --------
+        Solve the Poisson equation using a multigrid pre-conditioner; only the pre-conditioner
+        requires the sparse matrix.
+
+        >>> grid = Grid(0.01)
+        >>> A, b = grid.pyamg_operator()
+        >>> grid.pyamg_fix(A, b, idx, 1.)
+        >>> import pyamg
+        >>> from scipy.sparse.linalg import lgmres
+        >>> M = pyamg.aggregation.smoothed_aggregation_solver(A.tocsr()).aspreconditioner()
+        >>> x, info = lgmres(A, b, tol=1e-12, M=M)
+
+        See Also
+        --------
+        topyamg : the sparse matrix equivalent of this operator
         """
-        from pyamg.gallery import poisson
         if dtype is None:
             dtype = self.dtype
-        # Initially create the CSR matrix
-        A = poisson(self.shape, dtype=dtype, format='csr')
+        A = _GridStencil(self.shape, self.bc, dtype)
         b = np.zeros(A.shape[0], dtype=A.dtype)
-
-        # Now apply the boundary conditions
-        self.pyamg_boundary_condition(A, b)
         return A, b
 
     @classmethod
@@ -1563,6 +2324,182 @@ class Grid(SuperCellChild):
         return p, namespace
 
 
+def _csr_set_rows(A, rows, cols, value):
+    r""" Clear `rows` of `A` and set the elements ``A[rows, cols]`` to `value`, in-place
+
+    Returns the rows where the element is not stored in `A`.
+    """
+    rows = _a.asarrayi(rows).ravel()
+    cols = _a.asarrayi(cols).ravel()
+    ptr = A.indptr
+    s = array_arange(ptr[rows], ptr[rows + 1])
+    A.data[s] = 0
+    # index into rows for each element in s
+    i = np.repeat(_a.arangei(rows.size), ptr[rows + 1] - ptr[rows])
+    found = A.indices[s] == cols[i]
+    A.data[s[found]] = value
+    has = np.zeros(rows.size, dtype=np.bool_)
+    has[i[found]] = True
+    return rows[~has]
+
+
+@wrap_filterwarnings("ignore", category=SparseEfficiencyWarning)
+def _csr_set(A, rows, cols, value):
+    r""" Set ``A[rows, cols] = value`` in-place for stored elements, only missing elements change the sparsity pattern """
+    rows = _a.asarrayi(rows).ravel()
+    cols = _a.asarrayi(cols).ravel()
+    ptr = A.indptr
+    s = array_arange(ptr[rows], ptr[rows + 1])
+    i = np.repeat(_a.arangei(rows.size), ptr[rows + 1] - ptr[rows])
+    found = A.indices[s] == cols[i]
+    A.data[s[found]] = value
+    has = np.zeros(rows.size, dtype=np.bool_)
+    has[i[found]] = True
+    if not np.all(has):
+        A[rows[~has], cols[~has]] = value
+
+
+class _GridStencil(LinearOperator):
+    r""" Matrix-free 7-point stencil of the Poisson equation on a grid, see `Grid.pyamg_operator`
+
+    The operator is equivalent to the matrix created by `Grid.topyamg` (6 on the diagonal and
+    -1 for the neighbouring grid points) with the boundary conditions applied in the same order
+    as `Grid.pyamg_boundary_condition`.
+    Only the boundary conditions and a mask of fixed points (rows equal to the identity) are stored.
+
+    A periodic direction with a single grid point has no periodic coupling (the point
+    couples to itself), whereas `Grid.pyamg_boundary_condition` sets the diagonal to -1.
+
+    Parameters
+    ----------
+    shape : (3,) of int
+       grid shape
+    bc : (3, 2) of int
+       boundary conditions of the grid
+    dtype : numpy.dtype
+       data-type of the operator
+    """
+
+    def __init__(self, shape, bc, dtype):
+        self.grid_shape = tuple(shape)
+        self.bc = _a.arrayi(bc).reshape(3, 2)
+        for i in range(3):
+            if (self.bc[i, 0] == Grid.PERIODIC) != (self.bc[i, 1] == Grid.PERIODIC):
+                raise ValueError(f"{self.__class__.__name__} found a periodic and non-periodic direction in the same direction!")
+        n = int(np.prod(self.grid_shape))
+        super().__init__(dtype=np.dtype(dtype), shape=(n, n))
+        self.fixed = np.zeros(n, dtype=np.bool_)
+
+    def fix(self, index):
+        """ Fix the value of the linear indices `index`, i.e. the rows equal the identity matrix """
+        self.fixed[index] = True
+
+    def _faces(self, axis, lo, hi):
+        """ Slice of the grid along `axis` """
+        sl = [slice(None)] * 3
+        sl[axis] = slice(lo, hi)
+        return tuple(sl)
+
+    def _matvec(self, x):
+        x = x.reshape(self.grid_shape)
+        y = 6 * x.astype(np.result_type(self.dtype, x.dtype))
+        for i in range(3):
+            y[self._faces(i, 1, None)] -= x[self._faces(i, None, -1)]
+            y[self._faces(i, None, -1)] -= x[self._faces(i, 1, None)]
+
+        # apply the boundary conditions in order
+        # rows overwritten by a Neumann boundary condition
+        neumann = np.zeros(self.grid_shape, dtype=np.bool_)
+        for i in range(3):
+            n = self.grid_shape[i]
+            f0 = self._faces(i, 0, 1)
+            f1 = self._faces(i, 1, 2)
+            fn = self._faces(i, n - 1, n)
+            fn1 = self._faces(i, n - 2, n - 1)
+            if self.bc[i, 0] == Grid.PERIODIC:
+                if n > 2:
+                    y[f0] -= x[fn]
+                    y[fn] -= x[f0]
+                elif n == 2:
+                    # the periodic coupling is the neighbour coupling, which
+                    # is only missing in the Neumann rows
+                    y[f0] -= np.where(neumann[f0], x[fn], 0)
+                    y[fn] -= np.where(neumann[fn], x[f0], 0)
+                continue
+            if self.bc[i, 0] == Grid.NEUMANN:
+                y[f0] = x[f0] - x[f1]
+                neumann[f0] = True
+            if self.bc[i, 1] == Grid.NEUMANN:
+                y[fn] = x[fn] - x[fn1]
+                neumann[fn] = True
+
+        y = y.reshape(-1)
+        y[self.fixed] = x.reshape(-1)[self.fixed]
+        return y
+
+    def tocsr(self):
+        """ Create the sparse matrix equivalent of the operator """
+        shape = self.grid_shape
+        idx = _a.arangei(self.shape[0]).reshape(shape)
+        # axis of the last Neumann boundary condition overwriting a row (-1 for none)
+        owner = np.full(shape, -1, dtype=np.int8)
+        neighbour = np.full(shape, -1, dtype=np.int32)
+        for i in range(3):
+            n = shape[i]
+            f0 = self._faces(i, 0, 1)
+            fn = self._faces(i, n - 1, n)
+            if self.bc[i, 0] == Grid.NEUMANN:
+                owner[f0] = i
+                neighbour[f0] = idx[self._faces(i, 1, 2)]
+            if self.bc[i, 1] == Grid.NEUMANN:
+                owner[fn] = i
+                neighbour[fn] = idx[self._faces(i, n - 2, n - 1)]
+
+        rows = [idx.ravel()]
+        cols = [idx.ravel()]
+        vals = [np.where(owner.ravel() < 0, 6, 1)]
+
+        def add(r, c, own):
+            keep = own.ravel()
+            rows.append(r.ravel()[keep])
+            cols.append(c.ravel()[keep])
+            vals.append(np.full(rows[-1].size, -1))
+
+        base = owner < 0
+        for i in range(3):
+            n = shape[i]
+            lo = self._faces(i, None, -1)
+            hi = self._faces(i, 1, None)
+            add(idx[hi], idx[lo], base[hi])
+            add(idx[lo], idx[hi], base[lo])
+            if self.bc[i, 0] == Grid.PERIODIC and n > 1:
+                f0 = self._faces(i, 0, 1)
+                fn = self._faces(i, n - 1, n)
+                if n > 2:
+                    add(idx[f0], idx[fn], owner[f0] < i)
+                    add(idx[fn], idx[f0], owner[fn] < i)
+                else:
+                    # the periodic coupling is the neighbour coupling, which
+                    # is only missing in the Neumann rows
+                    add(idx[f0], idx[fn], (0 <= owner[f0]) & (owner[f0] < i))
+                    add(idx[fn], idx[f0], (0 <= owner[fn]) & (owner[fn] < i))
+        # Neumann rows
+        add(idx, neighbour, owner >= 0)
+        del owner, neighbour, base
+
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        vals = np.concatenate(vals).astype(self.dtype)
+        # fixed rows only have the diagonal element
+        if self.fixed.any():
+            keep = ~self.fixed[rows] | (rows == cols)
+            rows, cols, vals = rows[keep], cols[keep], vals[keep]
+            vals[self.fixed[rows]] = 1
+        A = csr_matrix((vals, (rows, cols)), shape=self.shape, dtype=self.dtype)
+        A.sort_indices()
+        return A
+
+
 @set_module("sisl")
 def sgrid(grid=None, argv=None, ret_grid=False):
     """ Main script for sgrid.
@@ -1,4 +1,10 @@
-__all__ = ['starts_with_list']
+from itertools import islice
+import warnings
+
+import numpy as np
+
+
+__all__ = ['starts_with_list', 'lines_to_table', 'lines_to_array', 'fh_to_array']
 
 
 def starts_with_list(l, comments):
@@ -6,3 +12,137 @@ def starts_with_list(l, comments):
         if l.strip().startswith(comment):
             return True
     return False
+
+
+def lines_to_table(lines, ncol=None):
+    """ Split whitespace separated columns of `lines` into a 2D array of strings
+
+    All lines are split in one go, and the columns are converted by the caller
+    using ``astype``, this is much faster than splitting and converting each line.
+
+    Parameters
+    ----------
+    lines : list of str
+       lines with (at least) `ncol` columns each
+    ncol : int, optional
+       number of (leading) columns to return, defaults to the number of columns
+       in the first line
+
+    Returns
+    -------
+    numpy.ndarray
+        table of strings with shape ``(len(lines), ncol)``
+    """
+    n = len(lines)
+    if n == 0:
+        return np.empty([0, 0 if ncol is None else ncol], dtype=str)
+    first = len(lines[0].split())
+    if ncol is None:
+        ncol = first
+    tokens = ' '.join(lines).split()
+    if len(tokens) == n * first:
+        # all lines have the same number of columns
+        return np.array(tokens).reshape(n, first)[:, :ncol]
+    # lines with different number of columns (e.g. trailing comments)
+    return np.array([line.split()[:ncol] for line in lines])
+
+
+def _fromstring(s, dtype):
+    """ Parse all whitespace separated numbers in `s`, returns None if `s` contains non-numeric text
+
+    `numpy.fromstring` stops at non-numeric text with a `DeprecationWarning` (which
+    will become an error), here this is checked explicitly.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            return np.fromstring(s, dtype=dtype, sep=' ')
+        except (DeprecationWarning, ValueError):
+            return None
+
+
+def _leading_numbers(s, dtype):
+    """ Parse the whitespace separated numbers in `s` until the first non-numeric text """
+    vals = _fromstring(s, dtype)
+    if vals is not None:
+        return vals
+    vals = []
+    for tok in s.split():
+        try:
+            vals.append(float(tok))
+        except ValueError:
+            break
+    return np.array(vals, dtype=dtype)
+
+
+def lines_to_array(lines, ncol, dtype=np.float64):
+    """ Parse the first `ncol` numeric columns of `lines` into a 2D array
+
+    Parameters
+    ----------
+    lines : list of str
+       lines with (at least) `ncol` numeric columns each
+    ncol : int
+       number of (leading) columns to return
+    dtype : numpy.dtype, optional
+       data type of the returned array
+    """
+    n = len(lines)
+    data = _fromstring(' '.join(lines), dtype)
+    if data is not None and data.size == n * ncol:
+        return data.reshape(n, ncol)
+    # additional (or non-numeric) columns
+    return lines_to_table(lines, ncol).astype(dtype)
+
+
+def fh_to_array(fh, n, dtype=np.float64, out=None, chunk=1048576):
+    """ Parse the next `n` whitespace separated numbers from the lines of `fh`
+
+    The lines are parsed in chunks of (approximately) `chunk` numbers directly into
+    the returned array, i.e. no Python objects are created per number.
+    The last line read is consumed entirely, also if it contains more than the
+    requested numbers.
+
+    Parameters
+    ----------
+    fh : file-like
+       an iterable of lines (`str` or `bytes`), e.g. an open file handle
+    n : int
+       number of values to read
+    dtype : numpy.dtype, optional
+       data type of the returned array
+    out : numpy.ndarray, optional
+       array to store the values in (of size `n`)
+    chunk : int, optional
+       number of values parsed in each step
+
+    Returns
+    -------
+    numpy.ndarray
+        array of `n` values
+    """
+    if out is None:
+        out = np.empty(n, dtype=dtype)
+    i = 0
+    # number of values per line (from the first line)
+    line = fh.readline()
+    if not line:
+        raise ValueError("fh_to_array could not read values, end of file reached")
+    vals = _leading_numbers(line, dtype)
+    ncol = max(vals.size, 1)
+    nr = min(vals.size, n)
+    out[:nr] = vals[:nr]
+    i += nr
+    while i < n:
+        nlines = max(1, min(chunk, n - i) // ncol)
+        if nlines * ncol < n - i < (nlines + 1) * ncol:
+            # include the trailing line
+            nlines += 1
+        lines = list(islice(fh, nlines))
+        if len(lines) == 0:
+            raise ValueError(f"fh_to_array could only read {i} of {n} values, end of file reached")
+        vals = _leading_numbers(lines[0][:0].join(lines), dtype)
+        nr = min(vals.size, n - i)
+        out[i:i+nr] = vals[:nr]
+        i += nr
+    return out
@@ -209,10 +209,7 @@ class pdbSile(Sile):
         # Try and go to the first model record
         in_model, l = self._step_record('MODEL')
 
-        idx = []
-        tags = []
-        xyz = []
-        Z = []
+        lines = []
         if in_model:
             l = self.readline()
             def is_atom(line):
@@ -221,28 +218,29 @@ class pdbSile(Sile):
                 return l.startswith('ENDMDL') or l == ''
             while not is_end_model(l):
                 if is_atom(l):
-                    idx.append(int(l[6:11]))
-                    tags.append(l[12:16].strip())
-                    xyz.append([float(l[30:38]), float(l[38:46]), float(l[46:54])])
-                    Z.append(l[76:78].strip())
+                    # pad to the fixed record width
+                    lines.append(l.rstrip('\n').ljust(80)[:80])
                 l = self.readline()
 
+        # Convert the fixed-width columns in one go
+        rec = np.frombuffer(''.join(lines).encode('ascii', 'replace'), dtype='S1').reshape(-1, 80)
+        def column(start, end):
+            return np.ascontiguousarray(rec[:, start:end]).view(f'S{end - start}').ravel()
+
+        idx = column(6, 11).astype(np.int64)
+        xyz = np.ascontiguousarray(rec[:, 30:54]).view('S8').astype(np.float64)
+        # The atom is defined by the element (Z) and the name (tag)
+        keys = np.char.add(column(76, 78), column(12, 16))
+
         # First sort all atoms according to the idx array
-        idx = np.array(idx)
-        idx = np.argsort(idx)
-        xyz = np.array(xyz)[idx, :]
-        tags = [tags[i] for i in idx]
-        Z = [Z[i] for i in idx]
-
-        # Create the atom list
-        atoms = Atoms(Atom(Z[0], tag=tags[0]), na=len(Z))
-        for i, a in enumerate(map(Atom, Z, tags)):
-            try:
-                s = atoms.index(a)
-            except:
-                s = len(atoms.atom)
-                atoms._atom.append(a)
-            atoms._specie[i] = s
+        idx = np.argsort(idx, kind='stable')
+        xyz = xyz[idx, :]
+        keys = keys[idx]
+
+        # Create the atom list by unique atoms
+        ukeys, inv = np.unique(keys, return_inverse=True)
+        uatom = [Atom(k[:2].decode().strip(), tag=k[2:].decode().strip()) for k in ukeys]
+        atoms = Atoms([uatom[i] for i in inv.ravel()])
 
         return Geometry(xyz, atoms, sc=sc)
 
@@ -50,6 +50,17 @@ def _listify_str(arg):
     return arg
 
 
+def _tolabel(label):
+    """ Normalize fdf labels (case, `_`, `-` and `.` are irrelevant) """
+    return label.lower().replace('_', '').replace('-', '').replace('.', '')
+
+
+def _file_stamp(f):
+    """ Modification stamp of a file used to track changes """
+    st = f.stat()
+    return st.st_mtime_ns, st.st_size
+
+
 def _track(method, msg):
     if method.__self__.track:
         info(f"{method.__self__.__class__.__name__}.{method.__name__}: {msg}")
@@ -91,84 +102,58 @@ class fdfSileSiesta(SileSiesta):
         """ Setup the `fdfSileSiesta` after initialization """
         self._comment = ['#', '!', ';']
 
-        # List of parent file-handles used while reading
-        # This is because fdf enables inclusion of other files
-        self._parent_fh = []
-
         # Public key for printing information about where stuff comes from
         self.track = kwargs.get("track", False)
 
-    def _pushfile(self, f):
-        if self.dir_file(f).is_file():
-            self._parent_fh.append(self.fh)
-            self.fh = self.dir_file(f).open(self._mode)
-        else:
-            warn(str(self) + f' is trying to include file: {f} but the file seems not to exist? Will disregard file!')
-
-    def _popfile(self):
-        if len(self._parent_fh) > 0:
-            self.fh.close()
-            self.fh = self._parent_fh.pop()
-            return True
-        return False
+        # Index of labels, created upon first look-up
+        self._index = None
+        self._index_stamp = {}
+        self._includes = []
 
-    def _seek(self):
-        """ Closes all files, and starts over from beginning """
-        try:
-            while self._popfile():
-                pass
-            self.fh.seek(0)
-        except:
-            pass
-
-    @sile_fh_open()
     def includes(self):
         """ Return a list of all files that are *included* or otherwise necessary for reading the fdf file """
-        self._seek()
-        # In FDF files, %include marks files that progress
-        # down in a tree structure
-        def add(f):
-            f = self.dir_file(f)
-            if f not in includes:
-                includes.append(f)
-        # List of includes
-        includes = []
-
-        l = self.readline()
-        while l != '':
-            ls = l.split()
-            if '%include' == ls[0].lower():
-                add(ls[1])
-                self._pushfile(ls[1])
-            elif '<' in ls:
-                # TODO, in principle the < could contain
-                # include if this line is not a %block.
-                add(ls[ls.index('<')+1])
-            l = self.readline()
-            while l == '':
-                # last line of file
-                if self._popfile():
-                    l = self.readline()
-                else:
-                    break
+        self._update_index()
+        return list(self._includes)
 
-        return includes
+    def _update_index(self):
+        """ (Re-)create the label index if any of the parsed files have changed """
+        if self._index is not None:
+            try:
+                if all(_file_stamp(f) == stamp for f, stamp in self._index_stamp.items()):
+                    return
+            except OSError:
+                pass
+        self._index_stamp = {}
+        self._includes = []
+        self._index = self._parse_index(self.dir_file(), self._includes)
 
-    @sile_fh_open()
-    def _read_label(self, label):
-        """ Try and read the first occurence of a key
+    def _parse_index(self, f, includes=None, index=None):
+        """ Tokenize the fdf file `f` (and included files) into a label index
 
-        This will take care of blocks, labels and piped in labels
+        Only the first occurence of a label is stored. The index maps the
+        case (and ``_-.``) normalized label to a tuple of the value and the file
+        containing the label.
 
         Parameters
         ----------
-        label : str
-           label to find in the fdf file
+        f : pathlib.Path
+           file to parse
+        includes : list, optional
+           list to which included (and piped) files are appended
+        index : dict, optional
+           index to add labels to
         """
-        self._seek()
-        def tolabel(label):
-            return label.lower().replace('_', '').replace('-', '').replace('.', '')
-        labell = tolabel(label)
+        if index is None:
+            index = {}
+        self._index_stamp[f] = _file_stamp(f)
+
+        def add_include(inc):
+            if includes is not None and inc not in includes:
+                includes.append(inc)
+
+        def add(label, value):
+            if label not in index:
+                index[label] = (value, f)
 
         def valid_line(line):
             ls = line.strip()
@@ -176,77 +161,90 @@ class fdfSileSiesta(SileSiesta):
                 return False
             return not (ls[0] in self._comment)
 
-        def process_line(line):
-            # Split line by spaces
-            ls = line.split()
-            if len(ls) == 0:
-                return None
+        with f.open('r') as fh:
+            lines = fh.readlines()
 
-            # Make a lower equivalent of ls
-            lsl = list(map(tolabel, ls))
+        it = iter(lines)
+        for line in it:
+            if starts_with_list(line, self._comment):
+                continue
+            ls = line.split('#')[0].split()
+            if len(ls) == 0:
+                continue
+            lsl = list(map(_tolabel, ls))
 
             # Check if there is a pipe in the line
+            if '<' in ls:
+                add_include(self.dir_file(ls[ls.index('<')+1]))
             if '<' in lsl:
                 idx = lsl.index('<')
-                # Now there are two cases
+                pipe = self.dir_file(ls[idx+1])
 
                 # 1. It is a block, in which case
                 #    the full block is piped into the label
                 #    %block Label < file
-                if lsl[0] == '%block' and lsl[1] == labell:
-                    # Correct line found
-                    # Read the file content, removing any empty and/or comment lines
-                    lines = self.dir_file(ls[3]).open('r').readlines()
-                    return [l.strip() for l in lines if valid_line(l)]
+                if lsl[0] == '%block':
+                    if lsl[1] not in index and pipe.is_file():
+                        self._index_stamp[pipe] = _file_stamp(pipe)
+                        with pipe.open('r') as pfh:
+                            add(lsl[1], [l.strip() for l in pfh.readlines() if valid_line(l)])
 
                 # 2. There are labels that should be read from a subsequent file
                 #    Label1 Label2 < other.fdf
-                if labell in lsl[:idx]:
-                    # Valid line, read key from other.fdf
-                    return fdfSileSiesta(self.dir_file(ls[idx+1]), base=self._directory)._read_label(label)
-
-                # It is not in this line, either key is
-                # on the RHS of <, or the key could be "block". Say.
-                return None
-
-            # The last case is if the label is the first word on the line
-            # In that case we have found what we are looking for
-            if lsl[0] == labell:
-                return (' '.join(ls[1:])).strip()
+                elif any(label not in index for label in lsl[:idx]) and pipe.is_file():
+                    sub = self._parse_index(pipe)
+                    for label in lsl[:idx]:
+                        if label in sub and label not in index:
+                            index[label] = sub[label]
 
             elif lsl[0] == '%block':
-                if lsl[1] == labell:
-                    # Read in the block content
-                    lines = []
-
-                    # Now read lines
-                    l = self.readline().strip()
-                    while not tolabel(l).startswith('%endblock'):
-                        if len(l) > 0:
-                            lines.append(l)
-                        l = self.readline().strip()
-                    return lines
+                # Read in the block content
+                block = []
+                for l in it:
+                    if starts_with_list(l, self._comment):
+                        continue
+                    l = l.strip()
+                    if _tolabel(l).startswith('%endblock'):
+                        break
+                    if len(l) > 0:
+                        block.append(l)
+                add(lsl[1], block)
 
             elif lsl[0] == '%include':
+                inc = self.dir_file(ls[1])
+                add_include(inc)
+                if inc.is_file():
+                    if inc not in self._index_stamp:
+                        self._parse_index(inc, includes, index)
+                else:
+                    warn(str(self) + f' is trying to include file: {inc} but the file seems not to exist? Will disregard file!')
 
-                # We have to open a new file
-                self._pushfile(ls[1])
+            else:
+                add(lsl[0], (' '.join(ls[1:])).strip())
 
-            return None
+        return index
 
-        # Perform actual reading of line
-        l = self.readline().split('#')[0]
-        if len(l) == 0:
-            return None
-        l = process_line(l)
-        while l is None:
-            l = self.readline().split('#')[0]
-            if len(l) == 0:
-                if not self._popfile():
-                    return None
-            l = process_line(l)
+    def _read_label(self, label, with_file=False):
+        """ Try and read the first occurence of a key
 
-        return l
+        This will take care of blocks, labels and piped in labels.
+        The fdf file (and included files) are parsed once into an index,
+        which is only updated when any of the files are modified.
+
+        Parameters
+        ----------
+        label : str
+           label to find in the fdf file
+        with_file : bool, optional
+           also return the file containing the label
+        """
+        self._update_index()
+        value, f = self._index.get(_tolabel(label), (None, None))
+        if isinstance(value, list):
+            value = list(value)
+        if with_file:
+            return value, f
+        return value
 
     @classmethod
     def _type(cls, value):
@@ -296,7 +294,6 @@ class fdfSileSiesta(SileSiesta):
 
         return 'n'
 
-    @sile_fh_open()
     def type(self, label):
         """ Return the type of the fdf-keyword
 
@@ -305,10 +302,8 @@ class fdfSileSiesta(SileSiesta):
         label : str
             the label to look-up
         """
-        self._seek()
         return self._type(self._read_label(label))
 
-    @sile_fh_open()
     def get(self, label, default=None, unit=None, with_unit=False):
         """ Retrieve fdf-keyword from the file
 
@@ -414,16 +409,12 @@ class fdfSileSiesta(SileSiesta):
         top_file = str(self.file)
 
         # 1. find the old value, and thus the file in which it is found
-        with self:
-            try:
-                self.get(key)
-                # Get the file of the containing data
-                top_file = str(self.fh.name)
-            except:
-                pass
-
-        # Ensure that all files are closed
-        self._seek()
+        try:
+            value_file = self._read_label(key, with_file=True)[1]
+            if value_file is not None:
+                top_file = str(value_file)
+        except OSError:
+            pass
 
         # Now we should re-read and edit the file
         lines = open(top_file, 'r').readlines()
@@ -452,6 +443,9 @@ class fdfSileSiesta(SileSiesta):
                 else:
                     fh.write(line)
 
+        # Force re-parsing the file
+        self._index = None
+
     @staticmethod
     def print(key, value):
         """ Return a string which is pretty-printing the key+value """
@@ -1,4 +1,6 @@
 import os
+import gzip
+import time
 import numpy as np
 
 from .sile import SileSiesta
@@ -6,7 +8,7 @@ from ..sile import add_sile, sile_fh_open
 
 from sisl._internal import set_module
 import sisl._array as _a
-from sisl import Geometry, Atom, SuperCell
+from sisl import Geometry, Atom, SuperCell, Trajectory
 from sisl.utils.cmd import *
 from sisl.unit.siesta import unit_convert
 
@@ -23,14 +25,108 @@ def _ensure_species(species):
     return species
 
 
+# Markers of the blocks recorded in the output file index
+_INDEX_MARKERS = {
+    'species': 'Species number:',
+    'outcoor': 'outcoor',
+    'atomic_coordinates': 'siesta: Atomic coordinates',
+    'force': 'siesta: Atomic forces',
+    'stress': 'siesta: Stress tensor',
+    'moment': 'moments: Atomic',
+    'scf': 'scf:',
+    'scf_converged': 'SCF cycle converged',
+    'completed': 'Job completed',
+}
+
+
 @set_module("sisl.io.siesta")
 class outSileSiesta(SileSiesta):
     """ Output file from Siesta
 
     This enables reading the output quantities from the Siesta output.
+
+    The output file is indexed in a single pass (the byte offsets of geometries,
+    forces, stresses etc. are recorded) such that the readers can seek directly
+    to the requested blocks. The index is updated incrementally, i.e. only
+    appended content is scanned when the file grows, see `tail`.
     """
     _job_completed = False
 
+    def _setup(self, *args, **kwargs):
+        """ Setup the `outSileSiesta` after initialization """
+        super()._setup(*args, **kwargs)
+        self._index = {key: [] for key in _INDEX_MARKERS}
+        self._index_pos = 0
+        self._index_size = -1
+
+    def _open(self):
+        if self.file.suffix == ".gz":
+            # text mode, the offsets of the index are uncompressed positions
+            self.fh = gzip.open(str(self.file), mode='rt')
+            self._line = 0
+        else:
+            super()._open()
+
+    def _update_index(self, chunk=2 ** 24):
+        """ Scan the (appended part of the) file and record offsets of the blocks
+
+        Only complete lines are indexed such that files being written may be indexed.
+        Compressed files are scanned in full (through `gzip`) whenever they change.
+        """
+        f = self.file
+        size = f.stat().st_size
+        if f.suffix == ".gz":
+            if size == self._index_size:
+                return
+            # compressed files cannot be appended, always start over
+            self._index = {key: [] for key in _INDEX_MARKERS}
+            self._index_pos = 0
+            opener = lambda: gzip.open(str(f), 'rb')
+        else:
+            if size < self._index_pos:
+                # The file has been replaced, start over
+                self._index = {key: [] for key in _INDEX_MARKERS}
+                self._index_pos = 0
+            if size == self._index_pos:
+                return
+            opener = lambda: f.open('rb')
+        self._index_size = size
+
+        markers = [(key, marker.encode()) for key, marker in _INDEX_MARKERS.items()]
+        with opener() as fh:
+            fh.seek(self._index_pos)
+            pos = self._index_pos
+            rest = b''
+            while True:
+                data = fh.read(chunk)
+                if len(data) == 0:
+                    break
+                buf = rest + data
+                # only process complete lines
+                end = buf.rfind(b'\n') + 1
+                rest = buf[end:]
+                buf = buf[:end]
+                found = []
+                for key, marker in markers:
+                    i = buf.find(marker)
+                    while i >= 0:
+                        start = buf.rfind(b'\n', 0, i) + 1
+                        stop = buf.find(b'\n', i)
+                        found.append((start, key, buf[start:stop].decode(errors='replace')))
+                        i = buf.find(marker, stop)
+                # ensure the order of the lines
+                for start, key, line in sorted(found):
+                    self._index[key].append((pos + start, line))
+                pos += end
+        self._index_pos = pos
+        if len(self._index['completed']) > 0:
+            self._job_completed = True
+
+    def _offsets(self, key):
+        """ Updated list of offsets and lines of the `key` blocks in the file """
+        self._update_index()
+        return self._index[key]
+
     def readline(self):
         line = super().readline()
         if 'Job completed' in line:
@@ -53,12 +149,12 @@ class outSileSiesta(SileSiesta):
         It returns an array of `Atom` objects which may easily be indexed.
         """
 
+        offsets = self._offsets('species')
+        if len(offsets) == 0:
+            # We fake the species by direct atomic number
+            return None
+        self.fh.seek(offsets[0][0])
         line = self.readline()
-        while not 'Species number:' in line:
-            line = self.readline()
-            if line == '':
-                # We fake the species by direct atomic number
-                return None
 
         atom = []
         while 'Species number:' in line:
@@ -78,6 +174,9 @@ class outSileSiesta(SileSiesta):
         line = self.readline()
         while not 'outcell: Unit cell vectors' in line:
             line = self.readline()
+            if line == '':
+                # not written (yet)
+                return None
 
         Ang = 'Ang' in line
 
@@ -100,7 +199,16 @@ class outSileSiesta(SileSiesta):
         """ Wrapper for reading the geometry as in the outcoor output """
         species = _ensure_species(species)
 
-        # Now we have outcoor
+        xyz_spec_cell = self._read_outcoor(line)
+        if xyz_spec_cell is None:
+            return None
+        xyz, spec, cell = xyz_spec_cell
+
+        # Assign the correct species
+        return Geometry(xyz, [species[ia - 1] for ia in spec], sc=cell)
+
+    def _read_outcoor(self, line):
+        """ Read coordinates, species indices and cell of the outcoor block """
         scaled = 'scaled' in line
         fractional = 'fractional' in line
         Ang = 'Ang' in line
@@ -117,6 +225,8 @@ class outSileSiesta(SileSiesta):
 
         # in outcoor we know it is always just after
         cell = self._read_supercell_outcell()
+        if cell is None:
+            return None
         xyz = _a.arrayd(xyz)
 
         # Now create the geometry
@@ -130,10 +240,7 @@ class outSileSiesta(SileSiesta):
         elif not Ang:
             xyz *= Bohr2Ang
 
-        # Assign the correct species
-        geom = Geometry(xyz, [species[ia - 1] for ia in spec], sc=cell)
-
-        return geom
+        return xyz, spec, cell
 
     def _read_geometry_atomic(self, line, species=None):
         """ Wrapper for reading the geometry as in the outcoor output """
@@ -216,31 +323,64 @@ class outSileSiesta(SileSiesta):
                 return 2, self._read_geometry_atomic(line, species)
 
         # Read until a coordinate block is found
-        geom0 = None
         mds = []
 
-        if all or last:
-            # we need to read through all things!
-            while True:
-                coord, geom = next_geom()
-                if coord == 0:
-                    break
-                if coord == 2:
-                    geom0 = geom
-                else:
-                    mds.append(geom)
+        def read_geom(offset):
+            self.fh.seek(offset)
+            return next_geom()[1]
 
+        if last:
+            # Seek directly to the last geometry
+            for key in ('outcoor', 'atomic_coordinates'):
+                offsets = self._offsets(key)
+                if len(offsets) > 0:
+                    return read_geom(offsets[-1][0])
+            return None
+
+        if all:
             # Since the user requests only the MD geometries
             # we only return those
-            if last:
-                if len(mds) > 0:
-                    return mds[-1]
-                return geom0
+            for offset, _ in self._offsets('outcoor'):
+                geom = read_geom(offset)
+                if geom is not None:
+                    mds.append(geom)
             return mds
 
         # just read the next geometry we hit
         return next_geom()[1]
 
+    @sile_fh_open()
+    def read_trajectory(self):
+        """ Reads all MD geometries from the Siesta output file as a trajectory
+
+        Contrary to ``read_geometry(all=True)`` no intermediate `Geometry` objects
+        are created, the coordinates and cells are stored in contiguous arrays.
+
+        Returns
+        -------
+        Trajectory or None
+            all geometries of the MD-runs, None if no geometries are found
+        """
+        species = _ensure_species(self.read_species())
+
+        offsets = self._offsets('outcoor')
+        xyz = []
+        cell = []
+        spec = None
+        for offset, _ in offsets:
+            self.fh.seek(offset)
+            xyz_spec_cell = self._read_outcoor(self.readline())
+            if xyz_spec_cell is None:
+                break
+            if spec is None:
+                spec = xyz_spec_cell[1]
+            xyz.append(xyz_spec_cell[0])
+            cell.append(xyz_spec_cell[2].cell)
+
+        if spec is None:
+            return None
+        return Trajectory(xyz, [species[ia - 1] for ia in spec], cell)
+
     @sile_fh_open()
     def read_force(self, last=True, all=False, total=False, max=False):
         """ Reads the forces from the Siesta output file
@@ -338,18 +478,23 @@ class outSileSiesta(SileSiesta):
                 return Fs.ravel()[0]
             return Fs
 
-        if all or last:
+        if last:
+            # The final summary is skipped by next_force
+            for offset, _ in reversed(self._offsets('force')):
+                self.fh.seek(offset)
+                F = next_force()
+                if F is not None:
+                    return return_forces(F)
+            return None
+
+        if all:
             # list of all forces
             Fs = []
-            while True:
+            for offset, _ in self._offsets('force'):
+                self.fh.seek(offset)
                 F = next_force()
-                if F is None:
-                    break
-                Fs.append(F)
-
-            if last:
-                return return_forces(Fs[-1])
-
+                if F is not None:
+                    Fs.append(F)
             return return_forces(Fs)
 
         return return_forces(next_force())
@@ -397,11 +542,14 @@ class outSileSiesta(SileSiesta):
         Ss = []
 
         if all or last:
-            while True:
-                S = next_stress()
-                if S is None:
-                    break
-                Ss.append(S)
+            offsets = [offset for offset, line in self._offsets('stress') if key in line]
+            if last:
+                if len(offsets) == 0:
+                    return None
+                offsets = offsets[-1:]
+            for offset in offsets:
+                self.fh.seek(offset)
+                Ss.append(next_stress())
 
             if last:
                 return Ss[-1]
@@ -430,6 +578,12 @@ class outSileSiesta(SileSiesta):
            If `True` `last` is ignored
         """
 
+        if last:
+            offsets = self._offsets('moment')
+            if len(offsets) == 0:
+                return None
+            self.fh.seek(offsets[-1][0])
+
         # Read until outcoor is found
         itt = iter(self)
         while not 'moments: Atomic' in next(itt):
@@ -490,6 +644,88 @@ class outSileSiesta(SileSiesta):
             return _a.arrayd(moments)
         return moments
 
+    def tail(self, quantity='geometry', poll=1., timeout=None, **kwargs):
+        """ Follow a (running) calculation and yield the quantity for each new MD step
+
+        Only appended content of the output file is scanned for every poll, i.e. the
+        file is never re-read. The iteration stops when the calculation has completed,
+        or when no new data has been written within `timeout` seconds.
+
+        Parameters
+        ----------
+        quantity : {'geometry', 'force', 'stress'}
+           quantity to follow
+        poll : float, optional
+           seconds to wait between checking the file for new content
+        timeout : float, optional
+           stop following when no new data has arrived for this amount of seconds.
+           Defaults to follow until the calculation has completed.
+        **kwargs :
+           passed to the reader of the quantity, e.g. ``key='total'`` for stresses
+
+        Examples
+        --------
+        >>> out = outSileSiesta('RUN.out')
+        >>> for force in out.tail('force', timeout=3600):
+        ...     print(np.abs(force).max())
+
+        Yields
+        ------
+        Geometry or numpy.ndarray
+            the quantity for each new MD step
+        """
+        quantity = quantity.lower()
+        species = None
+        if quantity == 'geometry':
+            key, read = 'outcoor', lambda: self._read_geometry_outcoor(self.readline(), species)
+        elif quantity == 'force':
+            key, read = 'force', lambda: self.read_force(last=False, all=False, **kwargs)
+        elif quantity == 'stress':
+            stress_key = kwargs.get('key', 'static')
+            key, read = 'stress', lambda: self.read_stress(last=False, all=False, **kwargs)
+        else:
+            raise ValueError(f"{self.__class__.__name__}.tail does not know how to follow {quantity}.")
+
+        i = 0
+        t0 = time.time()
+        while True:
+            completed = self.job_completed
+            offsets = self._offsets(key)
+            if key == 'stress':
+                offsets = [o for o in offsets if stress_key in o[1]]
+            new = False
+            with self:
+                if quantity == 'geometry' and i < len(offsets) and species is None:
+                    species = self.read_species()
+                while i < len(offsets):
+                    # compressed files are not being written
+                    size = np.inf if self.file.suffix == ".gz" else self.file.stat().st_size
+                    self.fh.seek(offsets[i][0])
+                    try:
+                        value = read()
+                    except (ValueError, IndexError):
+                        # partially written lines
+                        if self.job_completed or self.fh.tell() < size:
+                            raise
+                        break
+                    # The block is only complete if the reader stopped before
+                    # the end of the file (the terminator is followed by more content).
+                    # Otherwise it is still being written and is re-read at the next poll.
+                    if not (self.job_completed or self.fh.tell() < size):
+                        break
+                    i += 1
+                    if value is not None:
+                        new = True
+                        yield value
+            if completed:
+                break
+            if new:
+                t0 = time.time()
+            elif timeout is not None and time.time() - t0 > timeout:
+                break
+            if not self.job_completed:
+                time.sleep(poll)
+
     def read_data(self, *args, **kwargs):
         """ Read specific content in the Siesta out file
 
@@ -638,6 +874,28 @@ class outSileSiesta(SileSiesta):
         }
         md = []
         scf = []
+
+        if imd is not None and key.lower() == 'scf':
+            # Seek directly to the requested MD step, each MD step is the group of
+            # scf-lines ending with a converged SCF cycle.
+            # TranSiesta (ts-scf) information is read in a full pass since the
+            # ts-q header is only written once.
+            converged = _a.arrayl([offset for offset, _ in self._offsets('scf_converged')])
+            lines = _a.arrayl([offset for offset, line in self._offsets('scf')
+                               if line.strip().startswith('scf:')] + [np.iinfo(np.int64).max])
+            # first scf-line after each of the previous converged cycles
+            prev = np.append(-1, converged)[:-1].astype(np.int64)
+            first = lines[np.searchsorted(lines, prev, side='right')]
+            starts = first[first < converged]
+            if len(starts) > 0:
+                if imd > 0:
+                    istart = min(imd, len(starts)) - 1
+                else:
+                    istart = max(len(starts) + imd, 0)
+                self.fh.seek(int(starts[istart]))
+                # only read this MD step
+                imd = 1
+
         for line in self:
             parse_next(line, d)
             if d['_found_iscf']:
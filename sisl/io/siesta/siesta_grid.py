@@ -3,7 +3,7 @@ from numbers import Integral
 import numpy as np
 
 from .sile import SileCDFSiesta
-from ..sile import add_sile, sile_raise_write
+from ..sile import add_sile, sile_raise_write, SileError
 
 from sisl._internal import set_module
 from sisl.messages import info
@@ -50,6 +50,10 @@ class gridncSileSiesta(SileCDFSiesta):
 
         Enables the reading and processing of the grids created by Siesta
 
+        The grid is read in chunks of planes (along the 3rd lattice vector) and the
+        spin components and units are combined for each chunk, so only the returned
+        grid is allocated in full.
+
         Parameters
         ----------
         spin : int or array_like, optional
@@ -58,6 +62,21 @@ class gridncSileSiesta(SileCDFSiesta):
             the name for the grid-function (do not supply for standard Siesta output)
         geometry: Geometry, optional
             add the Geometry to the Grid
+        region : tuple of slice or int, optional
+            only read part of the grid, one slice (or index) per lattice vector, e.g.
+            ``region=(slice(None), slice(None), slice(10, 20))`` reads planes 10 to 19 along
+            the 3rd lattice vector (negative steps are not allowed). The super cell of the returned
+            grid is reduced (and shifted) accordingly, and the boundary conditions of the cut
+            directions are open.
+        chunk : int, optional
+            (approximate) number of grid points read at a time
+
+        Examples
+        --------
+        Read the spin-polarization of the lower half (along the 3rd lattice vector) of a grid
+
+        >>> sile = gridncSileSiesta("Rho.grid.nc")
+        >>> pol = sile.read_grid([1, -1], region=(slice(None), slice(None), slice(0, 50)))
         """
         # Default to *index* variable
         spin = kwargs.get('index', spin)
@@ -95,41 +114,98 @@ class gridncSileSiesta(SileCDFSiesta):
         else:
             show_info = False
 
-        # Swap as we swap back in the end
-        sc = self.read_supercell().swapaxes(0, 2)
+        sc = self.read_supercell()
 
-        # Create the grid
-        nx = len(self._dimension('n1'))
-        ny = len(self._dimension('n2'))
-        nz = len(self._dimension('n3'))
+        # Size of the grid
+        shape = [len(self._dimension('n1')),
+                 len(self._dimension('n2')),
+                 len(self._dimension('n3'))]
 
         if name is None:
             v = self._variable('gridfunc')
         else:
             v = self._variable(name)
 
-        # Create the grid, Siesta uses periodic, always
-        grid = Grid([nz, ny, nx], bc=Grid.PERIODIC, sc=sc, dtype=v.dtype,
-                    geometry=kwargs.get("geometry", None))
-
+        # Spin components to read and their weights (including the unit)
         if v.ndim == 3:
-            grid.grid[:, :, :] = v[:, :, :] * unit
+            weights = [(None, unit)]
         elif isinstance(spin, Integral):
-            grid.grid[:, :, :] = v[spin, :, :, :] * unit
+            weights = [(spin, unit)]
         else:
             if len(spin) > v.shape[0]:
                 raise SileError(f"{self.__class__.__name__}.read_grid requires spin to be an integer or "
                                 "an array of length equal to the number of spin components.")
-            grid.grid[:, :, :] = v[0, :, :, :] * spin[0] * unit
-            for i, scale in enumerate(spin[1:]):
-                grid.grid[:, :, :] += v[1+i, :, :, :] * scale * unit
+            weights = [(i, w * unit) for i, w in enumerate(spin) if w != 0.]
+            if len(weights) == 0:
+                weights = [(0, 0.)]
+
+        # Region to read (per lattice vector)
+        region = kwargs.get("region", None)
+        if region is None:
+            region = (slice(None),) * 3
+        if len(region) != 3:
+            raise ValueError(f"{self.__class__.__name__}.read_grid requires region to have a slice per lattice vector")
+        def to_slice(r, n):
+            if isinstance(r, Integral):
+                if not -n <= r < n:
+                    raise IndexError(f"{self.__class__.__name__}.read_grid region index {r} is out of bounds for {n} grid points")
+                r %= n
+                return slice(r, r + 1)
+            if r.step is not None and r.step < 0:
+                raise ValueError(f"{self.__class__.__name__}.read_grid does not allow negative steps in region")
+            return r
+
+        region = [to_slice(r, n) for r, n in zip(region, shape)]
+        ranges = [range(*r.indices(n)) for r, n in zip(region, shape)]
+        region = [slice(r.start, r.stop, r.step) for r in ranges]
+        if any(len(r) == 0 for r in ranges):
+            raise ValueError(f"{self.__class__.__name__}.read_grid got an empty region")
+
+        bc = np.full([3, 2], Grid.PERIODIC, dtype=np.int32)
+        cell = sc.cell.copy()
+        origo = sc.origo.copy()
+        for i, (r, n) in enumerate(zip(ranges, shape)):
+            if len(r) != n:
+                # Only part of this direction
+                bc[i, :] = Grid.OPEN
+                origo += cell[i] * r.start / n
+                cell[i] *= r.step * len(r) / n
+        sc = SuperCell(cell, nsc=sc.nsc, origo=origo)
+
+        # Create the grid, Siesta uses periodic, always
+        grid = Grid([len(r) for r in ranges], bc=bc, sc=sc, dtype=v.dtype,
+                    geometry=kwargs.get("geometry", None))
+        values = grid.grid
+
+        # Read chunks of planes along the 3rd lattice vector, the file order is (n3, n2, n1)
+        nz = len(ranges[2])
+        nplanes = max(1, kwargs.get("chunk", 2 ** 22) // (len(ranges[0]) * len(ranges[1])))
+        for z0 in range(0, nz, nplanes):
+            z1 = min(z0 + nplanes, nz)
+            sz = slice(ranges[2][z0], ranges[2][z1 - 1] + 1, region[2].step)
+            buf = None
+            for ispin, w in weights:
+                if ispin is None:
+                    dat = v[sz, region[1], region[0]]
+                else:
+                    dat = v[ispin, sz, region[1], region[0]]
+                if buf is None:
+                    buf = dat
+                    if w != 1.:
+                        buf *= w
+                else:
+                    dat *= w
+                    buf += dat
+                del dat
+            # Swap to the x, y, z order
+            values[:, :, z0:z1] = buf.T
+            del buf
+
         if show_info:
             info(f"{self.__class__.__name__}.read_grid cannot determine the units of the grid. "
                  "The units may not be in sisl units.")
 
-        # Read the grid, we want the z-axis to be the fastest
-        # looping direction, hence x,y,z == 0,1,2
-        return grid.swapaxes(0, 2)
+        return grid
 
     def write_grid(self, grid, spin=0, nspin=None, **kwargs):
         """ Write a grid to the grid.nc file """
@@ -214,6 +214,17 @@ def test_get_block(sisl_tmp):
     assert 'block' in fdf.print("MyBlock", fdf.get("MyBlock"))
 
 
+def test_get_block_comments(sisl_tmp):
+    # comment lines in blocks are not returned (as in earlier versions),
+    # trailing comments on block lines are kept
+    f = sisl_tmp('file.fdf', _dir)
+    with open(f, 'w') as fh:
+        fh.write('%block MyBlock\n  1 2\n# comment\n  ! comment\n;comment\n\n  3 4 # trailing\n%endblock\n')
+
+    fdf = fdfSileSiesta(f)
+    assert fdf.get('MyBlock') == ['1 2', '3 4 # trailing']
+
+
 def test_include(sisl_tmp):
     f = sisl_tmp('file.fdf', _dir)
     with open(f, 'w') as fh:
@@ -282,6 +293,32 @@ def test_include(sisl_tmp):
     assert fdf.get('Hello') == [l.replace('\n', '').strip() for l in ll]
 
 
+def test_include_modified(sisl_tmp):
+    f = sisl_tmp('file.fdf', _dir)
+    with open(f, 'w') as fh:
+        fh.write('Flag1 date\n')
+        fh.write('%include file2.fdf\n')
+        fh.write('%block Hello\n  line\n# comment\n%endblock Hello\n')
+
+    file2 = sisl_tmp('file2.fdf', _dir)
+    with open(file2, 'w') as fh:
+        fh.write('Flag2 date2\n')
+
+    fdf = fdfSileSiesta(f, base=sisl_tmp.getbase())
+    assert fdf.get('Flag2') == 'date2'
+    assert fdf.get('Hello') == ['line']
+    # returned blocks are copies
+    fdf.get('Hello').append('other')
+    assert fdf.get('Hello') == ['line']
+    assert fdf.type('Hello') == 'B'
+
+    # modifying an included file is tracked
+    with open(file2, 'w') as fh:
+        fh.write('Flag2 date-modified\n')
+    assert fdf.get('Flag2') == 'date-modified'
+    assert fdf.get('Flag1') == 'date'
+
+
 def test_xv_preference(sisl_tmp):
     g = geom.graphene()
     g.write(sisl_tmp('file.fdf', _dir))
@@ -30,3 +30,50 @@ def test_si_pdos_kgrid_grid_fdf(sisl_files):
     VT = si.read_grid("VT", order='bin')
     TotPot = si.read_grid("totalpotential", order='bin')
     assert np.allclose(VT.grid, TotPot.grid)
+
+
+def test_grid_nc_spin_region(sisl_tmp):
+    pytest.importorskip("netCDF4")
+    from sisl.io.siesta.siesta_grid import gridncSileSiesta, Bohr2Ang
+    f = sisl_tmp('Rho.grid.nc', _dir)
+    sc = sisl.SuperCell([[4., 0, 0], [1., 3., 0], [0, 0, 5.]])
+    up = sisl.Grid([6, 7, 8], sc=sc)
+    up.grid = np.random.rand(*up.shape)
+    down = up.copy()
+    down.grid = np.random.rand(*up.shape)
+    with gridncSileSiesta(f, 'w') as sile:
+        sile.write_grid(up, spin=0, nspin=2)
+        sile.write_grid(down, spin=1, nspin=2)
+
+    unit = Bohr2Ang ** -3
+    sile = gridncSileSiesta(f)
+    grid = sile.read_grid()
+    assert np.allclose(grid.grid, up.grid * unit)
+    assert np.allclose(grid.cell, sc.cell)
+    grid = sile.read_grid([1, -1], chunk=10)
+    assert np.allclose(grid.grid, (up.grid - down.grid) * unit)
+    grid = sile.read_grid(index=[0, 0.5], chunk=10)
+    assert np.allclose(grid.grid, down.grid * unit / 2)
+
+    region = (slice(1, 4), 2, slice(2, None, 3))
+    grid = sile.read_grid(1, region=region, chunk=5)
+    assert grid.shape == (3, 1, 2)
+    assert np.allclose(grid.grid, down.grid[1:4, 2:3, 2::3] * unit)
+    assert np.all(grid.bc == sisl.Grid.OPEN)
+    # the grid points are at the same positions
+    assert np.allclose(grid.dcell[0], up.dcell[0])
+    assert np.allclose(grid.dcell[2], up.dcell[2] * 3)
+    assert np.allclose(grid.sc.origo, up.index2xyz([1, 2, 2]))
+
+    # negative indices count from the end
+    grid = sile.read_grid(1, region=(slice(None), -1, -3))
+    assert grid.shape == (6, 1, 1)
+    assert np.allclose(grid.grid, down.grid[:, -1:, -3:-2] * unit)
+    assert np.allclose(grid.sc.origo, up.index2xyz([0, 6, 5]))
+    with pytest.raises(IndexError):
+        sile.read_grid(region=(slice(None), 7, slice(None)))
+    with pytest.raises(ValueError):
+        sile.read_grid(region=(slice(None), slice(None), slice(None, None, -1)))
+
+    with pytest.raises(sisl.io.SileError):
+        sile.read_grid([1, 1, 1])
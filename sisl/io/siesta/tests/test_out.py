@@ -1,4 +1,7 @@
 import sys
+import gzip
+import threading
+from io import StringIO
 import pytest
 import os.path as osp
 import sisl
@@ -105,3 +108,196 @@ def test_md_nose_out_dataframe(sisl_files):
     assert df.index.names == ["imd", "iscf"]
     df = out.read_scf(iscf=None, imd=-1, as_dataframe=True)
     assert df.index.names == ["iscf"]
+
+
+def _write_md_out(fh, steps, start=0, completed=True):
+    if start == 0:
+        fh.write("Species number:   1  Atomic number:    6 Label: C\n\n")
+        fh.write("siesta: Atomic coordinates (Bohr) and species\n")
+        fh.write("siesta:      0.00000   0.00000   0.00000  1        1\n")
+        fh.write("siesta:      2.68340   0.00000   0.00000  1        2\n\n")
+    for i in range(start, steps):
+        fh.write(f"                     ====================================\n")
+        fh.write(f"                        Begin MD step = {i + 1}\n\n")
+        fh.write("siesta: Stress tensor (static) (eV/Ang**3):\n")
+        for j in range(3):
+            fh.write(f"siesta:   {i:.6f} 0.0 0.0\n")
+        fh.write("siesta: Atomic forces (eV/Ang):\n")
+        fh.write(f"     1    {i:.6f}    0.000000    0.000000\n")
+        fh.write(f"     2    {-i:.6f}    0.000000    0.000000\n")
+        fh.write("----------------------------------------\n")
+        fh.write("   Tot    0.000000    0.000000    0.000000\n")
+        fh.write("----------------------------------------\n")
+        fh.write(f"   Max    {i:.6f}\n")
+        fh.write(f"   Res    {i:.6f}    sqrt( Sum f_i^2 / 3N )\n")
+        fh.write("----------------------------------------\n\n")
+        fh.write("outcoor: Atomic coordinates (Ang):\n")
+        fh.write(f"    {i * 0.1:.8f}    0.00000000    0.00000000   1       1  C\n")
+        fh.write("    1.42000000    0.00000000    0.00000000   1       2  C\n\n")
+        fh.write("outcell: Unit cell vectors (Ang):\n")
+        fh.write("        2.130000    1.229756    0.000000\n")
+        fh.write("        2.130000   -1.229756    0.000000\n")
+        fh.write("        0.000000    0.000000   10.000000\n\n")
+    if completed:
+        fh.write("siesta: Atomic forces (eV/Ang):\n")
+        fh.write("siesta:      1    0.000000    0.000000    0.000000\n")
+        fh.write("siesta: ----------------------------------------\n")
+        fh.write("siesta: Stress tensor (static) (eV/Ang**3):\n")
+        for j in range(3):
+            fh.write(f"siesta:   1.0 0.0 0.0\n")
+        fh.write("\n>> End of run:  1-JAN-2020  00:00:00\nJob completed\n")
+
+
+def test_md_index(sisl_tmp):
+    f = sisl_tmp('md.out', _dir)
+    with open(f, 'w') as fh:
+        _write_md_out(fh, 5)
+
+    out = outSileSiesta(f)
+    geoms = out.read_geometry(all=True)
+    assert len(geoms) == 5
+    assert geoms[-1].xyz[0, 0] == pytest.approx(0.4)
+    assert out.read_geometry().xyz[0, 0] == pytest.approx(0.4)
+    assert out.job_completed
+
+    F = out.read_force(all=True)
+    assert F.shape == (5, 2, 3)
+    assert np.allclose(F[:, 0, 0], np.arange(5))
+    assert np.allclose(out.read_force(), F[-1])
+    assert np.allclose(out.read_force(all=True, max=True), np.arange(5))
+
+    S = out.read_stress(all=True)
+    # the last static stress (final summary) is removed
+    assert len(S) == 5
+    assert np.allclose(out.read_stress()[:, 0], 1.)
+
+
+def test_md_index_gz(sisl_tmp):
+    f = sisl_tmp('md.out.gz', _dir)
+    with gzip.open(f, 'wt') as fh:
+        _write_md_out(fh, 5)
+
+    out = sisl.get_sile(f)
+    assert isinstance(out, outSileSiesta)
+    F = out.read_force(all=True)
+    assert F.shape == (5, 2, 3)
+    assert np.allclose(F[:, 0, 0], np.arange(5))
+    assert out.read_geometry().xyz[0, 0] == pytest.approx(0.4)
+    assert out.job_completed
+
+
+def _write_scf_out(fh, nscf):
+    for imd, n in enumerate(nscf):
+        fh.write(f"                        Begin MD step = {imd + 1}\n")
+        fh.write("   iscf     Eharris(eV)        E_KS(eV)     FreeEng(eV)     dDmax    Ef(eV) dHmax(eV)\n")
+        for i in range(n):
+            fh.write(f"   scf: {i + 1} {-100 - imd:.4f} {-100 - i:.4f} {-100 - i:.4f} {0.1 / (i + 1):.4f} -3.0 0.01\n")
+        fh.write(f"\nSCF cycle converged after {n} iterations\n\n")
+        fh.write("siesta: E_KS(eV) =           -100.0000\n\n")
+
+
+def test_scf_imd_index(sisl_tmp):
+    f = sisl_tmp('scf.out', _dir)
+    nscf = [3, 5, 2, 4]
+    with open(f, 'w') as fh:
+        _write_scf_out(fh, nscf)
+
+    out = outSileSiesta(f)
+    scf_last = out.read_scf()
+    scf_all = out.read_scf(iscf=None)
+    assert len(scf_last) == len(nscf)
+    assert len(out._offsets('scf_converged')) == len(nscf)
+    for imd in range(len(nscf)):
+        for i in [imd + 1, imd - len(nscf)]:
+            scf = out.read_scf(imd=i)
+            assert np.allclose(scf_last[imd], scf)
+            assert scf[1] == pytest.approx(-100 - imd)
+            scf = out.read_scf(iscf=None, imd=i)
+            assert len(scf) == nscf[imd]
+            assert np.allclose(scf_all[imd], scf)
+            scf = out.read_scf(iscf=1, imd=i)
+            assert np.allclose(scf_all[imd][0], scf)
+    # out of range MD steps are truncated
+    assert np.allclose(out.read_scf(imd=10), scf_last[-1])
+    assert np.allclose(out.read_scf(imd=-10), scf_last[0])
+
+
+def test_md_index_incremental(sisl_tmp):
+    f = sisl_tmp('md.out', _dir)
+    with open(f, 'w') as fh:
+        _write_md_out(fh, 3, completed=False)
+
+    out = outSileSiesta(f)
+    assert len(out.read_force(all=True)) == 3
+    assert not out.job_completed
+    pos = out._index_pos
+
+    with open(f, 'a') as fh:
+        _write_md_out(fh, 6, start=3)
+    F = out.read_force(all=True)
+    assert len(F) == 6
+    assert out.job_completed
+    assert out._index_pos > pos
+    assert np.allclose(F[:, 0, 0], np.arange(6))
+
+
+def test_md_tail(sisl_tmp):
+    f = sisl_tmp('md.out', _dir)
+    with open(f, 'w') as fh:
+        _write_md_out(fh, 4, completed=False)
+
+    out = outSileSiesta(f)
+    forces = list(out.tail('force', poll=0.01, timeout=0.05))
+    assert len(forces) == 4
+    with open(f, 'a') as fh:
+        _write_md_out(fh, 6, start=4)
+    geoms = list(out.tail('geometry', poll=0.01))
+    assert len(geoms) == 6
+    assert geoms[-1].xyz[0, 0] == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize("quantity, header", [("force", "siesta: Atomic forces"),
+                                              ("geometry", "outcoor:")])
+def test_md_tail_partial_block(sisl_tmp, quantity, header):
+    f = sisl_tmp('md.out', _dir)
+    buf = StringIO()
+    _write_md_out(buf, 3)
+    content = buf.getvalue()
+    # cut the 3rd block just after its first data line
+    pos = -1
+    for _ in range(3):
+        pos = content.index(header, pos + 1)
+    cut = content.index('\n', content.index('\n', pos) + 1) + 1
+    with open(f, 'w') as fh:
+        fh.write(content[:cut])
+
+    def append():
+        with open(f, 'a') as fh:
+            fh.write(content[cut:])
+
+    out = outSileSiesta(f)
+    timer = threading.Timer(0.2, append)
+    timer.start()
+    values = list(out.tail(quantity, poll=0.01, timeout=5))
+    timer.join()
+    assert len(values) == 3
+    if quantity == 'force':
+        assert all(v.shape == (2, 3) for v in values)
+        assert values[-1][0, 0] == pytest.approx(2)
+    else:
+        assert all(v.na == 2 for v in values)
+        assert values[-1].xyz[0, 0] == pytest.approx(0.2)
+
+
+def test_md_trajectory(sisl_tmp):
+    f = sisl_tmp('md.out', _dir)
+    with open(f, 'w') as fh:
+        _write_md_out(fh, 5)
+
+    out = outSileSiesta(f)
+    traj = out.read_trajectory()
+    geoms = out.read_geometry(all=True)
+    assert len(traj) == 5
+    assert traj.xyz.shape == (5, 2, 3)
+    for g, tg in zip(geoms, traj):
+        assert g == tg
@@ -1,6 +1,7 @@
 import numpy as np
 
 from ..sile import add_sile, sile_fh_open, sile_raise_write
+from .._help import lines_to_array
 from .sile import SileSiesta
 
 from sisl._internal import set_module
@@ -92,39 +93,26 @@ class xvSileSiesta(SileSiesta):
         """
         sc = self.read_supercell()
 
-        # Read number of atoms
+        # Read number of atoms and all data in one go
         na = int(self.readline())
-        xyz = np.empty([na, 3], np.float64)
-        vel = np.empty([na, 3], np.float64)
-        atms = [None] * na
-        sp = np.empty([na], np.int32)
-        for ia in range(na):
-            line = list(map(float, self.readline().split()[:8]))
-            sp[ia] = int(line[0])
-            if species_Z:
-                atms[ia] = Atom(sp[ia])
-            else:
-                atms[ia] = Atom(int(line[1]))
-            xyz[ia, :] = line[2:5]
-            vel[ia, :] = line[5:8]
-
-        xyz *= Bohr2Ang
-        vel *= Bohr2Ang
-
-        # Ensure correct sorting
-        max_s = sp.max()
-        sp -= 1
-        # Ensure we can remove the atom after having aligned them
-        atms2 = Atoms(AtomUnknown(1000), na=na)
-        for i in range(max_s):
-            idx = (sp[:] == i).nonzero()[0]
-            if len(idx) == 0:
-                # Always ensure we have "something" for the unoccupied places
-                atms2[idx] = AtomUnknown(1000 + i)
-            else:
-                atms2[idx] = atms[idx[0]]
-
-        geom = Geometry(xyz, atms2.reduce(), sc=sc)
+        data = self._r_data(na)
+        sp = data[:, 0].astype(np.int32)
+        xyz = data[:, 2:5] * Bohr2Ang
+        vel = data[:, 5:8] * Bohr2Ang
+
+        # Ensure correct sorting (by species index)
+        # and create the atoms by the species indices
+        usp, first, inv = np.unique(sp, return_index=True, return_inverse=True)
+        if species_Z:
+            atms = [Atom(s) for s in usp]
+        else:
+            atms = [Atom(int(data[ia, 1])) for ia in first]
+        # Equal atoms are merged into one specie
+        atms2 = Atoms(atms)
+        atms2._specie = atms2.specie[inv.ravel()]
+        atms2._update_orbitals()
+
+        geom = Geometry(xyz, atms2, sc=sc)
         if velocity:
             return geom, vel
         return geom
@@ -139,13 +127,11 @@ class xvSileSiesta(SileSiesta):
         """
         self.read_supercell()
         na = int(self.readline())
-        vel = np.empty([na, 3], np.float64)
-        for ia in range(na):
-            line = list(map(float, self.readline().split()[:8]))
-            vel[ia, :] = line[5:8]
+        return self._r_data(na)[:, 5:8] * Bohr2Ang
 
-        vel *= Bohr2Ang
-        return vel
+    def _r_data(self, na):
+        """ Read the species, atomic numbers, coordinates and velocities of `na` atoms """
+        return lines_to_array([self.readline() for _ in range(na)], 8)
 
     read_data = read_velocity
 
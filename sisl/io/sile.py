@@ -1,4 +1,4 @@
-from functools import wraps
+from functools import wraps, lru_cache
 from os.path import splitext, isfile, dirname, join, abspath, basename
 import gzip
 from pathlib import Path
@@ -44,6 +44,13 @@ __all__ += ['sile_fh_open',
 # same extension and query it based on a sub-class
 __sile_rules = []
 __siles = []
+# Lookup tables of suffix -> indices of the rules in __sile_rules
+# (in order of registration), for case-sensitive and case-insensitive
+# rules (lower-case keys), respectively
+__sile_suffix = {}
+__sile_suffix_nocase = {}
+# Index of the first rule for each class
+__sile_cls = {}
 
 
 class _sile_rule:
@@ -167,7 +174,22 @@ def add_sile(suffix, cls, case=True, gzip=False):
         __siles.append(cls)
 
     # Add the rule of the sile to the list of rules.
-    __sile_rules.append(_sile_rule(cls, suffix, case=case, gzip=gzip))
+    rule = _sile_rule(cls, suffix, case=case, gzip=gzip)
+    idx = len(__sile_rules)
+    __sile_rules.append(rule)
+
+    # Update lookup tables
+    if case:
+        table = __sile_suffix
+    else:
+        table = __sile_suffix_nocase
+    table.setdefault(rule.suffix, []).append(idx)
+    if gzip:
+        table.setdefault(rule.suffix + '.gz', []).append(idx)
+    __sile_cls.setdefault(cls, idx)
+
+    # Rules have changed, so must the resolved classes
+    _get_sile_class.cache_clear()
 
 
 @set_module("sisl.io")
@@ -191,14 +213,29 @@ def get_sile_class(filename, *args, **kwargs):
        If there are several files with similar file-endings this
        function returns a random one.
     """
-    global __sile_rules, __siles
-
     # This ensures that the first argument need not be cls
     cls = kwargs.pop('cls', None)
 
+    # The class only depends on the file name (not the directory), so
+    # the same file in many directories is only resolved once
+    sile = _get_sile_class(basename(str(filename)), cls)
+    if sile is None:
+        raise NotImplementedError("Sile for file '{}' could not be found, "
+                                  "possibly the file has not been implemented.".format(filename))
+    return sile
+
+
+@lru_cache(maxsize=4096)
+def _get_sile_class(filename, cls):
+    """ Cached implementation of `get_sile_class`, returns None if no sile is found
+
+    The cache is cleared when rules are added through `add_sile`.
+    """
+    global __sile_rules, __sile_suffix, __sile_suffix_nocase, __sile_cls
+
     # Split filename into proper file name and
     # the Specification of the type
-    tmp_file, fcls = str_spec(str(filename))
+    tmp_file, fcls = str_spec(filename)
 
     if cls is None and not fcls is None:
         # cls has not been set, and fcls is found
@@ -215,54 +252,54 @@ def get_sile_class(filename, *args, **kwargs):
                 filename = tmp_file
                 break
 
-    try:
-        # Create list of endings on this file
-        f = basename(filename)
-        end_list = []
-        end = ''
-
-        # Check for files without ending, or that they are directly zipped
-        lext = splitext(f)
-        while len(lext[1]) > 0:
-            end = lext[1] + end
-            if end[0] == '.':
-                end_list.append(end[1:])
-            else:
-                end_list.append(end)
-            lext = splitext(lext[0])
-
-        # We also check the entire file name
-        #  (mainly for VASP)
-        end_list.append(f)
-        # Reverse to start by the longest extension
-        # (allows grid.nc extensions, etc.)
-        end_list = list(reversed(end_list))
-
-        # First we check for class AND file ending
-        clss = None
-        for end in end_list:
-            for sr in __sile_rules:
-                if sr.is_class(cls):
-                    # class-specification has precedence
-                    # This should only occur when the
-                    # class-specification is exact (i.e. xyzSile)
-                    return sr.cls
-                elif sr.is_suffix(end):
-                    if cls is None:
-                        return sr.cls
-                    elif sr.is_subclass(cls):
-                        return sr.cls
-                    clss = sr.cls
-            if clss is not None:
-                return clss
-
-        if clss is None:
-            raise NotImplementedError("Sile for file '{}' could not be found, "
-                                      "possibly the file has not been implemented.".format(filename))
-        return clss
-
-    except Exception as e:
-        raise e
+    # Create list of endings on this file
+    f = basename(filename)
+    end_list = []
+    end = ''
+
+    # Check for files without ending, or that they are directly zipped
+    lext = splitext(f)
+    while len(lext[1]) > 0:
+        end = lext[1] + end
+        if end[0] == '.':
+            end_list.append(end[1:])
+        else:
+            end_list.append(end)
+        lext = splitext(lext[0])
+
+    # We also check the entire file name
+    #  (mainly for VASP)
+    end_list.append(f)
+    # Reverse to start by the longest extension
+    # (allows grid.nc extensions, etc.)
+    end_list = list(reversed(end_list))
+
+    # The rule of the requested class (if registered)
+    # This is checked in the order of the rules
+    cls_idx = __sile_cls.get(cls, -1)
+
+    # First we check for class AND file ending
+    clss = None
+    for end in end_list:
+        idx = __sile_suffix.get(end, []) + __sile_suffix_nocase.get(end.lower(), [])
+        if cls_idx >= 0:
+            idx.append(cls_idx)
+        for i in sorted(idx):
+            sr = __sile_rules[i]
+            if i == cls_idx:
+                # class-specification has precedence
+                # This should only occur when the
+                # class-specification is exact (i.e. xyzSile)
+                return sr.cls
+            elif cls is None:
+                return sr.cls
+            elif sr.is_subclass(cls):
+                return sr.cls
+            clss = sr.cls
+        if clss is not None:
+            return clss
+
+    return None
 
 
 @set_module("sisl.io")
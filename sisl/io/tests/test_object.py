@@ -56,6 +56,28 @@ def test_get_sile2():
         gsc("test.this_file_does_not_exist")
 
 
+def test_get_sile_directory():
+    # the class does not depend on the directory
+    assert gsc(osp.join("a", "b", "test.xyz")) is gsc("test.xyz")
+    assert gsc(Path("a") / "RUN.fdf") is fdfSileSiesta
+    # case-insensitive and gzip
+    assert gsc("test.XYZ") is gsc("test.xyz")
+    assert gsc("test.xyz.gz") is gsc("test.xyz")
+
+
+def test_get_sile_add_sile():
+    # adding rules must be reflected in the (cached) lookups
+    with pytest.raises(NotImplementedError):
+        gsc("test.sisl_add_sile_test")
+
+    class _addsileSile(xyzSile):
+        pass
+
+    add_sile("sisl_add_sile_test", _addsileSile)
+    assert gsc("test.sisl_add_sile_test") is _addsileSile
+    assert gsc("test.xyz", cls=_addsileSile) is _addsileSile
+
+
 class TestObject:
 
     def test_siesta_sources(self):
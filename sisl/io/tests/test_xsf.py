@@ -41,3 +41,42 @@ def test_imaginary(sisl_tmp):
     grid.grid = np.random.rand(*grid.shape) + 1j*np.random.rand(*grid.shape)
     grid.write(f)
     assert not grid.geometry is None
+
+
+def test_axsf_trajectory(sisl_tmp):
+    f = sisl_tmp('traj.axsf', _dir)
+    geom = Geometry(np.random.rand(10, 3), np.random.randint(1, 70, 10), sc=[10, 10, 10, 45, 60, 90])
+    with axsfSile(f, 'w', steps=4) as sile:
+        for i in range(4):
+            g = geom.move([0.1 * i, 0, 0])
+            g.cell[2, 2] += i
+            sile.write_geometry(g)
+    traj = axsfSile(f).read_trajectory()
+
+    assert len(traj) == 4
+    assert traj.na == geom.na
+    assert np.allclose(traj.xyz[:, 0, 0] - geom.xyz[0, 0], [0, 0.1, 0.2, 0.3])
+    assert np.allclose(traj.cell[:, 2, 2] - geom.cell[2, 2], [0, 1, 2, 3])
+    assert np.allclose(traj.atoms.Z, geom.atoms.Z)
+
+
+def test_axsf_trajectory_late_cell(sisl_tmp):
+    f = sisl_tmp('traj.axsf', _dir)
+    with open(f, 'w') as fh:
+        fh.write("""ANIMSTEPS 2
+CRYSTAL
+PRIMCOORD 1
+1 1
+6 0.0 0.0 0.0
+PRIMVEC 2
+2.0 0.0 0.0
+0.0 3.0 0.0
+0.0 0.0 4.0
+PRIMCOORD 2
+1 1
+6 0.5 0.0 0.0
+""")
+    traj = axsfSile(f).read_trajectory()
+    assert len(traj) == 2
+    assert np.allclose(traj.cell, np.diag([2., 3., 4.]))
+    assert np.allclose(traj.xyz[:, 0, 0], [0, 0.5])
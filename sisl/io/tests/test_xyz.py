@@ -70,3 +70,39 @@ C   2.00000  0.00000000  0.00000000
     assert np.allclose(g.xyz[:, 1], 0.)
     assert np.allclose(g.xyz[:, 2], 0.)
     assert np.allclose(g.nsc, [1, 1, 1])
+
+
+def test_xyz_trajectory(sisl_tmp, sisl_system):
+    f = sisl_tmp('traj.xyz', _dir)
+    g = sisl_system.g
+    fi = sisl_tmp('frame.xyz', _dir)
+    with open(f, 'w') as fh:
+        for i in range(4):
+            gi = g.move([0.1 * i, 0, 0])
+            gi.cell[2, 2] += i
+            gi.write(xyzSile(fi, 'w'))
+            fh.write(open(fi).read())
+    traj = xyzSile(f).read_trajectory()
+
+    assert len(traj) == 4
+    assert traj.na == g.na
+    assert np.allclose(traj.xyz[:, 0, 0] - g.xyz[0, 0], [0, 0.1, 0.2, 0.3])
+    assert np.allclose(traj.cell[:, 2, 2] - g.cell[2, 2], [0, 1, 2, 3])
+    assert np.allclose(traj.nsc, g.nsc)
+    assert g.atoms.equal(traj.atoms, R=False)
+    assert traj[0] == xyzSile(f).read_geometry()
+
+
+def test_xyz_species_order(sisl_tmp):
+    f = sisl_tmp('species.xyz', _dir)
+    open(f, 'w').write("""4
+
+O   0.00000000  0.00000000  0.00000000
+H   1.000000  0.00000000  0.00000000
+H   2.00000  0.00000000  0.00000000 extra columns
+C   3.00000  0.00000000  0.00000000
+""")
+    g = xyzSile(f).read_geometry()
+    assert np.allclose(g.xyz[:, 0], [0, 1, 2, 3])
+    assert [a.symbol for a in g.atoms.atom] == ['O', 'H', 'C']
+    assert np.allclose(g.atoms.specie, [0, 1, 1, 2])
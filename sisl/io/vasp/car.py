@@ -1,8 +1,11 @@
+from numbers import Integral
+from itertools import islice
 import numpy as np
 
 # Import sile objects
 from .sile import SileVASP
 from ..sile import add_sile, sile_fh_open, sile_raise_write
+from .._help import lines_to_table, lines_to_array, fh_to_array
 
 from sisl._internal import set_module
 import sisl._array as _a
@@ -165,8 +168,9 @@ class carSileVASP(SileVASP):
             warn(err)
 
         # Create list of atoms to be used subsequently
-        atom = [Atom[spec]
-                for spec, nsp in zip(species, species_count)
+        # (only one object per specie)
+        atom = [a
+                for a, nsp in zip([Atom[spec] for spec in species], species_count)
                 for i in range(nsp)]
 
         # Number of atoms
@@ -189,12 +193,14 @@ class carSileVASP(SileVASP):
         if opt[0] in 'CcKk':
             cart = True
 
-        xyz = _a.emptyd([na, 3])
-        for ia in range(na):
-            line = self.readline().split()
-            xyz[ia, :] = list(map(float, line[:3]))
-            if dynamics:
-                dynamic[ia] = list(map(lambda x: x.lower() == 't', line[3:6]))
+        # Read all coordinates (and dynamics) in one go
+        lines = [self.readline() for _ in range(na)]
+        if dynamics:
+            table = lines_to_table(lines, 6)
+            dynamic[:, :] = (table[:, 3:6] == 'T') | (table[:, 3:6] == 't')
+            xyz = table[:, :3].astype(np.float64)
+        else:
+            xyz = lines_to_array(lines, 3)
 
         if cart:
             # The unit of the coordinates are cartesian
@@ -208,6 +214,77 @@ class carSileVASP(SileVASP):
             return geom, dynamic
         return geom
 
+    def _r_grid(self, index, dtype):
+        r""" Read the geometry and the grid values following it (CHG/CHGCAR/LOCPOT format)
+
+        The grid blocks are parsed directly into the returned array, blocks that are not
+        requested are skipped (as are the augmentation occupancies and magnetic moments
+        between the blocks).
+
+        Parameters
+        ----------
+        index : int or array_like
+           the index of the grid block to read, or weights for each block
+        dtype : numpy.dtype
+           data type of the returned values
+
+        Returns
+        -------
+        Geometry
+        numpy.ndarray
+            grid values with shape ``(nx, ny, nz)`` (not C-contiguous)
+        """
+        geom = self.read_geometry()
+
+        # Now we are past the cell and geometry
+        # We can now read the size of the grid
+        self.readline()
+        dims = self.readline().split()
+        nx, ny, nz = map(int, dims)
+        n = nx * ny * nz
+
+        if isinstance(index, Integral):
+            weights = [0.] * index + [1.]
+        else:
+            weights = list(index)
+        # last block required
+        max_index = max([i for i, w in enumerate(weights) if w != 0.], default=0) + 1
+
+        fh = self.fh
+        val = None
+        buf = None
+        for i in range(max_index):
+            if i > 0:
+                # Skip augmentation occupancies, magnetic moments etc. until
+                # the grid dimensions are repeated
+                while True:
+                    line = self.readline()
+                    if not line:
+                        raise ValueError(f"{self.__class__.__name__}.read_grid could not find grid block {i}")
+                    if line.split() == dims:
+                        break
+
+            w = weights[i]
+            if w == 0.:
+                # Skip the block without parsing the values
+                ncol = len(fh.readline().split())
+                for _ in islice(fh, (n - 1) // ncol):
+                    pass
+            elif val is None:
+                val = fh_to_array(fh, n, dtype)
+                if w != 1.:
+                    val *= w
+            else:
+                buf = fh_to_array(fh, n, dtype, out=buf)
+                buf *= w
+                val += buf
+        del buf
+        if val is None:
+            val = np.zeros(n, dtype=dtype)
+
+        # Make it C-ordered with nx, ny, nz
+        return geom, np.swapaxes(val.reshape(nz, ny, nx), 0, 2)
+
     def ArgumentParser(self, p=None, *args, **kwargs):
         """ Returns the arguments that is available for this Sile """
         newkw = Geometry._ArgumentParser_args_single()
@@ -1,4 +1,3 @@
-from numbers import Integral
 import numpy as np
 
 from .sile import SileVASP
@@ -38,54 +37,8 @@ class locpotSileVASP(carSileVASP):
         -------
         Grid : potential with associated geometry
         """
-        geom = self.read_geometry()
-        V = geom.sc.volume
-
-        # Now we are past the cell and geometry
-        # We can now read the size of LOCPOT
-        self.readline()
-        nx, ny, nz = list(map(int, self.readline().split()))
-        n = nx * ny * nz
-
-        is_index = True
-        if isinstance(index, Integral):
-            max_index = index + 1
-        else:
-            is_index = False
-            max_index = len(index)
-
-        rl = self.readline
-        vals = []
-        vapp = vals.append
-
-        i = 0
-        while i < n * max_index:
-            dat = [l for l in rl().split()]
-            vapp(dat)
-            i += len(dat)
-
-            if i % n == 0 and i < n * max_index:
-                # Each time a new spin-index is present, we need to read the coordinates
-                j = 0
-                while j < geom.na:
-                    j += len(rl().split())
-
-                # one line of nx, ny, nz
-                rl()
-
-        # Cut size before proceeding (otherwise it *may* fail)
-        vals = np.array(vals).astype(dtype).ravel()
-        if is_index:
-            val = vals[n * index:n * (index + 1)].reshape(nz, ny, nx)
-        else:
-            vals = vals[:n * max_index].reshape(-1, nz, ny, nx)
-            val = vals[0] * index[0]
-            for i, scale in enumerate(index[1:]):
-                val += vals[i + 1] * scale
-        del vals
-
-        # Make it C-ordered with nx, ny, nz
-        val = np.swapaxes(val, 0, 2) / V
+        geom, val = self._r_grid(index, dtype)
+        val /= geom.sc.volume
 
         # Create the grid with data
         # Since we populate the grid data afterwards there
@@ -1,4 +1,5 @@
 import pytest
+import warnings
 import os.path as osp
 from sisl import Geometry, Atom
 from sisl.io.vasp.car import *
@@ -87,3 +88,26 @@ def test_geometry_car_dynamic(sisl_tmp):
     g, dyn = read.read_geometry(ret_dynamic=True)
     assert np.array_equal(dynamic[0], dyn[0])
     assert not np.any(dyn[1:])
+
+
+def test_geometry_car_labels(sisl_tmp):
+    f = sisl_tmp('test_labels.POSCAR', _dir)
+    with open(f, 'w') as fh:
+        fh.write("""C H
+1.0
+  4.0 0.0 0.0
+  0.0 4.0 0.0
+  0.0 0.0 4.0
+C H
+1 2
+Direct
+  0.0 0.0 0.0 C
+  0.25 0.0 0.0 H
+  0.0 0.5 0.0 H
+""")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        geom = carSileVASP(f).read_geometry()
+    assert geom.na == 3
+    assert np.allclose(geom.xyz, [[0, 0, 0], [1, 0, 0], [0, 2, 0]])
+    assert np.allclose(geom.atoms.Z, [6, 1, 1])
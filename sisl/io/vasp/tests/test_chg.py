@@ -1,5 +1,7 @@
 import pytest
 import os.path as osp
+from sisl import Geometry, Atom
+from sisl.io.vasp.car import carSileVASP
 from sisl.io.vasp.chg import *
 import numpy as np
 
@@ -36,3 +38,45 @@ def test_graphene_chgcar_index_float(sisl_files):
     gridh = chgSileVASP(f).read_grid(index=[0.5])
 
     assert grid.grid.sum() / 2 == pytest.approx(gridh.grid.sum())
+
+
+def _write_chgcar(f, geom, grids, ncol=5, augmentation=True):
+    # write a (spin-polarized) CHGCAR file with augmentation occupancies
+    geom.write(carSileVASP(f, 'w'), dynamic=None)
+    shape = grids[0].shape
+    with open(f, 'a') as fh:
+        for i, grid in enumerate(grids):
+            if i > 0:
+                # magnetic moments
+                fh.write(' '.join(['0.000'] * geom.na) + '\n')
+            fh.write('\n{:5d}{:5d}{:5d}\n'.format(*shape))
+            vals = grid.ravel(order='F')
+            for j in range(0, vals.size, ncol):
+                fh.write(' '.join(f'{v:.11E}' for v in vals[j:j+ncol]) + '\n')
+            if augmentation:
+                for ia in range(geom.na):
+                    fh.write(f'augmentation occupancies{ia+1:4d}{4:4d}\n')
+                    fh.write(' 0.1 0.2 0.3 0.4\n')
+
+
+@pytest.mark.parametrize("ncol", [5, 10])
+def test_chgcar_spin(sisl_tmp, ncol):
+    f = sisl_tmp('spin.CHGCAR', _dir)
+    geom = Geometry([[0, 0, 0], [1, 1, 1]], Atom[6], sc=4.)
+    # shape not a multiple of the values per line
+    up = np.random.rand(3, 4, 7)
+    down = np.random.rand(3, 4, 7)
+    _write_chgcar(f, geom, [up, down], ncol=ncol)
+    V = geom.sc.volume
+
+    sile = chgSileVASP(f)
+    assert np.allclose(sile.read_grid().grid, up / V)
+    assert np.allclose(sile.read_grid(1).grid, down / V)
+    assert np.allclose(sile.read_grid([1, -1]).grid, (up - down) / V)
+    assert np.allclose(sile.read_grid([0, 0.5]).grid, down / V / 2)
+    grid = sile.read_grid(1, dtype=np.float32)
+    assert grid.dtype == np.float32
+    assert grid.geometry == geom
+    assert np.allclose(grid.grid, down / V)
+    with pytest.raises(ValueError):
+        sile.read_grid(2)
@@ -3,9 +3,10 @@ import numpy as np
 
 # Import sile objects
 from .sile import *
+from ._help import lines_to_array
 
 from sisl._internal import set_module
-from sisl import Geometry, AtomUnknown, SuperCell
+from sisl import Geometry, AtomUnknown, SuperCell, Trajectory
 from sisl.utils import str_spec
 
 
@@ -391,6 +392,50 @@ class axsfSile(xsfSile):
         if not hasattr(self, '_md_steps'):
             self._md_steps = 1
 
+    @sile_fh_open()
+    def read_trajectory(self):
+        """ Returns all MD steps in the AXSF file as a trajectory
+
+        The atomic species are taken from the first step. Each step uses the latest
+        ``PRIMVEC`` block, i.e. both a fixed cell (a single ``PRIMVEC`` block) and
+        a cell per step (``PRIMVEC <step>``) are handled. Steps before the first
+        ``PRIMVEC`` block use the first cell in the file.
+
+        Returns
+        -------
+        Trajectory or None
+            None if the file does not contain any ``PRIMCOORD`` blocks
+        """
+        cell = None
+        cells = []
+        xyz = []
+        atoms = None
+
+        line = self.readline()
+        while line != '':
+            key = line.strip()
+            if key.startswith('PRIMVEC'):
+                cell = lines_to_array([self.readline() for _ in range(3)], 3)
+            elif key.startswith('PRIMCOORD'):
+                na = int(self.readline().split()[0])
+                # Z, x, y, z (and possibly forces)
+                coord = lines_to_array([self.readline() for _ in range(na)], 4)
+                if atoms is None:
+                    atoms = coord[:, 0].astype(np.int32)
+                xyz.append(coord[:, 1:])
+                cells.append(cell)
+            line = self.readline()
+
+        if len(xyz) == 0:
+            return None
+        first = next((cell for cell in cells if cell is not None), None)
+        if first is None:
+            # molecules without a cell
+            cells = None
+        else:
+            cells = [first if cell is None else cell for cell in cells]
+        return Trajectory(xyz, atoms, cells)
+
     write_grid = None
 
 
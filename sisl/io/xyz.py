@@ -7,9 +7,10 @@ import numpy as np
 
 # Import sile objects
 from .sile import *
+from ._help import lines_to_table
 
 from sisl._internal import set_module
-from sisl import Geometry, SuperCell
+from sisl import Geometry, SuperCell, Trajectory
 from sisl.messages import warn
 import sisl._array as _a
 
@@ -71,48 +72,47 @@ class xyzSile(Sile):
         # Add a single new line
         self._write('\n')
 
-    def _r_geometry_sisl(self, na, header, sp, xyz):
-        """ Read the geometry as though it was created with sisl """
+    def _r_supercell_sisl(self, header, xyz):
+        """ Read the supercell as though it was created with sisl """
         # Default version of the header is 1
         v = header.get("sisl-version", 1)
-        nsc = list(map(int, header.pop("nsc").split()))
-        cell = _a.fromiterd(header.pop("cell").split()).reshape(3, 3)
+        nsc = list(map(int, header.get("nsc").split()))
+        cell = _a.fromiterd(header.get("cell").split()).reshape(3, 3)
+        return SuperCell(cell, nsc=nsc)
 
-        return Geometry(xyz, atoms=sp, sc=SuperCell(cell, nsc=nsc))
-
-    def _r_geometry_ase(self, na, header, sp, xyz):
-        """ Read the geometry as though it was created with ASE """
+    def _r_supercell_ase(self, header, xyz):
+        """ Read the supercell as though it was created with ASE """
         # Convert F T to nsc
         #  F = 1
         #  T = 3
-        nsc = list(map(lambda x: "FT".index(x) * 2 + 1, header.pop("pbc").strip('"').split()))
-        cell = _a.fromiterd(header.pop("Lattice").strip('"').split()).reshape(3, 3)
-
-        return Geometry(xyz, atoms=sp, sc=SuperCell(cell, nsc=nsc))
+        nsc = list(map(lambda x: "FT".index(x) * 2 + 1, header.get("pbc").strip('"').split()))
+        cell = _a.fromiterd(header.get("Lattice").strip('"').split()).reshape(3, 3)
+        return SuperCell(cell, nsc=nsc)
 
-    def _r_geometry(self, na, sp, xyz):
-        """ Read the geometry for a generic xyz file (not sisl, nor ASE) """
+    def _r_supercell(self, header, xyz):
+        """ Read the supercell for a generic xyz file (not sisl, nor ASE) """
         # The cell dimensions isn't defined, we are going to create a molecule box
         cell = xyz.max(0) - xyz.min(0) + 10.
-        return Geometry(xyz, atoms=sp, sc=SuperCell(cell, nsc=[1] * 3))
-
-    @sile_fh_open()
-    def read_geometry(self):
-        """ Returns Geometry object from the XYZ file """
-        # Read number of atoms
-        na = int(self.readline())
+        return SuperCell(cell, nsc=[1] * 3)
+
+    def _r_frame(self):
+        """ Read the species, coordinates and supercell of the next frame, None at end-of-file """
+        # Read number of atoms (frames may be separated by empty lines)
+        line = self.readline()
+        while len(line) > 0 and len(line.strip()) == 0:
+            line = self.readline()
+        if len(line) == 0:
+            return None
+        na = int(line)
 
         # Read header, and try and convert to dictionary
         header = self.readline()
         kv = _header_to_dict(header)
 
-        # Read atoms and coordinates
-        sp = [None] * na
-        xyz = np.empty([na, 3], np.float64)
-        for ia in range(na):
-            l = self.readline().split()
-            sp[ia] = l.pop(0)
-            xyz[ia, :] = [float(k) for k in l[:3]]
+        # Read atoms and coordinates in one go
+        table = lines_to_table([self.readline() for _ in range(na)], 4)
+        sp = table[:, 0]
+        xyz = table[:, 1:].astype(np.float64)
 
         def _has_keys(d, *keys):
             for key in keys:
@@ -121,10 +121,38 @@ class xyzSile(Sile):
             return True
 
         if _has_keys(kv, "cell", "nsc"):
-            return self._r_geometry_sisl(na, kv, sp, xyz)
+            sc = self._r_supercell_sisl(kv, xyz)
         elif _has_keys(kv, "Properties", "Lattice", "pbc"):
-            return self._r_geometry_ase(na, kv, sp, xyz)
-        return self._r_geometry(na, sp, xyz)
+            sc = self._r_supercell_ase(kv, xyz)
+        else:
+            sc = self._r_supercell(kv, xyz)
+        return sp, xyz, sc
+
+    @sile_fh_open()
+    def read_geometry(self):
+        """ Returns Geometry object from the XYZ file """
+        sp, xyz, sc = self._r_frame()
+        return Geometry(xyz, atoms=sp, sc=sc)
+
+    @sile_fh_open()
+    def read_trajectory(self):
+        """ Returns all frames in the XYZ file as a trajectory
+
+        The atomic species are taken from the first frame.
+
+        Returns
+        -------
+        Trajectory
+        """
+        frame = self._r_frame()
+        sp, nsc = frame[0], frame[2].nsc
+        xyz = []
+        cell = []
+        while frame is not None:
+            xyz.append(frame[1])
+            cell.append(frame[2].cell)
+            frame = self._r_frame()
+        return Trajectory(xyz, sp, cell, nsc=nsc)
 
     def ArgumentParser(self, p=None, *args, **kwargs):
         """ Returns the arguments that is available for this Sile """
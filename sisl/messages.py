@@ -18,6 +18,7 @@ We prefer the later which is particularly useful when the installation path is
 complex.
 """
 import warnings
+from importlib.util import find_spec
 from functools import wraps
 
 from ._internal import set_module
@@ -152,14 +153,19 @@ def is_jupyter_notebook():
         return False
 
 # Figure out if we can import tqdm.
-# If so, simply use the progressbar class there.
+# If so, simply use the progressbar class there (it is slow to import,
+# so it is only imported when the first progressbar is created).
 # Otherwise, create a fake one.
-try:
-    if is_jupyter_notebook():
-        from tqdm import tqdm_notebook as _tqdm
-    else:
-        from tqdm import tqdm as _tqdm
-except ImportError:
+if find_spec('tqdm') is not None:
+    def _tqdm(*args, **kwargs):
+        global _tqdm
+        if is_jupyter_notebook():
+            from tqdm import tqdm_notebook as _tqdm
+        else:
+            from tqdm import tqdm as _tqdm
+        return _tqdm(*args, **kwargs)
+
+else:
     # Notify user of better option
     info('Please install tqdm (pip install tqdm) for better looking progress bars', register=True)
 
@@ -1,5 +1,5 @@
 # To check for integers
-from functools import partial
+from functools import partial, lru_cache
 from numbers import Integral
 from math import pi
 from math import sqrt as msqrt
@@ -8,7 +8,6 @@ from math import factorial as fact
 import numpy as np
 from numpy import cos, sin
 from numpy import take, sqrt, square
-from scipy.special import lpmv
 from scipy.interpolate import UnivariateSpline
 
 from ._internal import set_module
@@ -41,6 +40,47 @@ _rspher_harm_fact = [{m: _rfact(l, m) for m in range(-l, l+1)} for l in range(6)
 del _rfact
 
 
+def _legendre_poly(l, m):
+    r""" Polynomial :math:`Q_l^m(x)` and prefactor such that :math:`P_l^m(x) = c Q_l^m(x) (1-x^2)^{|m|/2}`
+
+    The associated Legendre polynomials follow the definition in `scipy.special.lpmv`
+    (including the Condon-Shortley phase).
+    """
+    am = abs(m)
+    # Coefficients of the Legendre polynomial P_l, differentiated |m| times
+    Q = np.polynomial.legendre.leg2poly(np.eye(l + 1)[l])
+    Q = np.polynomial.polynomial.polyder(Q, am)
+    c = (-1) ** am
+    if m < 0:
+        c *= (-1) ** am * fact(l - am) / fact(l + am)
+    # np.polyval requires the highest order first
+    return c, Q[::-1].copy()
+
+
+@lru_cache(maxsize=None)
+def _rspherical_harm_func(l, m):
+    r""" Cached evaluator of the real spherical harmonics for a given `l` and `m`
+
+    See `_rspherical_harm` for details, the returned function accepts ``(theta, cos_phi)``.
+    """
+    c, Q = _legendre_poly(l, m)
+    c *= _rspher_harm_fact[l][m]
+    am = abs(m)
+
+    def func(theta, cos_phi):
+        cos_phi = np.asarray(cos_phi)
+        p = np.polyval(Q, cos_phi) * c
+        if am > 0:
+            p *= sqrt(1 - square(cos_phi)) ** am
+        if m < 0:
+            return p * sin(m*theta)
+        elif m > 0:
+            return p * cos(m*theta)
+        return p
+
+    return func
+
+
 def _rspherical_harm(m, l, theta, cos_phi):
     r""" Calculates the real spherical harmonics using :math:`Y_l^m(\theta, \varphi)` with :math:`\mathbf R\to \{r, \theta, \varphi\}`.
 
@@ -53,6 +93,9 @@ def _rspherical_harm(m, l, theta, cos_phi):
         Y^m_l(\theta,\varphi) &= \sqrt{2\frac{2l+1}{4\pi} \frac{(l-m)!}{(l+m)!}}
            P^{m}_l (\cos(\varphi)) \cos(m \theta) & m > 0
 
+    The associated Legendre polynomials are evaluated as explicit polynomials which
+    are cached for each :math:`(l, m)`.
+
     Parameters
     ----------
     m : int
@@ -64,17 +107,70 @@ def _rspherical_harm(m, l, theta, cos_phi):
     cos_phi : array_like
        cos(phi) to angle from :math:`z` axis (polar)
     """
-    # Calculate the associated Legendre polynomial
     # Since the real spherical harmonics has slight differences
     # for positive and negative m, we have to implement them individually.
     # Currently this is a re-write of what Inelastica does and a combination of
     # learned lessons from Denchar.
     # As such the choice of these real spherical harmonics is that of Siesta.
-    if m == 0:
-        return _rspher_harm_fact[l][m] * lpmv(m, l, cos_phi)
-    elif m < 0:
-        return _rspher_harm_fact[l][m] * (lpmv(m, l, cos_phi) * sin(m*theta))
-    return _rspher_harm_fact[l][m] * (lpmv(m, l, cos_phi) * cos(m*theta))
+    return _rspherical_harm_func(l, m)(theta, cos_phi)
+
+
+class _RadialTable:
+    r""" Uniformly spaced table of a radial function :math:`f(r)` for fast look-ups
+
+    Parameters
+    ----------
+    func : callable
+       the radial function to be tabulated
+    R : float
+       the maximum radius of the radial function, for ``r > R`` the table returns 0
+    dr : float, optional
+       spacing of the tabulated radii
+    kind : {'cubic', 'linear'}
+       interpolation between the tabulated values. ``cubic`` uses a cubic
+       Hermite interpolation with the derivatives from the tabulated values.
+    """
+    __slots__ = ['func', 'R', 'dr', 'kind', 'f', 'df']
+
+    def __init__(self, func, R, dr=0.001, kind='cubic'):
+        if kind not in ('cubic', 'linear'):
+            raise ValueError(f"{self.__class__.__name__} requires kind in [cubic, linear], got {kind}")
+        self.func = func
+        self.R = R
+        self.kind = kind
+        n = max(int(np.ceil(R / dr)), 2)
+        self.dr = R / n
+        r = _a.aranged(n + 1) * self.dr
+        # Pad with zeros to allow r == R look-ups with i + 1
+        self.f = _a.zerosd(n + 2)
+        self.f[:-1] = func(r)
+        if kind == 'cubic':
+            # derivative (in units of the table spacing)
+            self.df = np.gradient(self.f)
+            self.df[-1] = 0.
+        else:
+            self.df = None
+
+    def __call__(self, r):
+        r = _a.asarrayd(r)
+        x = r / self.dr
+        # values outside of the table are set to R (and zeroed below)
+        i = np.clip(x, 0, len(self.f) - 2).astype(np.int32)
+        t = x - i
+        f0 = take(self.f, i)
+        f1 = take(self.f, i + 1)
+        if self.kind == 'linear':
+            p = f0 + (f1 - f0) * t
+        else:
+            # cubic Hermite interpolation
+            d0 = take(self.df, i)
+            d1 = take(self.df, i + 1)
+            t2 = t * t
+            t3 = t2 * t
+            p = (f0 * (2 * t3 - 3 * t2 + 1) + d0 * (t3 - 2 * t2 + t)
+                 + f1 * (3 * t2 - 2 * t3) + d1 * (t3 - t2))
+        p[r > self.R] = 0.
+        return p
 
 
 @set_module("sisl")
@@ -516,6 +612,42 @@ class SphericalOrbital(Orbital):
         else:
             raise ValueError('Arguments for set_radial are in-correct, please see the documentation of SphericalOrbital.set_radial')
 
+    def tabulate(self, dr=0.001, kind='cubic'):
+        r""" Replace the radial function by a uniformly spaced table for fast evaluation
+
+        Evaluating the radial function through a spline (or a user-defined interpolation)
+        is costly when done many times, e.g. when projecting states on grids.
+        A uniformly spaced table of :math:`f(r)` makes every evaluation a simple
+        vectorized look-up.
+
+        Since `AtomicOrbital` objects created via `toAtomicOrbital` share this object,
+        the table is shared between all :math:`m` orbitals.
+
+        Parameters
+        ----------
+        dr : float, optional
+            spacing of the tabulated radii (in Ang), or ``None`` to revert to the
+            original (un-tabulated) radial function.
+        kind : {'cubic', 'linear'}
+            interpolation between the tabulated values
+
+        Examples
+        --------
+        >>> r = np.linspace(0, 4, 300)
+        >>> o = SphericalOrbital(1, (r, np.exp(-r)))
+        >>> f = o.radial(r)
+        >>> o.tabulate(dr=0.0005)
+        >>> np.allclose(f, o.radial(r))
+        True
+        """
+        f = self.f
+        if isinstance(f, _RadialTable):
+            f = f.func
+        if dr is None:
+            self.f = f
+        else:
+            self.f = _RadialTable(f, self.R, dr, kind)
+
     def __str__(self):
         """ A string representation of the object """
         if len(self.tag) > 0:
@@ -983,6 +1115,14 @@ class AtomicOrbital(Orbital):
         self.orb.set_radial(*args)
         self.R = self.orb.R
 
+    def tabulate(self, dr=0.001, kind='cubic'):
+        r""" Replace the radial function by a uniformly spaced table for fast evaluation
+
+        See `SphericalOrbital.tabulate` where these arguments are passed to.
+        Note that the table is shared between all orbitals using the same `SphericalOrbital`.
+        """
+        self.orb.tabulate(dr, kind)
+
     def radial(self, r, is_radius=True):
         r""" Calculate the radial part of the wavefunction :math:`f(\mathbf R)`
 
@@ -61,16 +61,20 @@ Electrons (:mod:`~sisl.physics.electron`)
    :toctree:
 
    ~electron.DOS
+   ~electron.DOS_tetrahedron
    ~electron.PDOS
    ~electron.velocity
    ~electron.velocity_matrix
    ~electron.berry_phase
+   ~electron.wilson_loop
    ~electron.berry_curvature
    ~electron.conductivity
    ~electron.wavefunction
+   ~electron.WavefunctionProjector
    ~electron.spin_moment
    ~electron.spin_orbital_moment
    ~electron.spin_squared
+   ~electron.expectation
    EigenvalueElectron
    EigenvectorElectron
    EigenstateElectron
@@ -91,6 +95,17 @@ Phonons (:mod:`~sisl.physics.phonon`)
    EigenmodePhonon
 
 
+Kernel polynomial method (:mod:`~sisl.physics.kpm`)
+===================================================
+
+.. autosummary::
+   :toctree:
+
+   KPM
+   ~kpm.jackson_kernel
+   ~kpm.lorentz_kernel
+
+
 Bloch's theorem (:mod:`~sisl.physics.bloch`)
 ============================================
 
@@ -127,6 +142,7 @@ Distribution functions (:mod:`~sisl.physics.distribution`)
    sisl.physics.phonon
    sisl.physics.distribution
    sisl.physics.brillouinzone
+   sisl.physics.kpm
 
 
 Low level objects
@@ -169,6 +185,9 @@ from .spin import *
 from .sparse import *
 from .state import *
 
+from . import kpm
+from .kpm import KPM
+
 from . import electron
 from .electron import CoefficientElectron, StateElectron, StateCElectron
 from .electron import EigenvalueElectron, EigenvectorElectron, EigenstateElectron
@@ -183,3 +202,7 @@ from .hamiltonian import *
 from .dynamicalmatrix import *
 from .overlap import *
 from .self_energy import *
+
+# sub-modules are not part of the public names
+__all__ = [s for s, obj in globals().items()
+           if not (s.startswith('_') or isinstance(obj, type(electron)))]
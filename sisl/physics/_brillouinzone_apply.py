@@ -4,13 +4,11 @@ This module should not expose any methods!
 """
 from functools import wraps, reduce
 import operator as op
+from importlib.util import find_spec
 
 import numpy as np
-try:
-    import xarray
-    _has_xarray = True
-except ImportError:
-    _has_xarray = False
+# xarray is slow to import, it is only imported when needed
+_has_xarray = find_spec('xarray') is not None
 
 from sisl._dispatcher import ClassDispatcher, AbstractDispatch
 from sisl._environ import get_environ_variable
@@ -323,6 +321,7 @@ class DataArrayApply(ArrayApply):
                         coords[i] = (coords[i], _a.arangei(array.shape[i]))
             attrs = {'bz': bz, 'parent': bz.parent}
 
+            import xarray
             return xarray.DataArray(array, coords=coords, name=name, attrs=attrs)
 
         return func
@@ -142,6 +142,7 @@ and ``imap`` and ``uimap`` methods. See the ``pathos`` documentation for detalis
 import types
 from numbers import Integral, Real
 import warnings
+from importlib.util import find_spec
 
 from numpy import pi
 import numpy as np
@@ -156,18 +157,85 @@ from sisl.utils.misc import allow_kwargs
 import sisl._array as _a
 from sisl.messages import info, SislError, tqdm_eta, deprecate_method, deprecate
 from sisl.supercell import SuperCell
+from sisl.geometry import Geometry
 from sisl.grid import Grid
 
-try:
-    import xarray
-    _has_xarray = True
-except ImportError:
-    _has_xarray = False
+# xarray is slow to import, it is only imported when needed
+_has_xarray = find_spec('xarray') is not None
 
 
 __all__ = ["BrillouinZone", "MonkhorstPack", "BandStructure"]
 
 
+def _close_group(ops):
+    """ Return the group generated by the integer matrices `ops` (including the identity) """
+    group = {tuple(np.eye(3, dtype=np.int32).ravel())}
+    new = group | {tuple(op.ravel()) for op in ops}
+    while len(new) > len(group):
+        group = new
+        G = np.array(list(group), dtype=np.int32).reshape(-1, 3, 3)
+        new = group | {tuple(op.ravel()) for op in np.matmul(G[:, None], G[None, :]).reshape(-1, 3, 3)}
+    return np.array(sorted(group), dtype=np.int32).reshape(-1, 3, 3)
+
+
+def _symmetry_operations(parent, eps=1e-5):
+    r""" Find the point group operations of the lattice (and atomic structure) of `parent`
+
+    The operations are integer matrices :math:`\mathbf R` in the basis of the lattice
+    vectors, i.e. fractional coordinates transform as :math:`\mathbf x' = \mathbf R\mathbf x`.
+    The lattice operations are searched among matrices with elements in :math:`\{-1, 0, 1\}`
+    which is sufficient for reduced cells.
+
+    If `parent` has atomic coordinates (a `Geometry`), only operations that leave the
+    atomic structure invariant (allowing fractional translations) are returned.
+
+    Parameters
+    ----------
+    parent : object
+       object with lattice vectors (``cell``) and possibly a ``geometry``
+    eps : float, optional
+       precision (in Ang) for the comparison of positions
+    """
+    cell = parent.cell
+    # Metric tensor
+    G = dot(cell, cell.T)
+
+    # All candidate matrices
+    v = [-1, 0, 1]
+    R = np.array(np.meshgrid(v, v, v, v, v, v, v, v, v, indexing='ij'), np.int32).reshape(9, -1).T.reshape(-1, 3, 3)
+    RGR = np.einsum('nji,jk,nkl->nil', R, G, R)
+    ops = R[np.all(np.fabs(RGR - G).reshape(-1, 9) < eps * np.fabs(G).max(), axis=1)]
+
+    if isinstance(parent, Geometry):
+        geometry = parent
+    else:
+        geometry = getattr(parent, "geometry", None)
+    if geometry is None:
+        return ops
+
+    fxyz = geometry.fxyz
+    species = geometry.atoms.specie
+    # Find the specie with least atoms
+    _, idx_s, cnt = np.unique(species, return_index=True, return_counts=True)
+    ia = idx_s[np.argmin(cnt)]
+    candidates = (species == species[ia]).nonzero()[0]
+    same_specie = species.reshape(-1, 1) == species.reshape(1, -1)
+
+    def is_symmetric(op):
+        f = dot(fxyz, op.T)
+        for ja in candidates:
+            # fractional translation
+            t = fxyz[ja] - f[ia]
+            d = (f + t).reshape(-1, 1, 3) - fxyz.reshape(1, -1, 3)
+            d -= np.rint(d)
+            d = (dot(d, cell) ** 2).sum(-1) < eps ** 2
+            if np.all(np.logical_and(d, same_specie).any(1)):
+                return True
+        return False
+
+    return ops[[is_symmetric(op) for op in ops]]
+
+
 @set_module("sisl.physics")
 class BrillouinZone:
     """ A class to construct Brillouin zone related quantities
@@ -777,6 +845,7 @@ class BrillouinZone:
                          'parent': self.parent,
                 }
 
+                import xarray
                 return xarray.DataArray(a, coords=coords, name=name, attrs=attrs)
 
             # Set instance __bz_call
@@ -1151,6 +1220,16 @@ class MonkhorstPack(BrillouinZone):
        whether the k-points are :math:`\Gamma`-centered (for zero displacement)
     trs : bool, optional
        whether time-reversal symmetry exists in the Brillouin zone.
+    symmetry : bool or array_like of int, optional
+       reduce the k-points to the irreducible wedge of the Brillouin zone using
+       the point group operations of the crystal.
+       If ``True`` the operations are detected from the parent (lattice vectors and, if available, atomic positions),
+       otherwise it should be a list of integer rotation matrices in the basis
+       of the lattice vectors (fractional coordinates).
+       Only the operations that map the Monkhorst-Pack grid onto itself are used.
+       The mapping to the full grid is available through `unfold`.
+       Note that one should *not* use symmetries that are broken by the physical quantities
+       (e.g. magnetic moments).
 
     Examples
     --------
@@ -1158,10 +1237,17 @@ class MonkhorstPack(BrillouinZone):
     >>> MonkhorstPack(sc, 10) # 10 x 10 x 10 (with TRS)
     >>> MonkhorstPack(sc, [10, 5, 5]) # 10 x 5 x 5 (with TRS)
     >>> MonkhorstPack(sc, [10, 5, 5], trs=False) # 10 x 5 x 5 (without TRS)
+    >>> MonkhorstPack(sc, 10, symmetry=True) # 10 x 10 x 10 reduced by the cubic point group
     """
 
-    def __init__(self, parent, nkpt, displacement=None, size=None, centered=True, trs=True):
+    def __init__(self, parent, nkpt, displacement=None, size=None, centered=True, trs=True, symmetry=None):
         super().__init__(parent)
+        self._unfold = None
+        self._kbox = None
+
+        if symmetry is not None and symmetry is not False:
+            self._init_symmetry(nkpt, displacement, size, centered, trs, symmetry)
+            return
 
         if isinstance(nkpt, Integral):
             nkpt = np.diag([nkpt] * 3)
@@ -1282,6 +1368,80 @@ class MonkhorstPack(BrillouinZone):
         self._centered = centered
         self._trs = i_trs
 
+    def _init_symmetry(self, nkpt, displacement, size, centered, trs, symmetry):
+        """ Create the irreducible k-points using the point group operations `symmetry` """
+        # Create the full grid
+        self.__init__(self.parent, nkpt, displacement, size, centered, trs=False)
+        if not np.allclose(self._size, 1.):
+            raise SislError(f"{self.__class__.__name__} can only use symmetries when sampling the full Brillouin zone (size=1).")
+
+        if symmetry is True:
+            ops = _symmetry_operations(self.parent)
+        else:
+            ops = _close_group(_a.arrayi(symmetry).reshape(-1, 3, 3))
+        if trs:
+            # Time reversal symmetry is the same as adding inversion
+            ops = _close_group(np.concatenate((ops, -ops), axis=0))
+
+        Dn = self._diag
+        displ = self._displ
+        kw = [self.grid(Dn[i], displ[i], 1., centered, False)[0] for i in (0, 1, 2)]
+
+        def k2idx(k):
+            """ Convert k-points to indices in the grid, -1 if not on the grid """
+            idx = np.empty(k.shape, dtype=np.int32)
+            for i in (0, 1, 2):
+                j = np.rint((k[:, i] - kw[i][0]) * Dn[i]).astype(np.int32) % Dn[i]
+                d = k[:, i] - kw[i][j]
+                d -= np.rint(d)
+                j[np.fabs(d) > 1e-8] = -1
+                idx[:, i] = j
+            return idx
+
+        k = self._k
+        w = self._w
+        # k-points transform with the transpose of the inverse operation, since
+        # the inverse is also in the group we simply use the transposed operation
+        # (k as row-vectors)
+        index = [_a.arangei(len(k))]
+        for op in ops:
+            idx = k2idx(k.dot(op))
+            if np.any(idx < 0):
+                # this operation does not map the grid onto itself
+                continue
+            index.append(np.ravel_multi_index(idx.T, Dn))
+        # Since the operations form a group, the minimum index
+        # is the same for all k-points in a star.
+        index = np.min(index, axis=0)
+
+        irr, index = np.unique(index, return_inverse=True)
+        self._unfold = (k, index.astype(np.int32))
+        self._k = k[irr].copy()
+        self._w = np.bincount(index, weights=w)
+        self._trs = -1
+
+    def unfold(self):
+        r""" Return the full Monkhorst-Pack grid and the mapping to the irreducible k-points
+
+        This is only available when the object has been created with `symmetry`.
+        Quantities calculated at the irreducible k-points may be unfolded to the full
+        grid via ``data[index]`` (for symmetry invariant quantities such as eigenvalues).
+
+        Returns
+        -------
+        k : numpy.ndarray
+           all k-points in the full Monkhorst-Pack grid
+        index : numpy.ndarray
+           for each k-point in the full grid, the index of the equivalent k-point in `k`
+
+        Raises
+        ------
+        SislError : if this object has not been created with symmetries
+        """
+        if self._unfold is None:
+            raise SislError(f"{self.__class__.__name__}.unfold requires the object to be created with symmetry reduction.")
+        return self._unfold[0].copy(), self._unfold[1].copy()
+
     def __str__(self):
         """ String representation of MonkhorstPack """
         if isinstance(self.parent, SuperCell):
@@ -1302,6 +1462,8 @@ class MonkhorstPack(BrillouinZone):
         state['size'] = self._size
         state['centered'] = self._centered
         state['trs'] = self._trs
+        state['unfold'] = self._unfold
+        state['kbox'] = self._kbox
         return state
 
     def __setstate__(self, state):
@@ -1312,12 +1474,17 @@ class MonkhorstPack(BrillouinZone):
         self._size = state['size']
         self._centered = state['centered']
         self._trs = state['trs']
+        self._unfold = state.get('unfold', None)
+        self._kbox = state.get('kbox', None)
 
     def copy(self):
         """ Create a copy of this object """
         bz = self.__class__(self.parent, self._diag, self._displ, self._size, self._centered, self._trs >= 0)
         bz._k = self._k.copy()
         bz._w = self._w.copy()
+        bz._unfold = self._unfold
+        if self._kbox is not None:
+            bz._kbox = self._kbox.copy()
         return bz
 
     def asgrid(self):
@@ -1449,31 +1616,37 @@ class MonkhorstPack(BrillouinZone):
             # Create the grid in the reciprocal cell
             sc = SuperCell(cell, origo=origo)
             grid = Grid(diag, sc=sc, dtype=v.dtype)
-            if data_axis is None:
-                grid[k2idx(k[0])] = v
-            else:
-                idx = k2idx(k[0]).tolist()
-                weight = weights[idx[data_axis]]
-                idx[data_axis] = slice(None)
-                grid[tuple(idx)] = v * weight
 
+            if self._unfold is None:
+                def kstar(i):
+                    return k[i:i+1]
+            else:
+                # Unfold the irreducible k-points to all equivalent k-points
+                k_full, k_index = self._unfold
+                kstars = np.split(k_full[argsort(k_index, kind='stable')],
+                                  np.cumsum(np.bincount(k_index, minlength=len(k)))[:-1])
+                def kstar(i):
+                    return kstars[i]
+
+            def set_grid(i, v):
+                for ks in kstar(i):
+                    if data_axis is None:
+                        grid[tuple(k2idx(ks))] = v
+                    else:
+                        idx = k2idx(ks).tolist()
+                        weight = weights[idx[data_axis]]
+                        idx[data_axis] = slice(None)
+                        grid[tuple(idx)] = v * weight
+
+            set_grid(0, v)
             del v
 
             # Now perform calculation
             eta.update()
-            if data_axis is None:
-                for i in range(1, len(k)):
-                    grid[k2idx(k[i])] = wrap(func(*args, k=k[i], **kwargs),
-                                             parent=parent, k=k[i], weight=w[i])
-                    eta.update()
-            else:
-                for i in range(1, len(k)):
-                    idx = k2idx(k[i]).tolist()
-                    weight = weights[idx[data_axis]]
-                    idx[data_axis] = slice(None)
-                    grid[tuple(idx)] = wrap(func(*args, k=k[i], **kwargs),
-                                            parent=parent, k=k[i], weight=w[i]) * weight
-                    eta.update()
+            for i in range(1, len(k)):
+                set_grid(i, wrap(func(*args, k=k[i], **kwargs),
+                                 parent=parent, k=k[i], weight=w[i]))
+                eta.update()
             eta.close()
             return grid
 
@@ -1664,10 +1837,89 @@ class MonkhorstPack(BrillouinZone):
 
         self._k = np.delete(self._k, idx, axis=0)
         self._w = np.delete(self._w, idx)
+        # The mapping to the full grid is no longer valid
+        self._unfold = None
 
         # Append the new k-points and weights
         self._k = np.concatenate((self._k, mp._k), axis=0)
         self._w = np.concatenate((self._w, mp._w * weight_factor))
+        if self._kbox is not None:
+            self._kbox = np.concatenate((np.delete(self._kbox, idx, axis=0),
+                                         np.tile(mp._size / mp._diag, (len(mp), 1))), axis=0)
+
+    def refine(self, E, nkpt=2, levels=1, dE=0., func=None):
+        r""" Adaptively refine k-points with eigenvalues close to the energies `E`
+
+        Each k-point with at least one eigenvalue in the energy window ``[min(E) - dE, max(E) + dE]``
+        is replaced by a sub-grid of ``nkpt`` points along each periodic direction, covering the
+        same Brillouin zone volume as the original k-point. The weight of the k-point is equally
+        distributed among the new k-points. This is repeated `levels` times, i.e. one may
+        converge quantities such as the DOS or the Fermi level with far fewer k-points
+        than a uniform grid would require.
+
+        Only directions with more than one k-point are refined.
+
+        Parameters
+        ----------
+        E : float or array_like
+           energy (or energy window) of interest
+        nkpt : int or array_like of int, optional
+           number of sub-divisions of each refined k-point (per lattice vector)
+        levels : int, optional
+           number of successive refinements
+        dE : float, optional
+           extend the energy window by this amount on both sides
+        func : callable, optional
+           function that returns the eigenvalues for a given k-point, defaults to ``self.parent.eigh``
+
+        Examples
+        --------
+        >>> mp = MonkhorstPack(H, [10, 10, 1])
+        >>> mp.refine([-0.1, 0.1], levels=2)
+        >>> DOS = mp.apply.average.eigenvalue(wrap=lambda ev: ev.DOS(E))
+        """
+        if func is None:
+            func = self.parent.eigh
+        E = _a.asarrayd(E).ravel()
+        E_min = E.min() - dE
+        E_max = E.max() + dE
+        if isinstance(nkpt, Integral):
+            nkpt = _a.fulli(3, nkpt)
+        else:
+            nkpt = _a.asarrayi(nkpt)
+        # Only periodic directions are refined
+        nkpt = np.where(self._diag > 1, nkpt, 1)
+        nsub = nkpt.prod()
+        if nsub == 1:
+            return
+
+        if self._kbox is None:
+            self._kbox = np.tile(self._size / self._diag, (len(self), 1))
+        # Offsets of the sub-grid relative to the sub-divided k-point (in units of the box)
+        offset = [(_a.aranged(n) + 0.5) / n - 0.5 for n in nkpt]
+        offset = np.stack(np.meshgrid(*offset, indexing='ij'), axis=-1).reshape(-1, 3)
+
+        # Only calculate eigenvalues once per k-point
+        eigs = [func(k) for k in self.k]
+        for _ in range(levels):
+            idx = [i for i, eig in enumerate(eigs)
+                   if np.logical_and(E_min <= eig, eig <= E_max).any()]
+            if len(idx) == 0:
+                break
+
+            kbox = self._kbox[idx] / nkpt
+            k = (self._k[idx].reshape(-1, 1, 3) + offset.reshape(1, -1, 3) * self._kbox[idx].reshape(-1, 1, 3)).reshape(-1, 3)
+            w = np.repeat(self._w[idx] / nsub, nsub)
+            kbox = np.repeat(kbox, nsub, axis=0)
+
+            self._k = np.concatenate((np.delete(self._k, idx, axis=0), k), axis=0)
+            self._w = np.concatenate((np.delete(self._w, idx), w))
+            self._kbox = np.concatenate((np.delete(self._kbox, idx, axis=0), kbox), axis=0)
+            idx = set(idx)
+            eigs = [eig for i, eig in enumerate(eigs) if i not in idx] + [func(kk) for kk in k]
+
+        # The mapping to the full grid is no longer valid
+        self._unfold = None
 
 
 @set_module("sisl.physics")
@@ -1863,5 +2115,59 @@ class BandStructure(BrillouinZone):
             return dK, dK[xtick], label_tick
         return dK
 
+    def align_index(self, states=None, method="norm", **kwargs):
+        r""" Indices that track (disentangle) the states through all k-points on the path
+
+        Consecutive k-points are aligned by finding the optimal assignment (Hungarian
+        algorithm) of the states minimizing a cost matrix, see `method`.
+        The cost matrices for all consecutive k-points are calculated at once.
+
+        Parameters
+        ----------
+        states : list of State, optional
+           the states at each k-point on the path, if not given they are calculated
+           with ``self.apply.list.eigenstate(**kwargs)``
+        method : {'norm', 'overlap'}
+           'norm' minimizes the residual of the site-norms (see `~sisl.physics.State.align_norm`),
+           'overlap' maximizes the squared overlap :math:`|\langle\psi_{k_i}|\psi_{k_{i+1}}\rangle|^2`
+           of the state coefficients.
+        **kwargs : optional
+           passed to the ``eigenstate`` routine if `states` is not given
+
+        Examples
+        --------
+        >>> bs = BandStructure(H, [[0] * 3, [0.5] * 3], 200)
+        >>> eigs = bs.apply.array.eigh()
+        >>> idx = bs.align_index()
+        >>> eigs = np.take_along_axis(eigs, idx, axis=1)
+
+        Returns
+        -------
+        numpy.ndarray
+            indices of shape ``(len(self), nstates)`` such that ``states[i].sub(index[i])``
+            has the states ordered as in ``states[0]``
+        """
+        from .state import _norm2_residual, _assign
+        if states is None:
+            states = self.apply.list.eigenstate(**kwargs)
+
+        method = method.lower()
+        if method == "norm":
+            norm = np.stack([state.norm2(False) for state in states])
+            cost = _norm2_residual(norm[:-1], norm[1:])
+        elif method == "overlap":
+            state = np.stack([state.state for state in states])
+            cost = np.matmul(np.conj(state[:-1]), state[1:].swapaxes(1, 2))
+            cost = - (cost.real ** 2 + cost.imag ** 2)
+        else:
+            raise ValueError(f"{self.__class__.__name__}.align_index requires the method to be [norm, overlap]")
+
+        index = _a.emptyi([len(states), len(states[0])])
+        index[0] = _a.arangei(index.shape[1])
+        for i in range(1, len(states)):
+            idx, _ = _assign(cost[i - 1])
+            index[i] = idx[index[i - 1]]
+        return index
+
     def __len__(self):
         return sum(self.division)
@@ -16,16 +16,20 @@ One may also plot real-space wavefunctions.
    :toctree:
 
    DOS
+   DOS_tetrahedron
    PDOS
    velocity
    velocity_matrix
    berry_phase
+   wilson_loop
    berry_curvature
    conductivity
    wavefunction
+   WavefunctionProjector
    spin_moment
    spin_orbital_moment
    spin_squared
+   expectation
 
 
 Supporting classes
@@ -62,6 +66,7 @@ from numpy import int32, complex128
 from numpy import add, angle, sort
 
 from sisl._internal import set_module
+from sisl._environ import get_environ_variable
 from sisl import units, constant
 from sisl.supercell import SuperCell
 from sisl.geometry import Geometry
@@ -79,13 +84,14 @@ from .sparse import SparseOrbitalBZSpin
 from .state import Coefficient, State, StateC
 
 
-__all__ = ['DOS', 'PDOS']
+__all__ = ['DOS', 'DOS_tetrahedron', 'PDOS']
 __all__ += ['velocity', 'velocity_matrix']
 __all__ += ['spin_moment', 'spin_orbital_moment', 'spin_squared']
+__all__ += ['expectation']
 __all__ += ['inv_eff_mass_tensor']
-__all__ += ['berry_phase', 'berry_curvature']
+__all__ += ['berry_phase', 'wilson_loop', 'berry_curvature']
 __all__ += ['conductivity']
-__all__ += ['wavefunction']
+__all__ += ['wavefunction', 'WavefunctionProjector']
 __all__ += ['CoefficientElectron', 'StateElectron', 'StateCElectron']
 __all__ += ['EigenvalueElectron', 'EigenvectorElectron', 'EigenstateElectron']
 
@@ -131,6 +137,94 @@ def DOS(E, eig, distribution='gaussian'):
     return reduce(lambda DOS, eig: DOS + distribution(E - eig), eig, 0.)
 
 
+@set_module("sisl.physics.electron")
+def DOS_tetrahedron(E, eig):
+    r""" Calculate the density of states (DOS) using the linear tetrahedron method
+
+    The Brillouin zone is divided into tetrahedra (6 per sub-cell of the :math:`k`-point grid)
+    where the eigenvalues are linearly interpolated. The DOS is then integrated analytically
+    in each tetrahedron, see [1]_. Compared to `DOS` no broadening is required, and the
+    DOS converges much faster with respect to the number of :math:`k`-points.
+
+    The returned DOS is averaged over the Brillouin zone, i.e. equivalent to
+    ``MonkhorstPack.apply.average.eigh(wrap=lambda eig: DOS(E, eig))`` for very dense grids.
+
+    Parameters
+    ----------
+    E : array_like
+       energies to calculate the DOS at
+    eig : array_like
+       electronic eigenvalues on a full periodic :math:`k`-point grid with shape
+       ``(n1, n2, n3, nbands)``. The :math:`k`-points should be ordered as in a `MonkhorstPack`
+       grid without time-reversal symmetry (or use `MonkhorstPack.unfold`).
+
+    Examples
+    --------
+    >>> mp = MonkhorstPack(H, [20, 20, 1], trs=False)
+    >>> eig = mp.apply.array.eigh().reshape(20, 20, 1, -1)
+    >>> DOS = DOS_tetrahedron(np.linspace(-2, 2, 200), eig)
+
+    References
+    ----------
+    .. [1] P. E. Blöchl, O. Jepsen, O. K. Andersen, "Improved tetrahedron method for Brillouin-zone integrations", PRB **49**, 16223 (1994)
+
+    See Also
+    --------
+    DOS : DOS calculated with a distribution function
+
+    Returns
+    -------
+    numpy.ndarray
+        DOS calculated at energies, has same length as `E`
+    """
+    E = _a.asarrayd(E)
+    eig = _a.asarrayd(eig)
+    if eig.ndim != 4:
+        raise ValueError("DOS_tetrahedron: requires the eigenvalues to have shape (n1, n2, n3, nbands)")
+
+    # Eigenvalues at the corners of all sub-cells
+    corners = [np.roll(eig, (-i, -j, -k), axis=(0, 1, 2)).reshape(-1, eig.shape[-1])
+               for k in (0, 1) for j in (0, 1) for i in (0, 1)]
+    # The 6 tetrahedra sharing the diagonal 0-7
+    ntet = 6 * corners[0].shape[0]
+    e = np.stack([np.stack([corners[i] for i in tet], axis=-1)
+                  for tet in ((0, 1, 3, 7), (0, 1, 5, 7), (0, 2, 3, 7),
+                              (0, 2, 6, 7), (0, 4, 5, 7), (0, 4, 6, 7))])
+    e = np.sort(e.reshape(-1, 4), axis=1)
+    del corners
+
+    # Only keep tetrahedra that are within the energy range.
+    # Flat tetrahedra (all corners having the same energy) are delta-functions which
+    # cannot be represented on the energy points, they are neglected.
+    e = e[np.logical_and.reduce((e[:, 0] <= E.max(), e[:, 3] >= E.min(),
+                                 e[:, 3] - e[:, 0] > 1e-10))]
+    e1, e2, e3, e4 = e.T
+    e21, e31, e41 = e2 - e1, e3 - e1, e4 - e1
+    e32, e42, e43 = e3 - e2, e4 - e2, e4 - e3
+
+    # Denominators are strictly positive within each energy interval
+    DOS = _a.zerosd(E.shape)
+    for i, en in enumerate(E):
+        g = np.zeros(len(e))
+
+        idx = np.logical_and(e1 <= en, en < e2)
+        de = en - e1[idx]
+        g[idx] = 3 * de ** 2 / (e21[idx] * e31[idx] * e41[idx])
+
+        idx = np.logical_and(e2 <= en, en < e3)
+        de = en - e2[idx]
+        g[idx] = (3 * e21[idx] + 6 * de
+                  - 3 * (e31[idx] + e42[idx]) * de ** 2 / (e32[idx] * e42[idx])) / (e31[idx] * e41[idx])
+
+        idx = np.logical_and(e3 <= en, en < e4)
+        de = e4[idx] - en
+        g[idx] = 3 * de ** 2 / (e41[idx] * e42[idx] * e43[idx])
+
+        DOS[i] = g.sum()
+
+    return DOS / ntet
+
+
 @set_module("sisl.physics.electron")
 def PDOS(E, eig, state, S=None, distribution='gaussian', spin=None):
     r""" Calculate the projected density of states (PDOS) for a set of energies, `E`, with a distribution function
@@ -264,6 +358,66 @@ def PDOS(E, eig, state, S=None, distribution='gaussian', spin=None):
     return PDOS
 
 
+def _S_dot_state(S, state):
+    r""" Calculate :math:`\mathbf S|\psi\rangle` for all states in `state`
+
+    Parameters
+    ----------
+    S : array_like or list of array_like or None
+       overlap matrix (or operator), if ``None`` the identity is assumed.
+       For stacked states one may pass a list (or 3D array) with one matrix per
+       leading dimension of `state`.
+    state : numpy.ndarray
+       states with the last dimension being the basis, i.e. ``(nstate, no)`` or ``(nk, nstate, no)``
+    """
+    if S is None:
+        return state
+    if state.ndim == 2:
+        return S.dot(state.T).T
+    if isinstance(S, (list, tuple)) or getattr(S, "ndim", 2) == 3:
+        if isinstance(S, np.ndarray):
+            # batched matrix products
+            return np.matmul(state, S.swapaxes(-1, -2))
+        return np.stack([s.dot(st.T).T for s, st in zip(S, state)])
+    shape = state.shape
+    return S.dot(state.reshape(-1, shape[-1]).T).T.reshape(shape)
+
+
+def _spin_S(S, n):
+    r""" Reduce the overlap matrix of a non-colinear calculation to the orbital overlap
+
+    Parameters
+    ----------
+    S : array_like or list of array_like or None
+       overlap matrix (or stack of them)
+    n : int
+       number of elements in the states (twice the number of orbitals)
+    """
+    if S is None:
+        return None
+    elif isinstance(S, (list, tuple)):
+        return [_spin_S(s, n) for s in S]
+    elif S.shape[-1] == n:
+        if getattr(S, "ndim", 2) == 3:
+            return S[:, ::2, ::2]
+        return S[::2, ::2]
+    return S
+
+
+def _spinor_state(state):
+    r""" Return a view of `state` as ``(..., nstate, 2, no)`` (spinor components on the second last axis) """
+    shape = state.shape
+    return state.reshape(shape[:-1] + (shape[-1] // 2, 2)).swapaxes(-1, -2)
+
+
+def _spinor_S_dot_state(S, state):
+    r""" Calculate :math:`\mathbf S|\psi\rangle` for the spinor components in `state` ``(..., nstate, 2, no)`` """
+    shape = state.shape
+    # Merge the spinor components into the state dimension
+    Sstate = _S_dot_state(S, state.reshape(shape[:-3] + (-1, shape[-1])))
+    return Sstate.reshape(shape)
+
+
 @set_module("sisl.physics.electron")
 def spin_moment(state, S=None):
     r""" Calculate the spin magnetic moment (also known as spin texture)
@@ -289,11 +443,15 @@ def spin_moment(state, S=None):
     Parameters
     ----------
     state : array_like
-       vectors describing the electronic states, 2nd dimension contains the states
+       vectors describing the electronic states, 2nd dimension contains the states.
+       Stacked states (e.g. for many :math:`k`-points) of shape ``(nk, nstate, no)``
+       are also allowed, in which case all spin moments are calculated in one go.
     S : array_like, optional
        overlap matrix used in the :math:`\langle\psi|\mathbf S|\psi\rangle` calculation. If `None` the identity
        matrix is assumed. The overlap matrix should correspond to the system and :math:`k` point the eigenvectors
        has been evaluated at.
+       For stacked states this may be a list (or 3D array) of overlap matrices, one for each of the
+       stacked state sets.
 
     Notes
     -----
@@ -309,36 +467,25 @@ def spin_moment(state, S=None):
     Returns
     -------
     numpy.ndarray
-        spin moments per state with final dimension ``(state.shape[0], 3)``.
+        spin moments per state with final dimension ``(state.shape[0], 3)``, or
+        ``(nk, nstate, 3)`` for stacked states.
     """
     if state.ndim == 1:
         return spin_moment(state.reshape(1, -1), S).ravel()
 
-    if S is None:
-        class S:
-            __slots__ = []
-            shape = (state.shape[1] // 2, state.shape[1] // 2)
-            @staticmethod
-            def dot(v):
-                return v
+    S = _spin_S(S, state.shape[-1])
 
-    if S.shape[1] == state.shape[1]:
-        S = S[::2, ::2]
+    state = _spinor_state(state)
+    Sstate = _spinor_S_dot_state(S, state)
 
     # Initialize
-    s = np.empty([state.shape[0], 3], dtype=dtype_complex_to_real(state.dtype))
-
-    # TODO consider doing this all in a few lines
-    # TODO Since there are no energy dependencies here we can actually do all
-    # TODO dot products in one go and then use b-casting rules. Should be much faster
-    # TODO but also way more memory demanding!
-    for i in range(len(state)):
-        Sstate = S.dot(state[i].reshape(-1, 2))
-        D = (conj(state[i]) * Sstate.ravel()).real.reshape(-1, 2).sum(0)
-        s[i, 2] = D[0] - D[1]
-        D = 2 * conj(state[i, 1::2]).dot(Sstate[:, 0])
-        s[i, 0] = D.real
-        s[i, 1] = D.imag
+    s = np.empty(state.shape[:-2] + (3,), dtype=dtype_complex_to_real(state.dtype))
+
+    D = (conj(state) * Sstate).real.sum(-1)
+    s[..., 2] = D[..., 0] - D[..., 1]
+    D = 2 * (conj(state[..., 1, :]) * Sstate[..., 0, :]).sum(-1)
+    s[..., 0] = D.real
+    s[..., 1] = D.imag
 
     return s
 
@@ -370,11 +517,15 @@ def spin_orbital_moment(state, S=None):
     Parameters
     ----------
     state : array_like
-       vectors describing the electronic states, 2nd dimension contains the states
+       vectors describing the electronic states, 2nd dimension contains the states.
+       Stacked states (e.g. for many :math:`k`-points) of shape ``(nk, nstate, no)``
+       are also allowed.
     S : array_like, optional
        overlap matrix used in the :math:`\mathbf S|\psi\rangle` calculation. If `None` the identity
        matrix is assumed. The overlap matrix should correspond to the system and :math:`k` point the eigenvectors
        has been evaluated at.
+       For stacked states this may be a list (or 3D array) of overlap matrices, one for each of the
+       stacked state sets.
 
     Notes
     -----
@@ -390,31 +541,24 @@ def spin_orbital_moment(state, S=None):
     Returns
     -------
     numpy.ndarray
-        spin moments per state with final dimension ``(state.shape[0], state.shape[1] // 2, 3)``.
+        spin moments per state with final dimension ``(state.shape[0], state.shape[1] // 2, 3)``, or
+        ``(nk, nstate, no // 2, 3)`` for stacked states.
     """
     if state.ndim == 1:
         return spin_orbital_moment(state.reshape(1, -1), S)[0]
 
-    if S is None:
-        class S:
-            __slots__ = []
-            shape = (state.shape[1] // 2, state.shape[1] // 2)
-            @staticmethod
-            def dot(v):
-                return v
+    S = _spin_S(S, state.shape[-1])
 
-    if S.shape[1] == state.shape[1]:
-        S = S[::2, ::2]
+    state = _spinor_state(state)
+    Sstate = _spinor_S_dot_state(S, state)
 
-    s = np.empty([state.shape[0], state.shape[1] // 2, 3], dtype=dtype_complex_to_real(state.dtype))
+    s = np.empty(state.shape[:-2] + (state.shape[-1], 3), dtype=dtype_complex_to_real(state.dtype))
 
-    for i in range(len(state)):
-        Sstate = S.dot(state[i].reshape(-1, 2))
-        D = (conj(state[i]) * Sstate.ravel()).real.reshape(-1, 2)
-        s[i, :, 2] = D[:, 0] - D[:, 1]
-        D = 2 * conj(state[i, 1::2]) * Sstate[:, 0]
-        s[i, :, 0] = D.real
-        s[i, :, 1] = D.imag
+    D = (conj(state) * Sstate).real
+    s[..., 2] = D[..., 0, :] - D[..., 1, :]
+    D = 2 * conj(state[..., 1, :]) * Sstate[..., 0, :]
+    s[..., 0] = D.real
+    s[..., 1] = D.imag
 
     return s
 
@@ -439,13 +583,17 @@ def spin_squared(state_alpha, state_beta, S=None):
     Parameters
     ----------
     state_alpha : array_like
-       vectors describing the electronic states of spin-channel :math:`\alpha`, 2nd dimension contains the states
+       vectors describing the electronic states of spin-channel :math:`\alpha`, 2nd dimension contains the states.
+       Stacked states (e.g. for many :math:`k`-points) of shape ``(nk, nstate, no)`` are also allowed.
     state_beta : array_like
-       vectors describing the electronic states of spin-channel :math:`\beta`, 2nd dimension contains the states
+       vectors describing the electronic states of spin-channel :math:`\beta`, 2nd dimension contains the states.
+       Must be stacked in the same way as `state_alpha`.
     S : array_like, optional
        overlap matrix used in the :math:`\langle\psi|\mathbf S|\psi\rangle` calculation. If `None` the identity
        matrix is assumed. The overlap matrix should correspond to the system and :math:`k` point the eigenvectors
        have been evaluated at.
+       For stacked states this may be a list (or 3D array) of overlap matrices, one for each of the
+       stacked state sets.
 
     Notes
     -----
@@ -464,45 +612,63 @@ def spin_squared(state_alpha, state_beta, S=None):
     elif state_beta.ndim == 1:
         return spin_squared(state_alpha, state_beta.reshape(1, -1), S)
 
-    if state_alpha.shape[1] != state_beta.shape[1]:
+    if state_alpha.shape[-1] != state_beta.shape[-1]:
         raise ValueError("spin_squared requires alpha and beta states to have same number of orbitals")
 
-    if S is None:
-        class S:
-            __slots__ = []
-            shape = (state_alpha.shape[1], state_alpha.shape[1])
-            @staticmethod
-            def dot(v):
-                return v
+    # <alpha_i | S | beta_j>
+    D = np.matmul(conj(state_alpha), _S_dot_state(S, state_beta).swapaxes(-1, -2))
+    D = (D * conj(D)).real
 
-    n_alpha = state_alpha.shape[0]
-    n_beta = state_beta.shape[0]
+    return oplist((D.sum(-1), D.sum(-2)))
 
-    if n_alpha > n_beta:
-        # Loop beta...
-        Sa = zeros([n_alpha], dtype=dtype_complex_to_real(state_alpha.dtype))
-        Sb = empty([n_beta], dtype=Sa.dtype)
 
-        S_state_alpha = S.dot(state_alpha.T)
-        for i in range(n_beta):
-            D = dot(conj(state_beta[i]), S_state_alpha)
-            D *= conj(D)
-            Sa += D.real
-            Sb[i] = D.sum().real
+@set_module("sisl.physics.electron")
+def expectation(state, A, diag=True):
+    r""" Calculate the expectation value of matrix `A` for the states
 
+    The expectation matrix is calculated as:
+
+    .. math::
+        A_{ij} = \langle \psi_i | \mathbf A | \psi_j \rangle
+
+    If `diag` is true, only the diagonal elements are returned.
+
+    Parameters
+    ----------
+    state : array_like
+       vectors describing the states, 2nd dimension contains the states.
+       Stacked states (e.g. for many :math:`k`-points) of shape ``(nk, nstate, no)`` are also allowed.
+    A : array_like
+       a vector or matrix that expresses the operator `A`.
+       For stacked states this may be a list (or 3D array) of matrices, one for each of the
+       stacked state sets.
+    diag : bool, optional
+       whether only the diagonal elements are calculated or if the full expectation
+       matrix is calculated
+
+    Returns
+    -------
+    numpy.ndarray
+        a vector if `diag` is true, otherwise a matrix with expectation values (with
+        a leading dimension for stacked states)
+    """
+    if isinstance(A, (list, tuple)):
+        ndim = 3
     else:
-        # Loop alpha...
-        Sa = empty([n_alpha], dtype=dtype_complex_to_real(state_alpha.dtype))
-        Sb = zeros([n_beta], dtype=Sa.dtype)
+        ndim = A.ndim
+    s = state
 
-        S_state_beta = S.dot(state_beta.T)
-        for i in range(n_alpha):
-            D = dot(conj(state_alpha[i]), S_state_beta)
-            D *= conj(D)
-            Sb += D.real
-            Sa[i] = D.sum().real
+    if ndim == 1:
+        if diag:
+            return einsum("...ij,j,...ij->...i", s.conj(), A, s)
+        return einsum("...ij,j,...kj->...ik", s.conj(), A, s)
+    elif ndim not in (2, 3):
+        raise ValueError("expectation: requires matrix A to be 1D, 2D or a stack of 2D matrices")
 
-    return oplist((Sa, Sb))
+    As = _S_dot_state(A, s)
+    if diag:
+        return einsum("...ij,...ij->...i", s.conj(), As)
+    return np.matmul(s.conj(), As.swapaxes(-1, -2))
 
 
 @set_module("sisl.physics.electron")
@@ -847,7 +1013,8 @@ def _berry_curvature(v_M, energy, degenerate):
 
 
 @set_module("sisl.physics.electron")
-def conductivity(bz, distribution='fermi-dirac', method='ahc', complex=False):
+def conductivity(bz, distribution='fermi-dirac', method='ahc', complex=False,
+                 window=None, eps=1e-4, nthreads=1):
     r""" Electronic conductivity for a given `BrillouinZone` integral
 
     Currently the *only* implemented method is the anomalous Hall conductivity (AHC)
@@ -859,6 +1026,16 @@ def conductivity(bz, distribution='fermi-dirac', method='ahc', complex=False):
     where :math:`\Omega_{n,\alpha\beta}` is the Berry curvature for state :math:`n` and :math:`f_n` is
     the occupation for state :math:`n`.
 
+    Since the Berry curvature is anti-symmetric in the state pairs, only pairs of states
+    with different occupations contribute to the (real) conductivity:
+
+    .. math::
+       \sum_nf_n\Omega_{n,\alpha\beta} = -2\Im\sum_{n<m}(f_n-f_m)
+          \frac{v_{nm,\alpha} v_{mn,\beta}}{[\epsilon_m - \epsilon_n]^2}
+
+    Hence only the occupied-unoccupied block of the velocity matrix is calculated (for states
+    within `window`), and the k-points are reduced using `nthreads` threads.
+
     Parameters
     ----------
     bz : BrillouinZone
@@ -868,7 +1045,16 @@ def conductivity(bz, distribution='fermi-dirac', method='ahc', complex=False):
     method : {'ahc'}
        'ahc' calculates the anomalous Hall conductivity
     complex : logical, optional
-       whether the returned quantity is complex valued
+       whether the returned quantity is complex valued, in this case the Berry
+       curvature of all states are calculated (`window` and `nthreads` are not used).
+    window : (float, float), optional
+       only states with energies in this window are included, by default all states
+       are included
+    eps : float, optional
+       precision used to find degenerate states (which do not contribute)
+    nthreads : int, optional
+       number of threads used for the k-point integration, if ``None``
+       it will be determined by the ``SISL_NPROCS`` environment variable.
 
     See Also
     --------
@@ -884,18 +1070,95 @@ def conductivity(bz, distribution='fermi-dirac', method='ahc', complex=False):
 
     method = method.lower()
     if method == 'ahc':
-        def _ahc(es):
-            occ = distribution(es.eig)
-            bc = es.berry_curvature(complex=complex)
-            return einsum('i,ijl->jl', occ, bc)
+        if complex:
+            def _ahc(es):
+                occ = distribution(es.eig)
+                bc = es.berry_curvature(complex=complex)
+                return einsum('i,ijl->jl', occ, bc)
 
-        cond = - bz.apply.average.eigenstate(wrap=_ahc) / constant.hbar('eV ps')
+            cond = - bz.apply.average.eigenstate(wrap=_ahc) / constant.hbar('eV ps')
+        else:
+            cond = - _ahc_average(bz, distribution, window, eps, nthreads) / constant.hbar('eV ps')
     else:
         raise SislError("conductivity: requires the method to be [ahc]")
 
     return cond
 
 
+def _ahc_average(bz, distribution, window, eps, nthreads):
+    r""" Brillouin zone average of :math:`\sum_n f_n\Omega_n` using only the occupied-unoccupied blocks
+
+    For each pair of states :math:`r` (occupied) and :math:`u` (unoccupied)
+    the contribution is :math:`f_r\Im X_{ru} + f_u\Im X_{ur}` which for
+    an orthogonal basis equals :math:`(f_r-f_u)\Im X_{ru}`.
+    """
+    H = bz.parent
+    if not H.orthogonal:
+        warn("conductivity calculation for non-orthogonal basis sets are not tested! Do not expect this to be correct!")
+    # occupations below this are considered unoccupied (and vice versa)
+    occ_eps = 1e-12
+
+    def calc_k(k):
+        # states are in the columns
+        eig, state = H.eigh(k, eigvals_only=False)
+        if window is not None:
+            idx = np.logical_and(window[0] <= eig, eig <= window[1]).nonzero()[0]
+            eig = eig[idx]
+            state = state[:, idx]
+        occ = distribution(eig)
+        r = (occ > occ_eps).nonzero()[0]
+        u = (occ < 1 - occ_eps).nonzero()[0]
+        if len(r) == 0 or len(u) == 0:
+            return 0.
+
+        # (3, no, nu), then batched (3, nr, nu) blocks
+        dHk = H.dHk(k, dtype=complex128)
+        D = np.stack([d.dot(state[:, u]) for d in dHk])
+        B = np.matmul(conj(state[:, r].T), D)
+        dE = eig[u].reshape(1, -1) - eig[r].reshape(-1, 1)
+        if H.orthogonal:
+            C = B
+        else:
+            D = np.stack([d.dot(state[:, u]) for d in H.dSk(k, dtype=complex128)])
+            S = np.matmul(conj(state[:, r].T), D)
+            # <r|dH - e_u dS|u> and conj(<u|dH - e_r dS|r>)
+            B -= S * eig[u].reshape(1, 1, -1)
+            C = B + S * dE.reshape(1, *dE.shape)
+
+        # remove degenerate states (and the state itself)
+        fac = np.zeros(dE.shape)
+        nondeg = np.fabs(dE) >= eps
+        fac[nondeg] = -2 / dE[nondeg] ** 2
+        # pairs of partially occupied states are counted twice
+        partial = np.logical_and(occ_eps < occ, occ < 1 - occ_eps)
+        fac[np.logical_and(partial[r].reshape(-1, 1), partial[u].reshape(1, -1))] *= 0.5
+
+        Fr = (fac * occ[r].reshape(-1, 1)).reshape(1, -1)
+        Fu = (fac * occ[u].reshape(1, -1)).reshape(1, -1)
+        B = B.reshape(3, -1)
+        C = C.reshape(3, -1)
+        return (dot(B * Fr, conj(C.T)) - dot(C * Fu, conj(B.T))).imag
+
+    def calc_ks(ks, ws):
+        # local accumulation of the k-points
+        cond = zeros([3, 3])
+        for k, w in zip(ks, ws):
+            cond += calc_k(k) * w
+        return cond
+
+    k = bz.k
+    w = bz.weight
+    if nthreads is None:
+        nthreads = get_environ_variable("SISL_NPROCS")
+    if nthreads > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        ks = np.array_split(k, nthreads)
+        ws = np.array_split(w, nthreads)
+        with ThreadPoolExecutor(nthreads) as executor:
+            return reduce(add, executor.map(calc_ks, ks, ws))
+    return calc_ks(k, w)
+
+
 @set_module("sisl.physics.electron")
 def inv_eff_mass_tensor(state, ddHk, energy=None, ddSk=None, degenerate=None, as_matrix=False):
     r""" Calculate the effective mass tensor for a set of states (missing off-diagonal terms)
@@ -1220,6 +1483,138 @@ def berry_phase(contour, sub=None, eigvals=False, closed=True, method='berry'):
     return ret
 
 
+@set_module("sisl.physics.electron")
+def wilson_loop(H, k, sub=None, closed=True, nthreads=1):
+    r""" Calculate the Wilson loop eigenphases along many contours simultaneously
+
+    For each contour (line) in `k` the Wilson loop is calculated as:
+
+    .. math::
+       \mathbf W = \prod_i^{N-1} \mathbf M_{i,i+1},\qquad
+       \mathbf M_{i,i+1} = \mathbf U \mathbf V^\dagger,\quad
+       \mathbf U\boldsymbol\Sigma\mathbf V^\dagger = \langle \psi_{k_i} | \psi_{k_{i+1}} \rangle
+
+    and the eigenphases :math:`-\Im\ln\lambda` of :math:`\mathbf W` are returned.
+    This is equivalent to ``berry_phase(..., eigvals=True)`` for each line.
+
+    The eigenstates are only calculated once for every unique k-point (modulo a reciprocal
+    lattice vector) in `k`, i.e. k-points shared between contours, or contours across
+    the Brillouin zone (:math:`\mathbf k` and :math:`\mathbf k+\mathbf G`), are only diagonalized once.
+    The overlap matrices of all contours are calculated together (batched over the contours).
+
+    Parameters
+    ----------
+    H : Hamiltonian
+       the Hamiltonian (in an orthogonal basis) used to calculate the eigenstates
+    k : array_like
+       k-points (in reduced coordinates) of the contours, with shape ``(ncontour, nk, 3)``.
+       A contour crossing the Brillouin zone should end at the first k-point plus a reciprocal lattice
+       vector, e.g. ``[0, 0, 0] -> [0, 1, 0]``; the Bloch phase :math:`e^{-i\mathbf G\mathbf r}`
+       is then taken into account (Zak phase).
+    sub : None or list of int, optional
+       selected bands to calculate the Wilson loop of
+    closed : bool, optional
+       whether or not to include the connection of the last and first points in the loops, only
+       used for the contours where the first and last k-points are not equivalent
+    nthreads : int, optional
+       number of threads used for calculating the eigenstates, if ``None``
+       it will be determined by the ``SISL_NPROCS`` environment variable.
+
+    Returns
+    -------
+    numpy.ndarray
+        sorted eigenphases of the Wilson loops, shape ``(ncontour, nbands)``
+
+    Examples
+    --------
+
+    Calculate the Wilson loop spectrum (hybrid Wannier centers) of the occupied bands
+    along :math:`k_2` for 21 values of :math:`k_1`
+
+    >>> k1 = np.linspace(0, 0.5, 21)
+    >>> k2 = np.linspace(0, 1, 51)
+    >>> k = np.zeros([k1.size, k2.size, 3])
+    >>> k[:, :, 0] = k1.reshape(-1, 1)
+    >>> k[:, :, 1] = k2.reshape(1, -1)
+    >>> phases = wilson_loop(H, k, sub=range(nocc))
+
+    See Also
+    --------
+    berry_phase : the Berry phase for a single contour
+    """
+    from .hamiltonian import Hamiltonian
+    if not isinstance(H, Hamiltonian):
+        raise SislError("wilson_loop: requires a Hamiltonian!")
+    if not H.orthogonal:
+        raise SislError("wilson_loop: requires the Hamiltonian to use an orthogonal basis!")
+
+    k = _a.asarrayd(k)
+    if k.ndim != 3 or k.shape[2] != 3:
+        raise ValueError("wilson_loop: requires k to have shape (ncontour, nk, 3)")
+    nc, nk = k.shape[:2]
+
+    # Reduce all k-points to the first Brillouin zone [0; 1[ and find
+    # the unique k-points. States at k and k + G only differ by the Bloch phase
+    # which is automatically accounted for in the r gauge below.
+    kr = k - floor(k + 1e-8)
+    # adding 0. converts -0. to 0. (unique compares the bytes)
+    kr = np.around(kr, 8) + 0.
+    kr, ik = np.unique(kr.reshape(-1, 3), axis=0, return_inverse=True)
+    ik.shape = (nc, nk)
+
+    # Contours ending at the first point (or the first point + G) explicitly
+    # include the closing link, for the others it is added if requested
+    closed = closed & (ik[:, 0] != ik[:, -1])
+
+    def calc_state(k):
+        es = H.eigenstate(k, gauge='R')
+        if sub is not None:
+            es = es.sub(sub)
+        return es.state
+
+    if nthreads is None:
+        nthreads = get_environ_variable("SISL_NPROCS")
+    if nthreads > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(nthreads) as executor:
+            state = np.stack(list(executor.map(calc_state, kr)))
+    else:
+        state = np.stack(list(map(calc_state, kr)))
+    # (nk-unique, nbands, norbs)
+    nb = state.shape[1]
+
+    # Bloch phases for the r gauge using the *original* k-points
+    g = H.geometry
+    xyz = g.xyz[g.o2a(_a.arangei(g.no)), :]
+    if H.spin.has_noncolinear:
+        # for NC/SOC we have a 2x2 spin-box per orbital
+        xyz = np.repeat(xyz, 2, axis=0)
+    rk = dot(xyz, g.rcell.T)
+
+    def get_states(i):
+        # states of all contours at index i in the r-gauge
+        phase = np.exp(1j * dot(k[:, i], rk.T))
+        return state[ik[:, i]] * phase.reshape(nc, 1, -1)
+
+    def link(bra, ket):
+        # unitary part of the overlap matrices of all contours
+        U, _, V = np.linalg.svd(np.matmul(conj(bra), ket.transpose(0, 2, 1)))
+        return np.matmul(U, V)
+
+    first = get_states(0)
+    prev = first
+    W = np.broadcast_to(np.identity(nb, dtype=complex128), (nc, nb, nb))
+    for i in range(1, nk):
+        second = get_states(i)
+        W = np.matmul(W, link(prev, second))
+        prev = second
+    if closed.any():
+        W = W.copy()
+        W[closed] = np.matmul(W[closed], link(prev[closed], first[closed]))
+
+    return sort(-angle(np.linalg.eigvals(W)), axis=-1)
+
+
 @set_module("sisl.physics.electron")
 def wavefunction(v, grid, geometry=None, k=None, spinor=0, spin=None, eta=False):
     r""" Add the wave-function (`Orbital.psi`) component of each orbital to the grid
@@ -1262,6 +1657,9 @@ def wavefunction(v, grid, geometry=None, k=None, spinor=0, spin=None, eta=False)
 
     where :math:`j` is the orbital index and :math:`\mathbf r_j` is the orbital position.
 
+    When many states should be expanded on the same grid one should rather use
+    `WavefunctionProjector` which only calculates the orbital values on the grid once.
+
 
     Parameters
     ----------
@@ -1290,274 +1688,411 @@ def wavefunction(v, grid, geometry=None, k=None, spinor=0, spin=None, eta=False)
        influence for non-colinear wavefunctions where `spinor` choice is important.
     eta : bool, optional
        Display a console progressbar.
-    """
-    if geometry is None:
-        geometry = grid.geometry
-    if geometry is None:
-        raise SislError("wavefunction: did not find a usable Geometry through keywords or the Grid!")
 
+    See Also
+    --------
+    WavefunctionProjector : expand many states on the same grid
+    """
+    v = np.asarray(v)
     # In case the user has passed several vectors we sum them to plot the summed state
     if v.ndim == 2:
         if v.shape[0] > 1:
             info(f"wavefunction: summing {v.shape[0]} different state coefficients, will continue silently!")
         v = v.sum(0)
 
-    if spin is None:
-        if len(v) // 2 == geometry.no:
-            # We can see from the input that the vector *must* be a non-colinear calculation
-            v = v.reshape(-1, 2)[:, spinor]
-            info("wavefunction: assumes the input wavefunction coefficients to originate from a non-colinear calculation!")
+    proj = WavefunctionProjector(grid, geometry, eta=eta)
+    proj.project(v, k=k, spinor=spinor, spin=spin, out=grid.grid)
 
-    elif spin.kind > Spin.POLARIZED:
-        # For non-colinear cases the user selects the spinor component.
-        v = v.reshape(-1, 2)[:, spinor]
 
-    if len(v) != geometry.no:
-        raise ValueError("wavefunction: require wavefunction coefficients corresponding to number of orbitals in the geometry.")
+@set_module("sisl.physics.electron")
+class WavefunctionProjector:
+    r""" Orbital values on a real-space grid for fast expansion of many states
 
-    # Check for k-points
-    k = _a.asarrayd(k)
-    kl = k.dot(k) ** 0.5
-    has_k = kl > 0.000001
-    if has_k:
-        info('wavefunction: k != Gamma is currently untested!')
-
-    # Check that input/grid makes sense.
-    # If the coefficients are complex valued, then the grid *has* to be
-    # complex valued.
-    # Likewise if a k-point has been passed.
-    is_complex = np.iscomplexobj(v) or has_k
-    if is_complex and not np.iscomplexobj(grid.grid):
-        raise SislError("wavefunction: input coefficients are complex, while grid only contains real.")
-
-    if is_complex:
-        psi_init = _a.zerosz
-    else:
-        psi_init = _a.zerosd
-
-    # Extract sub variables used throughout the loop
-    shape = _a.asarrayi(grid.shape)
-    dcell = grid.dcell
-    ic_shape = grid.sc.icell * shape.reshape(3, 1)
-
-    # Convert the geometry (hosting the wavefunction coefficients) coordinates into
-    # grid-fractionals X grid-shape to get index-offsets in the grid for the geometry
-    # supercell.
-    geom_shape = dot(geometry.cell, ic_shape.T)
-
-    # In the following we don't care about division
-    # So 1) save error state, 2) turn off divide by 0, 3) calculate, 4) turn on old error state
-    old_err = np.seterr(divide='ignore', invalid='ignore')
-
-    addouter = add.outer
-    def idx2spherical(ix, iy, iz, offset, dc, R):
-        """ Calculate the spherical coordinates from indices """
-        rx = addouter(addouter(ix * dc[0, 0], iy * dc[1, 0]), iz * dc[2, 0] - offset[0]).ravel()
-        ry = addouter(addouter(ix * dc[0, 1], iy * dc[1, 1]), iz * dc[2, 1] - offset[1]).ravel()
-        rz = addouter(addouter(ix * dc[0, 2], iy * dc[1, 2]), iz * dc[2, 2] - offset[2]).ravel()
-
-        # Total size of the indices
-        n = rx.shape[0]
-        # Reduce our arrays to where the radius is "fine"
-        idx = indices_le(rx ** 2 + ry ** 2 + rz ** 2, R ** 2)
-        rx = rx[idx]
-        ry = ry[idx]
-        rz = rz[idx]
-        xyz_to_spherical_cos_phi(rx, ry, rz)
-        return n, idx, rx, ry, rz
-
-    # Figure out the max-min indices with a spacing of 1 radian
-    rad1 = pi / 180
-    theta, phi = ogrid[-pi:pi:rad1, 0:pi:rad1]
-    cphi, sphi = cos(phi), sin(phi)
-    ctheta_sphi = cos(theta) * sphi
-    stheta_sphi = sin(theta) * sphi
-    del sphi
-    nrxyz = (theta.size, phi.size, 3)
-    del theta, phi, rad1
-
-    # First we calculate the min/max indices for all atoms
-    rxyz = _a.emptyd(nrxyz)
-    rxyz[..., 0] = ctheta_sphi
-    rxyz[..., 1] = stheta_sphi
-    rxyz[..., 2] = cphi
-    # Reshape
-    rxyz.shape = (-1, 3)
-    idx = dot(rxyz, ic_shape.T)
-    idxm = idx.min(0).reshape(1, 3)
-    idxM = idx.max(0).reshape(1, 3)
-    del ctheta_sphi, stheta_sphi, cphi, idx, rxyz, nrxyz
-
-    # Fast loop (only per specie)
-    origo = grid.sc.origo.reshape(1, 3)
-    idx_mm = _a.emptyd([geometry.na, 2, 3])
-    all_negative_R = True
-    for atom, ia in geometry.atoms.iter(True):
-        if len(ia) == 0:
-            continue
-        R = atom.maxR()
-        all_negative_R = all_negative_R and R < 0.
-
-        # Now do it for all the atoms to get indices of the middle of
-        # the atoms
-        # The coordinates are relative to origo, so we need to shift (when writing a grid
-        # it is with respect to origo)
-        idx = dot(geometry.xyz[ia, :] - origo, ic_shape.T)
-
-        # Get min-max for all atoms
-        idx_mm[ia, 0, :] = idxm * R + idx
-        idx_mm[ia, 1, :] = idxM * R + idx
-
-    if all_negative_R:
-        raise SislError("wavefunction: Cannot create wavefunction since no atoms have an associated basis-orbital on a real-space grid")
-
-    # Now we have min-max for all atoms
-    # When we run the below loop all indices can be retrieved by looking
-    # up in the above table.
-    # Before continuing, we can easily clean up the temporary arrays
-    del origo, idx
-
-    arangei = _a.arangei
-
-    # In case this grid does not have a Geometry associated
-    # We can *perhaps* easily attach a geometry with the given
-    # atoms in the unit-cell
-    sc = grid.sc.copy()
-    # Find the periodic directions
-    pbc = [bc == grid.PERIODIC or geometry.nsc[i] > 1 for i, bc in enumerate(grid.bc[:, 0])]
-    if grid.geometry is None:
-        # Create the actual geometry that encompass the grid
-        ia, xyz, _ = geometry.within_inf(sc, periodic=pbc)
-        if len(ia) > 0:
-            grid.set_geometry(Geometry(xyz, geometry.atoms[ia], sc=sc))
-
-    # Instead of looping all atoms in the supercell we find the exact atoms
-    # and their supercell indices.
-    add_R = _a.fulld(3, geometry.maxR())
-    # Calculate the required additional vectors required to increase the fictitious
-    # supercell by add_R in each direction.
-    # For extremely skewed lattices this will be way too much, hence we make
-    # them square.
-
-    o = sc.toCuboid(True)
-    sc = SuperCell(o._v + np.diag(2 * add_R), origo=o.origo - add_R)
-
-    # Retrieve all atoms within the grid supercell
-    # (and the neighbours that connect into the cell)
-    # Note that we cannot pass the "moved" origo because then ISC would be wrong
-    IA, XYZ, ISC = geometry.within_inf(sc, periodic=pbc)
-    # We need to revert the grid supercell origo as that is not subtracted in the `within_inf` returned
-    # coordinates (and the below loop expects positions with respect to the origo of the plotting
-    # grid).
-    XYZ -= grid.sc.origo.reshape(1, 3)
-
-    phk = k * 2 * np.pi
-    phase = 1
-
-    # Retrieve progressbar
-    eta = tqdm_eta(len(IA), "wavefunction", "atom", eta)
-
-    # Loop over all atoms in the grid-cell
-    for ia, xyz, isc in zip(IA, XYZ, ISC):
-        # Get current atom
-        atom = geometry.atoms[ia]
-
-        # Extract maximum R
-        R = atom.maxR()
-        if R <= 0.:
-            warn(f"wavefunction: Atom '{atom}' does not have a wave-function, skipping atom.")
-            eta.update()
-            continue
+    Expanding a state on a grid (see `wavefunction`) is dominated by the geometric
+    part; finding the grid points within the range of each atom, converting them to
+    spherical coordinates and evaluating the basis orbitals.
+    This class performs the geometric part *once* and stores, for each atom (including
+    periodic images) overlapping the grid, the values of its orbitals on the grid points
+    within its range, :math:`\phi_{i}(\mathbf r)`.
 
-        # Get indices in the supercell grid
-        idx = (isc.reshape(3, 1) * geom_shape).sum(0)
-        idxm = floor(idx_mm[ia, 0, :] + idx).astype(int32)
-        idxM = ceil(idx_mm[ia, 1, :] + idx).astype(int32) + 1
+    Expanding states is then a small matrix product per atom
 
-        # Fast check whether we can skip this point
-        if idxm[0] >= shape[0] or idxm[1] >= shape[1] or idxm[2] >= shape[2] or \
-           idxM[0] <= 0 or idxM[1] <= 0 or idxM[2] <= 0:
-            eta.update()
-            continue
-
-        # Truncate values
-        if idxm[0] < 0:
-            idxm[0] = 0
-        if idxM[0] > shape[0]:
-            idxM[0] = shape[0]
-        if idxm[1] < 0:
-            idxm[1] = 0
-        if idxM[1] > shape[1]:
-            idxM[1] = shape[1]
-        if idxm[2] < 0:
-            idxm[2] = 0
-        if idxM[2] > shape[2]:
-            idxM[2] = shape[2]
-
-        # Now idxm/M contains min/max indices used
-        # Convert to spherical coordinates
-        n, idx, r, theta, phi = idx2spherical(arangei(idxm[0], idxM[0]),
-                                              arangei(idxm[1], idxM[1]),
-                                              arangei(idxm[2], idxM[2]), xyz, dcell, R)
-
-        # Get initial orbital
-        io = geometry.a2o(ia)
+    .. math::
+       \psi_n(\mathbf r) = \sum_i\phi_i(\mathbf r) c_{ni} \exp(-i\mathbf k \mathbf R)
 
-        if has_k:
-            phase = np.exp(-1j * phk.dot(isc))
+    for all states :math:`n` simultaneously.
+
+    Notes
+    -----
+    The orbital values are stored for all atoms, hence the memory requirement is roughly
+    the number of grid points times the average number of orbitals overlapping a grid point.
+    The orbital values may be calculated faster by tabulating the radial functions of the
+    orbitals, see `~sisl.SphericalOrbital.tabulate`.
+
+    Parameters
+    ----------
+    grid : Grid
+       grid on which the wavefunctions will be expanded.
+       Only the shape and the cell of the grid is used.
+    geometry : Geometry, optional
+       geometry where the orbitals are defined.
+       If this is ``None`` the geometry associated with `grid` will be used instead.
+    eta : bool, optional
+       Display a console progressbar while calculating the orbital values.
 
-        # Allocate a temporary array where we add the psi elements
-        psi = psi_init(n)
+    Examples
+    --------
+    Plot 10 states around the Fermi level for a Hamiltonian (orbitals with
+    radial functions are required):
+
+    >>> es = H.eigenstate()
+    >>> es.change_gauge('R')
+    >>> grid = Grid(0.1, geometry=H.geometry)
+    >>> proj = WavefunctionProjector(grid)
+    >>> psi = proj.project(es.state[:10])
+    >>> psi.shape == (10,) + grid.shape
+    True
+    """
 
-        # Loop on orbitals on this atom, grouped by radius
-        for os in atom.iter(True):
+    def __init__(self, grid, geometry=None, eta=False):
+        if geometry is None:
+            geometry = grid.geometry
+        if geometry is None:
+            raise SislError(f"{self.__class__.__name__}: did not find a usable Geometry through keywords or the Grid!")
 
-            # Get the radius of orbitals (os)
-            oR = os[0].R
+        self.geometry = geometry
+        self.shape = tuple(grid.shape)
+        self._atoms = self._calc_orbitals(grid, geometry, eta)
 
-            if oR <= 0.:
-                warn(f"wavefunction: Orbital(s) '{os}' does not have a wave-function, skipping orbital!")
-                # Skip these orbitals
-                io += len(os)
+    def __len__(self):
+        """ Number of atoms (including periodic images) overlapping the grid """
+        return len(self._atoms)
+
+    @staticmethod
+    def _calc_orbitals(grid, geometry, eta):
+        """ Calculate orbital values for all atoms overlapping the `grid`
+
+        Returns
+        -------
+        list of tuple
+           each element is ``(slices, box, idx, io, isc, phi)`` with ``slices``
+           the grid slices of the atomic box, ``box`` the shape of the atomic box,
+           ``idx`` the flattened box indices within the atomic range, ``io`` the first
+           orbital of the atom, ``isc`` the supercell offset of the atom and ``phi``
+           the orbital values of shape ``(len(idx), atom.no)``
+        """
+        # Extract sub variables used throughout the loop
+        shape = _a.asarrayi(grid.shape)
+        dcell = grid.dcell
+        ic_shape = grid.sc.icell * shape.reshape(3, 1)
+
+        # Convert the geometry (hosting the wavefunction coefficients) coordinates into
+        # grid-fractionals X grid-shape to get index-offsets in the grid for the geometry
+        # supercell.
+        geom_shape = dot(geometry.cell, ic_shape.T)
+
+        # In the following we don't care about division
+        # So 1) save error state, 2) turn off divide by 0, 3) calculate, 4) turn on old error state
+        old_err = np.seterr(divide='ignore', invalid='ignore')
+
+        addouter = add.outer
+        def idx2spherical(ix, iy, iz, offset, dc, R):
+            """ Calculate the spherical coordinates from indices """
+            rx = addouter(addouter(ix * dc[0, 0], iy * dc[1, 0]), iz * dc[2, 0] - offset[0]).ravel()
+            ry = addouter(addouter(ix * dc[0, 1], iy * dc[1, 1]), iz * dc[2, 1] - offset[1]).ravel()
+            rz = addouter(addouter(ix * dc[0, 2], iy * dc[1, 2]), iz * dc[2, 2] - offset[2]).ravel()
+
+            # Total size of the indices
+            n = rx.shape[0]
+            # Reduce our arrays to where the radius is "fine"
+            idx = indices_le(rx ** 2 + ry ** 2 + rz ** 2, R ** 2)
+            rx = rx[idx]
+            ry = ry[idx]
+            rz = rz[idx]
+            xyz_to_spherical_cos_phi(rx, ry, rz)
+            return n, idx, rx, ry, rz
+
+        # Figure out the max-min indices with a spacing of 1 radian
+        rad1 = pi / 180
+        theta, phi = ogrid[-pi:pi:rad1, 0:pi:rad1]
+        cphi, sphi = cos(phi), sin(phi)
+        ctheta_sphi = cos(theta) * sphi
+        stheta_sphi = sin(theta) * sphi
+        del sphi
+        nrxyz = (theta.size, phi.size, 3)
+        del theta, phi, rad1
+
+        # First we calculate the min/max indices for all atoms
+        rxyz = _a.emptyd(nrxyz)
+        rxyz[..., 0] = ctheta_sphi
+        rxyz[..., 1] = stheta_sphi
+        rxyz[..., 2] = cphi
+        # Reshape
+        rxyz.shape = (-1, 3)
+        idx = dot(rxyz, ic_shape.T)
+        idxm = idx.min(0).reshape(1, 3)
+        idxM = idx.max(0).reshape(1, 3)
+        del ctheta_sphi, stheta_sphi, cphi, idx, rxyz, nrxyz
+
+        # Fast loop (only per specie)
+        origo = grid.sc.origo.reshape(1, 3)
+        idx_mm = _a.emptyd([geometry.na, 2, 3])
+        all_negative_R = True
+        for atom, ia in geometry.atoms.iter(True):
+            if len(ia) == 0:
+                continue
+            R = atom.maxR()
+            all_negative_R = all_negative_R and R < 0.
+
+            # Now do it for all the atoms to get indices of the middle of
+            # the atoms
+            # The coordinates are relative to origo, so we need to shift (when writing a grid
+            # it is with respect to origo)
+            idx = dot(geometry.xyz[ia, :] - origo, ic_shape.T)
+
+            # Get min-max for all atoms
+            idx_mm[ia, 0, :] = idxm * R + idx
+            idx_mm[ia, 1, :] = idxM * R + idx
+
+        if all_negative_R:
+            np.seterr(**old_err)
+            raise SislError("wavefunction: Cannot create wavefunction since no atoms have an associated basis-orbital on a real-space grid")
+
+        # Now we have min-max for all atoms
+        # When we run the below loop all indices can be retrieved by looking
+        # up in the above table.
+        # Before continuing, we can easily clean up the temporary arrays
+        del origo, idx
+
+        arangei = _a.arangei
+
+        # In case this grid does not have a Geometry associated
+        # We can *perhaps* easily attach a geometry with the given
+        # atoms in the unit-cell
+        sc = grid.sc.copy()
+        # Find the periodic directions
+        pbc = [bc == grid.PERIODIC or geometry.nsc[i] > 1 for i, bc in enumerate(grid.bc[:, 0])]
+        if grid.geometry is None:
+            # Create the actual geometry that encompass the grid
+            ia, xyz, _ = geometry.within_inf(sc, periodic=pbc)
+            if len(ia) > 0:
+                grid.set_geometry(Geometry(xyz, geometry.atoms[ia], sc=sc))
+
+        # Instead of looping all atoms in the supercell we find the exact atoms
+        # and their supercell indices.
+        add_R = _a.fulld(3, geometry.maxR())
+        # Calculate the required additional vectors required to increase the fictitious
+        # supercell by add_R in each direction.
+        # For extremely skewed lattices this will be way too much, hence we make
+        # them square.
+
+        o = sc.toCuboid(True)
+        sc = SuperCell(o._v + np.diag(2 * add_R), origo=o.origo - add_R)
+
+        # Retrieve all atoms within the grid supercell
+        # (and the neighbours that connect into the cell)
+        # Note that we cannot pass the "moved" origo because then ISC would be wrong
+        IA, XYZ, ISC = geometry.within_inf(sc, periodic=pbc)
+        # We need to revert the grid supercell origo as that is not subtracted in the `within_inf` returned
+        # coordinates (and the below loop expects positions with respect to the origo of the plotting
+        # grid).
+        XYZ -= grid.sc.origo.reshape(1, 3)
+
+        # Retrieve progressbar
+        eta = tqdm_eta(len(IA), "wavefunction", "atom", eta)
+
+        atoms = []
+
+        # Loop over all atoms in the grid-cell
+        for ia, xyz, isc in zip(IA, XYZ, ISC):
+            # Get current atom
+            atom = geometry.atoms[ia]
+
+            # Extract maximum R
+            R = atom.maxR()
+            if R <= 0.:
+                warn(f"wavefunction: Atom '{atom}' does not have a wave-function, skipping atom.")
+                eta.update()
                 continue
 
-            # Downsize to the correct indices
-            if R - oR < 1e-6:
-                idx1 = idx
-                r1 = r
-                theta1 = theta
-                phi1 = phi
-            else:
-                idx1 = indices_le(r, oR)
-                # Reduce arrays
-                r1 = r[idx1]
-                theta1 = theta[idx1]
-                phi1 = phi[idx1]
-                idx1 = idx[idx1]
+            # Get indices in the supercell grid
+            idx = (isc.reshape(3, 1) * geom_shape).sum(0)
+            idxm = floor(idx_mm[ia, 0, :] + idx).astype(int32)
+            idxM = ceil(idx_mm[ia, 1, :] + idx).astype(int32) + 1
 
-            # Loop orbitals with the same radius
-            for o in os:
-                # Evaluate psi component of the wavefunction and add it for this atom
-                psi[idx1] += o.psi_spher(r1, theta1, phi1, cos_phi=True) * (v[io] * phase)
-                io += 1
+            # Fast check whether we can skip this point
+            if idxm[0] >= shape[0] or idxm[1] >= shape[1] or idxm[2] >= shape[2] or \
+               idxM[0] <= 0 or idxM[1] <= 0 or idxM[2] <= 0:
+                eta.update()
+                continue
 
-        # Clean-up
-        del idx1, r1, theta1, phi1, idx, r, theta, phi
+            # Truncate values
+            np.clip(idxm, 0, shape, out=idxm)
+            np.clip(idxM, 0, shape, out=idxM)
+
+            # Now idxm/M contains min/max indices used
+            # Convert to spherical coordinates
+            n, idx, r, theta, phi = idx2spherical(arangei(idxm[0], idxM[0]),
+                                                  arangei(idxm[1], idxM[1]),
+                                                  arangei(idxm[2], idxM[2]), xyz, dcell, R)
+
+            # Orbital values for all orbitals on this atom
+            psi = _a.zerosd([len(idx), atom.no])
+
+            # Loop on orbitals on this atom, grouped by radius
+            jo = 0
+            for os in atom.iter(True):
+
+                # Get the radius of orbitals (os)
+                oR = os[0].R
+
+                if oR <= 0.:
+                    warn(f"wavefunction: Orbital(s) '{os}' does not have a wave-function, skipping orbital!")
+                    # Skip these orbitals
+                    jo += len(os)
+                    continue
+
+                # Downsize to the correct indices
+                if R - oR < 1e-6:
+                    idx1 = slice(None)
+                    r1 = r
+                    theta1 = theta
+                    phi1 = phi
+                else:
+                    idx1 = indices_le(r, oR)
+                    # Reduce arrays
+                    r1 = r[idx1]
+                    theta1 = theta[idx1]
+                    phi1 = phi[idx1]
+
+                # Loop orbitals with the same radius
+                for o in os:
+                    psi[idx1, jo] = o.psi_spher(r1, theta1, phi1, cos_phi=True)
+                    jo += 1
+
+            # Clean-up
+            del idx1, r1, theta1, phi1, r, theta, phi
+
+            atoms.append((tuple(slice(m, M) for m, M in zip(idxm, idxM)), tuple(idxM - idxm),
+                          idx, geometry.a2o(ia), isc, psi))
+
+            # Step progressbar
+            eta.update()
 
-        # Convert to correct shape and add the current atom contribution to the wavefunction
-        psi.shape = idxM - idxm
-        grid.grid[idxm[0]:idxM[0], idxm[1]:idxM[1], idxm[2]:idxM[2]] += psi
+        eta.close()
 
-        # Clean-up
-        del psi
+        # Reset the error code for division
+        np.seterr(**old_err)
 
-        # Step progressbar
-        eta.update()
+        return atoms
 
-    eta.close()
+    def project(self, v, k=None, spinor=0, spin=None, out=None, nthreads=1):
+        r""" Expand the state coefficients `v` on the grid
 
-    # Reset the error code for division
-    np.seterr(**old_err)
+        Parameters
+        ----------
+        v : array_like
+           coefficients for the orbital expansion on the real-space grid, either
+           a single state (1D) or many states (2D, first dimension being the states).
+           The coefficients must be using the ``R`` gauge.
+        k : array_like, optional
+           k-point associated with the states
+        spinor : int, optional
+           the spinor for non-colinear/spin-orbit calculations, see `wavefunction`.
+        spin : Spin, optional
+           specification of the spin configuration of the orbital coefficients.
+        out : numpy.ndarray, optional
+           array to *add* the wavefunctions to, must have the grid shape for a single
+           state, or ``(len(v),) + grid.shape`` for many states.
+        nthreads : int, optional
+           number of threads used for calculating the atomic contributions, if ``None``
+           it will be determined by the ``SISL_NPROCS`` environment variable.
+
+        Returns
+        -------
+        numpy.ndarray
+            the wavefunctions on the grid, with shape ``grid.shape`` for a single state
+            or ``(len(v),) + grid.shape`` for many states.
+        """
+        geometry = self.geometry
+        v = np.asarray(v)
+        is_single = v.ndim == 1
+        v = v.reshape(-1, v.shape[-1])
+        nstate = v.shape[0]
+
+        if spin is None:
+            if v.shape[1] // 2 == geometry.no:
+                # We can see from the input that the vector *must* be a non-colinear calculation
+                v = v.reshape(nstate, -1, 2)[:, :, spinor]
+                info("wavefunction: assumes the input wavefunction coefficients to originate from a non-colinear calculation!")
+
+        elif spin.kind > Spin.POLARIZED:
+            # For non-colinear cases the user selects the spinor component.
+            v = v.reshape(nstate, -1, 2)[:, :, spinor]
+
+        if v.shape[1] != geometry.no:
+            raise ValueError("wavefunction: require wavefunction coefficients corresponding to number of orbitals in the geometry.")
+
+        # Check for k-points
+        k = _a.asarrayd(k)
+        kl = k.dot(k) ** 0.5
+        has_k = kl > 0.000001
+        if has_k:
+            info('wavefunction: k != Gamma is currently untested!')
+
+        # Check that input/grid makes sense.
+        # If the coefficients are complex valued, then the grid *has* to be
+        # complex valued.
+        # Likewise if a k-point has been passed.
+        is_complex = np.iscomplexobj(v) or has_k
+        shape = (nstate,) + self.shape
+        if out is None:
+            if is_complex:
+                out = _a.zerosz(shape)
+            else:
+                out = _a.zerosd(shape)
+        elif is_complex and not np.iscomplexobj(out):
+            raise SislError("wavefunction: input coefficients are complex, while grid only contains real.")
+
+        if out.ndim == 3:
+            # Add a state dimension (still a view)
+            psi = out[np.newaxis]
+        else:
+            psi = out
+        if psi.shape != shape:
+            raise ValueError(f"{self.__class__.__name__}.project requires out to have shape {shape}, got {psi.shape}")
+
+        phk = k * 2 * np.pi
+
+        def calc_atom(atom):
+            _, _, _, io, isc, phi = atom
+            c = v[:, io:io+phi.shape[1]]
+            if has_k:
+                c = c * np.exp(-1j * phk.dot(isc))
+            # (points, states)
+            return dot(phi, c.T)
+
+        if nthreads is None:
+            nthreads = get_environ_variable("SISL_NPROCS")
+        if nthreads > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(nthreads) as executor:
+                self._add_atoms(psi, executor.map(calc_atom, self._atoms))
+        else:
+            self._add_atoms(psi, map(calc_atom, self._atoms))
+
+        if is_single:
+            return out.reshape(self.shape)
+        return out
+
+    def _add_atoms(self, psi, atom_psi):
+        """ Add the atomic contributions `atom_psi` to `psi` """
+        nstate = psi.shape[0]
+        for (slices, box, idx, _, _, _), apsi in zip(self._atoms, atom_psi):
+            # Create the full atomic box and add it to the wavefunctions
+            tmp = zeros((nstate, np.prod(box)), dtype=apsi.dtype)
+            tmp[:, idx] = apsi.T
+            psi[(slice(None),) + slices] += tmp.reshape((nstate,) + box)
 
 
 class _electron_State:
@@ -1727,6 +2262,8 @@ class _electron_State:
 
         If `diag` is true, only the diagonal elements are returned.
 
+        See `~sisl.physics.electron.expectation` for details.
+
         Parameters
         ----------
         A : array_like
@@ -1740,21 +2277,7 @@ class _electron_State:
         numpy.ndarray
             a vector if `diag` is true, otherwise a matrix with expectation values
         """
-        ndim = A.ndim
-        s = self.state
-
-        if diag:
-            if ndim == 2:
-                a = einsum("ij,ji->i", s.conj(), A.dot(s.T))
-            elif ndim == 1:
-                a = einsum("ij,j,ij->i", s.conj(), A, s)
-        elif ndim == 2:
-            a = s.conj().dot(A.dot(s.T))
-        elif ndim == 1:
-            a = einsum("ij,j,jk", s.conj(), A, s.T)
-        else:
-            raise ValueError("expectation: requires matrix A to be 1D or 2D")
-        return a
+        return expectation(self.state, A, diag)
 
     def wavefunction(self, grid, spinor=0, eta=False):
         r""" Expand the coefficients as the wavefunction on `grid` *as-is*
@@ -468,11 +468,13 @@ class Hamiltonian(SparseOrbitalBZSpin):
         """
         return self.eigenstate(k, **kwargs).PDOS(E, distribution)
 
-    def fermi_level(self, bz=None, q=None, distribution='fermi_dirac', q_tol=1e-10):
+    def fermi_level(self, bz=None, q=None, distribution='fermi_dirac', q_tol=1e-10, eig=None):
         """ Calculate the Fermi-level using a Brillouinzone sampling and a target charge
 
         The Fermi-level will be calculated using an iterative approach by first calculating all eigenvalues
         and subsequently fitting the Fermi level to the final charge (`q`).
+        The eigenvalues are sorted once to find the zero-temperature Fermi-level which is used
+        to bracket the Fermi-level, Brent's method is then used to find the root.
 
         Parameters
         ----------
@@ -487,6 +489,20 @@ class Hamiltonian(SparseOrbitalBZSpin):
             used distribution, must accept the keyword ``mu`` as parameter for the Fermi-level
         q_tol : float, optional
             tolerance of charge for finding the Fermi-level
+        eig : array_like, optional
+            precomputed eigenvalues for the k-points in `bz` (shape ``(len(bz), nbands)``), for
+            spin-polarized Hamiltonians the first dimension should be the spin
+            (shape ``(2, len(bz), nbands)``). This allows calculating the Fermi-level for
+            different distributions and/or charges without re-diagonalizing.
+
+        Examples
+        --------
+        Calculate the Fermi-level at different temperatures using a single diagonalization sweep
+
+        >>> bz = MonkhorstPack(H, [10, 10, 1])
+        >>> eig = bz.apply.array.eigh()
+        >>> Ef = [H.fermi_level(bz, eig=eig, distribution=get_distribution('fermi_dirac', smearing=kT))
+        ...       for kT in [0.01, 0.025, 0.1]]
 
         Returns
         -------
@@ -516,35 +532,58 @@ class Hamiltonian(SparseOrbitalBZSpin):
         if isinstance(distribution, str):
             distribution = get_distribution(distribution)
 
+        # scipy.optimize is slow to import
+        from scipy.optimize import brentq
+
         # B-cast for easier weights
         w = bz.weight.reshape(-1, 1)
 
         # Internal class to calculate the Fermi-level
         def _Ef(q, eig):
-            # We could reduce it depending on the temperature,
-            # however the distribution does not have the kT
-            # parameter available.
-            min_Ef, max_Ef = eig.min(), eig.max()
-
-            nextafter = np.nextafter
-            while nextafter(min_Ef, max_Ef) < max_Ef:
-                Ef = (min_Ef + max_Ef) * 0.5
-
-                # Calculate guessed charge
-                qt = (distribution(eig, mu=Ef) * w).sum()
-
-                if abs(qt - q) < q_tol:
-                    return Ef
-
-                if qt >= q:
-                    max_Ef = Ef
-                elif qt <= q:
-                    min_Ef = Ef
-
-            return Ef
+            eig = eig.reshape(len(w), -1)
+            we = np.broadcast_to(w, eig.shape).ravel()
+            e = eig.ravel()
+
+            # Sort once to get the zero-temperature Fermi-level
+            idx = np.argsort(e)
+            e_s = e[idx]
+            i0 = min(np.searchsorted(np.cumsum(we[idx]), q - q_tol), len(e_s) - 1)
+            Ef0 = e_s[i0]
+
+            def dq(Ef):
+                dq = (distribution(eig, mu=Ef) * w).sum() - q
+                if abs(dq) < q_tol:
+                    # brentq terminates for an exact root
+                    return 0.
+                return dq
+
+            # Bracket the Fermi-level
+            dq0 = dq(Ef0)
+            if dq0 == 0.:
+                return Ef0
+            dE = max((e_s[-1] - e_s[0]) * 1e-3, 1e-6)
+            step = -dE if dq0 > 0 else dE
+            Ef1 = Ef0 + step
+            dq1 = dq(Ef1)
+            while dq1 * dq0 > 0:
+                Ef0, dq0 = Ef1, dq1
+                step *= 2
+                Ef1 = Ef0 + step
+                dq1 = dq(Ef1)
+            if dq1 == 0.:
+                return Ef1
+            return brentq(dq, min(Ef0, Ef1), max(Ef0, Ef1), xtol=1e-14)
 
         # Retrieve dispatcher for averaging
-        eigh = bz.apply.array.eigh
+        if eig is None:
+            eigh = bz.apply.array.eigh
+        else:
+            eig = _a.asarrayd(eig)
+
+            def eigh(spin=0):
+                if self.spin.is_polarized:
+                    return eig[spin]
+                return eig
 
         if self.spin.is_polarized and q.size == 2:
             if np.any(q >= len(self)):
@@ -562,8 +601,8 @@ class Hamiltonian(SparseOrbitalBZSpin):
                 raise ValueError(f"{self.__class__.__name__}.fermi_level cannot calculate the Fermi level "
                                  "for electrons ({q}) equal to or above number of orbitals ({len(self)}).")
             if self.spin.is_polarized:
-                Ef = _Ef(q, np.concatenate([eigh(spin=0),
-                                            eigh(spin=1)], axis=1))
+                Ef = _Ef(q, np.concatenate([eigh(spin=0).reshape(len(w), -1),
+                                            eigh(spin=1).reshape(len(w), -1)], axis=1))
             else:
                 Ef = _Ef(q, eigh())
 
@@ -0,0 +1,331 @@
+""" Kernel polynomial method
+
+.. module:: sisl.physics.kpm
+   :noindex:
+
+Spectral quantities calculated using Chebyshev expansions of sparse matrices,
+see [1]_. Only sparse matrix times block-vector products are required, hence
+the calculations are feasible for very large systems where dense diagonalization
+is not.
+
+.. autosummary::
+   :toctree:
+
+   KPM
+   jackson_kernel
+   lorentz_kernel
+
+References
+----------
+.. [1] A. Weisse, G. Wellein, A. Alvermann, H. Fehske, "The kernel polynomial method", Rev. Mod. Phys. **78**, 275 (2006)
+"""
+
+import numpy as np
+from numpy.polynomial.chebyshev import chebval
+from scipy.sparse.linalg import splu
+
+from sisl._internal import set_module
+import sisl._array as _a
+import sisl.linalg as lin
+from .distribution import get_distribution
+
+
+__all__ = ['KPM', 'jackson_kernel', 'lorentz_kernel']
+
+
+@set_module("sisl.physics.kpm")
+def jackson_kernel(n):
+    r""" Jackson kernel coefficients for `n` Chebyshev moments
+
+    Parameters
+    ----------
+    n : int
+       number of moments
+    """
+    N = n + 1
+    i = _a.aranged(n)
+    return ((N - i) * np.cos(np.pi * i / N) + np.sin(np.pi * i / N) / np.tan(np.pi / N)) / N
+
+
+@set_module("sisl.physics.kpm")
+def lorentz_kernel(n, lambda_=4.):
+    r""" Lorentz kernel coefficients for `n` Chebyshev moments
+
+    Parameters
+    ----------
+    n : int
+       number of moments
+    lambda_ : float, optional
+       broadening parameter of the kernel
+    """
+    i = _a.aranged(n)
+    return np.sinh(lambda_ * (1 - i / n)) / np.sinh(lambda_)
+
+
+_kernels = {
+    'jackson': jackson_kernel,
+    'lorentz': lorentz_kernel,
+    'none': lambda n: _a.onesd(n),
+}
+
+
+@set_module("sisl.physics")
+class KPM:
+    r""" Kernel polynomial method for a sparse matrix at a given :math:`k`-point
+
+    The spectrum of the matrix :math:`\mathbf A = \mathbf S^{-1}\mathbf H` is scaled into
+    :math:`]-1;1[` and spectral quantities are expanded in Chebyshev polynomials:
+
+    .. math::
+       \mathrm{DOS}(E) = \frac{1}{\pi a\sqrt{1-x^2}}\Big[g_0\mu_0 + 2\sum_{n>0} g_n\mu_n T_n(x)\Big]
+
+    with :math:`x = (E - b) / a` and :math:`g_n` a kernel reducing Gibbs oscillations.
+    The moments :math:`\mu_n` are calculated with sparse matrix times block-vector
+    products, traces are estimated stochastically using random vectors.
+
+    For non-orthogonal basis sets :math:`\mathbf S` is factorized once and the
+    projected quantities correspond to Mulliken projections.
+
+    Parameters
+    ----------
+    parent : SparseOrbitalBZ
+       object with `Pk`, `Sk` and `orthogonal`, typically a `Hamiltonian`
+    k : array_like, optional
+       k-point to calculate the spectral quantities at
+    bounds : (float, float), optional
+       lower and upper bound of the spectrum, if not provided they are estimated
+       using Lanczos iterations
+    kernel : {'jackson', 'lorentz', 'none'} or callable, optional
+       kernel used to damp the moments, a callable should return `n` coefficients for `n` moments
+    gauge : {'R', 'r'}
+       the chosen gauge
+    **kwargs : dict, optional
+       passed to `parent.Pk`, e.g. ``spin=1`` for polarized Hamiltonians
+
+    Examples
+    --------
+    >>> kpm = H.kpm(k=[0.1, 0, 0])
+    >>> E = np.linspace(-2, 2, 500)
+    >>> DOS = kpm.DOS(E, n=512, R=20)
+    >>> PDOS = kpm.PDOS(E, orbitals=[0, 1], n=512)
+    """
+
+    def __init__(self, parent, k=(0, 0, 0), bounds=None, kernel='jackson', gauge='R', **kwargs):
+        self.parent = parent
+        self.k = _a.asarrayd(k)
+        self._P = parent.Pk(k=k, gauge=gauge, format='csr', **kwargs)
+        if parent.orthogonal:
+            self._S_lu = None
+        else:
+            self._S_lu = splu(parent.Sk(k=k, gauge=gauge, format='csc', dtype=self._P.dtype))
+        if isinstance(kernel, str):
+            kernel = _kernels[kernel.lower()]
+        self.kernel = kernel
+
+        if bounds is None:
+            bounds = self._bounds(parent, k, gauge, **kwargs)
+        emin, emax = bounds
+        # pad to ensure the spectrum is within ]-1;1[
+        self._a = (emax - emin) / (2 - 0.02)
+        self._b = (emax + emin) / 2
+
+    def _bounds(self, parent, k, gauge, **kwargs):
+        """ Estimate spectral bounds of the matrix """
+        if len(parent) <= 100:
+            eig = parent.eigh(k=k, gauge=gauge, **kwargs)
+            emin, emax = eig.min(), eig.max()
+        else:
+            M = None
+            if not parent.orthogonal:
+                M = parent.Sk(k=k, gauge=gauge, format='csr', dtype=self._P.dtype)
+            emax = lin.eigsh(self._P, k=1, M=M, which='LA', tol=1e-3,
+                             return_eigenvectors=False)[0]
+            emin = lin.eigsh(self._P, k=1, M=M, which='SA', tol=1e-3,
+                             return_eigenvectors=False)[0]
+        # additional margin for the inaccuracy of the estimate
+        de = (emax - emin) * 0.01 + 1e-6
+        return emin - de, emax + de
+
+    @property
+    def bounds(self):
+        """ Lower and upper energy bound of the scaled spectrum """
+        return self._b - self._a, self._b + self._a
+
+    def __len__(self):
+        return self._P.shape[0]
+
+    @property
+    def dtype(self):
+        return self._P.dtype
+
+    def _scaled(self, V):
+        """ Calculate :math:`(\\mathbf A - b)/a\\cdot\\mathbf V` """
+        AV = self._P @ V
+        if self._S_lu is not None:
+            AV = self._S_lu.solve(AV)
+        AV -= self._b * V
+        AV /= self._a
+        return AV
+
+    def _iter(self, V, n):
+        """ Iterator for the Chebyshev vectors :math:`T_i(\\tilde{\\mathbf A})\\mathbf V` for ``i < n`` """
+        T0 = V
+        yield T0
+        if n == 1:
+            return
+        T1 = self._scaled(V)
+        yield T1
+        for _ in range(2, n):
+            T0, T1 = T1, 2 * self._scaled(T1) - T0
+            yield T1
+
+    def moments(self, n, V, W=None):
+        r""" Chebyshev moments :math:`\mu_i = \langle\mathbf W|T_i(\tilde{\mathbf A})|\mathbf V\rangle` per column
+
+        Parameters
+        ----------
+        n : int
+           number of moments
+        V : array_like
+           block of vectors, shape ``(len(self), m)``
+        W : array_like, optional
+           projection vectors, defaults to `V`
+
+        Returns
+        -------
+        numpy.ndarray
+            moments with shape ``(n, m)``
+        """
+        V = np.asarray(V, dtype=self.dtype)
+        if V.ndim == 1:
+            V = V.reshape(-1, 1)
+        if W is None:
+            W = V
+        W = np.conj(W)
+        return np.array([(W * T).sum(0) for T in self._iter(V, n)])
+
+    def random_vectors(self, R, seed=None):
+        r""" Random vectors used for stochastic trace estimation
+
+        For complex matrices the vectors have random phases, otherwise random signs.
+
+        Parameters
+        ----------
+        R : int
+           number of random vectors
+        seed : int, optional
+           seed for the random number generator
+        """
+        rng = np.random.RandomState(seed)
+        if np.iscomplexobj(self._P.data):
+            return np.exp(2j * np.pi * rng.rand(len(self), R))
+        return rng.randint(2, size=(len(self), R)) * 2. - 1.
+
+    def _spectrum(self, E, mu):
+        """ Reconstruct spectral function from (averaged) moments `mu` """
+        E = _a.asarrayd(E)
+        n = mu.shape[0]
+        coeff = (self.kernel(n) * (2 - (_a.arangei(n) == 0))).reshape((-1,) + (1,) * (mu.ndim - 1)) * mu.real
+        x = (E - self._b) / self._a
+        inside = np.abs(x) < 1
+        out = np.zeros(mu.shape[1:] + E.shape)
+        xi = x[inside]
+        out[..., inside] = chebval(xi, coeff) / (np.pi * self._a * np.sqrt(1 - xi ** 2))
+        return out
+
+    def DOS(self, E, n=256, R=10, seed=None):
+        r""" Density of states using stochastic trace estimation
+
+        Parameters
+        ----------
+        E : array_like
+           energies to calculate the DOS at
+        n : int, optional
+           number of Chebyshev moments, the energy resolution is roughly :math:`\pi a / n`
+        R : int, optional
+           number of random vectors used for the trace
+        seed : int, optional
+           seed for the random vectors
+
+        Returns
+        -------
+        numpy.ndarray
+            DOS at the energies, has same length as `E`
+        """
+        V = self.random_vectors(R, seed)
+        mu = self.moments(n, V).mean(1)
+        return self._spectrum(E, mu)
+
+    def PDOS(self, E, orbitals=None, n=256):
+        r""" Projected (local) density of states on a set of orbitals
+
+        The moments are calculated exactly for all requested orbitals in one block.
+
+        Parameters
+        ----------
+        E : array_like
+           energies to calculate the PDOS at
+        orbitals : array_like of int, optional
+           orbitals to calculate the PDOS on, defaults to all orbitals
+        n : int, optional
+           number of Chebyshev moments
+
+        Returns
+        -------
+        numpy.ndarray
+            PDOS with shape ``(len(orbitals), len(E))``
+        """
+        if orbitals is None:
+            orbitals = _a.arangei(len(self))
+        orbitals = _a.asarrayi(orbitals).ravel()
+        V = np.zeros([len(self), len(orbitals)], dtype=self.dtype)
+        V[orbitals, _a.arangei(len(orbitals))] = 1.
+        cols = _a.arangei(len(orbitals))
+        mu = np.array([T[orbitals, cols] for T in self._iter(V, n)])
+        return self._spectrum(E, mu)
+
+    def fermi_operator(self, distribution='fermi_dirac', orbitals=None, n=256):
+        r""" Fermi-operator expansion of the density matrix columns
+
+        Calculates :math:`\mathbf D\mathbf e_i = f(\mathbf A)\mathbf S^{-1}\mathbf e_i` for the orbitals
+        :math:`i` where :math:`f` is the distribution function.
+        Since the distribution function is expanded in Chebyshev polynomials (with the
+        kernel as damping) only matrix times block-vector products are required.
+
+        Parameters
+        ----------
+        distribution : str or func, optional
+           distribution function (of the energy), see `~sisl.physics.distribution.get_distribution`.
+           Use ``get_distribution('fermi_dirac', smearing=kT, x0=Ef)`` to control the chemical potential.
+        orbitals : array_like of int, optional
+           orbitals to calculate the density matrix columns of, defaults to all orbitals
+        n : int, optional
+           number of Chebyshev terms
+
+        Returns
+        -------
+        numpy.ndarray
+            density matrix columns with shape ``(len(self), len(orbitals))``
+        """
+        if isinstance(distribution, str):
+            distribution = get_distribution(distribution)
+        if orbitals is None:
+            orbitals = _a.arangei(len(self))
+        orbitals = _a.asarrayi(orbitals).ravel()
+
+        # Chebyshev coefficients using Chebyshev-Gauss quadrature
+        nq = max(2 * n, 512)
+        theta = np.pi * (_a.aranged(nq) + 0.5) / nq
+        f = distribution(self._a * np.cos(theta) + self._b)
+        coeff = np.cos(np.outer(_a.aranged(n), theta)).dot(f) * 2 / nq
+        coeff[0] /= 2
+        coeff *= self.kernel(n)
+
+        V = np.zeros([len(self), len(orbitals)], dtype=self.dtype)
+        V[orbitals, _a.arangei(len(orbitals))] = 1.
+        if self._S_lu is not None:
+            V = self._S_lu.solve(V)
+        D = np.zeros_like(V)
+        for c, T in zip(coeff, self._iter(V, n)):
+            D += c * T
+        return D
@@ -1,7 +1,8 @@
 import warnings
 
 import numpy as np
-from scipy.sparse import csr_matrix, SparseEfficiencyWarning
+from scipy.sparse import csr_matrix, identity, SparseEfficiencyWarning
+from scipy.sparse.linalg import splu, LinearOperator
 
 from sisl._internal import set_module
 import sisl.linalg as lin
@@ -9,6 +10,7 @@ import sisl._array as _a
 from sisl.sparse import isspmatrix
 from sisl.sparse_geometry import SparseOrbital
 from .spin import Spin
+from .kpm import KPM
 from ._matrix_k import matrix_k, matrix_k_nc, matrix_k_so, matrix_k_nc_diag
 from ._matrix_dk import matrix_dk, matrix_dk_nc, matrix_dk_so, matrix_dk_nc_diag
 from ._matrix_ddk import matrix_ddk, matrix_ddk_nc, matrix_ddk_so, matrix_ddk_nc_diag
@@ -21,6 +23,38 @@ __all__ = ['SparseOrbitalBZ', 'SparseOrbitalBZSpin']
 warnings.filterwarnings("ignore", category=SparseEfficiencyWarning)
 
 
+def _eigsh(P, S, n, eigvals_only, sigma=None, **kwargs):
+    """ Sparse eigenvalue solver in regular or shift-invert mode for (generalized) problems """
+    default = sigma is None and 'which' not in kwargs
+    if default:
+        # Shift-invert around 0 corresponds to the smallest magnitude eigenvalues
+        sigma = 0.
+
+    if sigma is not None:
+        # Factorize P - sigma S once, it is re-used in all Lanczos iterations
+        if S is None:
+            A = P - sigma * identity(P.shape[0], dtype=P.dtype, format='csc')
+        else:
+            A = P - sigma * S
+        try:
+            lu = splu(A.tocsc())
+            kwargs['OPinv'] = LinearOperator(A.shape, matvec=lu.solve, dtype=A.dtype)
+        except RuntimeError:
+            if not default:
+                raise
+            # exactly singular, fall back to the regular mode
+            sigma = None
+            kwargs['which'] = 'SM'
+
+    ret = lin.eigsh(P, k=n, M=S, sigma=sigma, return_eigenvectors=not eigvals_only, **kwargs)
+
+    # Sort eigenvalues
+    if eigvals_only:
+        return np.sort(ret)
+    idx = np.argsort(ret[0])
+    return ret[0][idx], ret[1][:, idx]
+
+
 @set_module("sisl.physics")
 class SparseOrbitalBZ(SparseOrbital):
     r""" Sparse object containing the orbital connections in a Brillouin zone
@@ -522,19 +556,59 @@ class SparseOrbitalBZ(SparseOrbital):
 
         Setup the quantity and overlap matrix with respect to
         the given k-point and calculate a subset of the eigenvalues using the sparse algorithms.
+        For non-orthogonal basis sets the generalized eigenvalue problem is solved.
+
+        By default the `n` eigenvalues closest to `sigma` are calculated using the shift-invert
+        mode with a single sparse LU factorization of :math:`\mathbf P - \sigma\mathbf S`.
+        This converges much faster than searching for the smallest magnitude eigenvalues.
 
         All subsequent arguments gets passed directly to :code:`scipy.linalg.eigsh`
-        """
-        # We always request the smallest eigenvalues...
-        kwargs.update({'which': kwargs.get('which', 'SM')})
 
-        dtype = kwargs.pop('dtype', None)
+        Parameters
+        ----------
+        k : array_like, optional
+           the k-point to calculate the eigenvalues at
+        n : int, optional
+           number of eigenvalues to calculate
+        gauge : {'R', 'r'}
+           the chosen gauge
+        eigvals_only : bool, optional
+           whether only eigenvalues are returned, or also the eigenvectors
+        sigma : float, optional
+           target eigenvalue for the shift-invert mode. If not specified, shift-invert
+           around 0 is used unless `which` is specified, in which case the regular mode is used.
 
+        Returns
+        -------
+        numpy.ndarray
+            eigenvalues (in ascending order)
+        numpy.ndarray
+            eigenvectors (columns), only if ``eigvals_only=False``
+        """
+        dtype = kwargs.pop('dtype', None)
         P = self.Pk(k=k, dtype=dtype, gauge=gauge)
+        S = None
         if not self.orthogonal:
-            raise ValueError("The sparsity pattern is non-orthogonal, you cannot use the Arnoldi procedure with scipy")
+            S = self.Sk(k=k, dtype=P.dtype, gauge=gauge)
+        return _eigsh(P, S, n, eigvals_only, **kwargs)
+
+    def kpm(self, k=(0, 0, 0), gauge='R', **kwargs):
+        r""" Kernel polynomial method for spectral quantities without diagonalization
+
+        Parameters
+        ----------
+        k : array_like, optional
+           the k-point to setup the matrices at
+        gauge : {'R', 'r'}
+           the chosen gauge
+        **kwargs : dict, optional
+           passed to `KPM`, e.g. `bounds` or `kernel`
 
-        return lin.eigsh(P, k=n, return_eigenvectors=not eigvals_only, **kwargs)
+        See Also
+        --------
+        KPM : for details and the calculable quantities
+        """
+        return KPM(self, k=k, gauge=gauge, **kwargs)
 
     def __getstate__(self):
         return {
@@ -960,28 +1034,29 @@ class SparseOrbitalBZSpin(SparseOrbitalBZ):
 
         Setup the quantity and overlap matrix with respect to
         the given k-point and calculate a subset of the eigenvalues using the sparse algorithms.
+        See `SparseOrbitalBZ.eigsh` for details on the shift-invert mode.
 
         All subsequent arguments gets passed directly to :code:`scipy.linalg.eigsh`
 
         Parameters
         ----------
+        sigma : float, optional
+           target eigenvalue for the shift-invert mode
         spin : int, optional
            the spin-component to calculate the eigenvalue spectrum of, note that
            this parameter is only valid for `Spin.POLARIZED` matrices.
         """
-        # We always request the smallest eigenvalues...
         spin = kwargs.pop('spin', 0)
         dtype = kwargs.pop('dtype', None)
-        kwargs.update({'which': kwargs.get('which', 'SM')})
 
         if self.spin.kind == Spin.POLARIZED:
             P = self.Pk(k=k, dtype=dtype, spin=spin, gauge=gauge)
         else:
             P = self.Pk(k=k, dtype=dtype, gauge=gauge)
+        S = None
         if not self.orthogonal:
-            raise ValueError("The sparsity pattern is non-orthogonal, you cannot use the Arnoldi procedure with scipy")
-
-        return lin.eigsh(P, k=n, return_eigenvectors=not eigvals_only, **kwargs)
+            S = self.Sk(k=k, dtype=P.dtype, gauge=gauge)
+        return _eigsh(P, S, n, eigvals_only, **kwargs)
 
     def transpose(self, hermitian=False):
         r""" A transpose copy of this object, possibly apply the Hermitian conjugate as well
@@ -25,6 +25,29 @@ def _inner(v1, v2):
     return _dot(_conj(v1), v2)
 
 
+def _norm2_residual(snorm, onorm):
+    r""" Residual of site-norms, :math:`\delta N_{\alpha\beta}`, for all pairs of states (last 2 dimensions) """
+    snorm = snorm.real
+    onorm = onorm.real
+    R = np.matmul(snorm, onorm.swapaxes(-1, -2)) * -2
+    R += einsum('...ij,...ij->...i', snorm, snorm)[..., :, None]
+    R += einsum('...ij,...ij->...i', onorm, onorm)[..., None, :]
+    return R
+
+
+def _assign(cost):
+    r""" Optimal assignment minimizing `cost`, returns ``index`` such that row ``i`` is assigned to column ``index[i]``
+
+    Also returns whether the assignment is unique in the sense that every row is
+    assigned to its smallest column.
+    """
+    # scipy.optimize is slow to import
+    from scipy.optimize import linear_sum_assignment
+    _, index = linear_sum_assignment(cost)
+    unique = np.allclose(cost[_a.arangei(len(index)), index], cost.min(1))
+    return _a.asarrayi(index), unique
+
+
 @set_module("sisl.physics")
 class ParentContainer:
     """ A container for parent and information """
@@ -509,7 +532,8 @@ class State(ParentContainer):
 
         where :math:`\alpha` and :math:`\beta` correspond to state indices in `self` and `other`, respectively.
         The new states (from `other`) returned is then ordered such that the index
-        :math:`\alpha \equiv \beta'` where :math:`\delta N_{\alpha\beta}` is smallest.
+        :math:`\alpha \equiv \beta'` where the total residual :math:`\sum_\alpha\delta N_{\alpha\beta'}`
+        is smallest (using the Hungarian algorithm).
 
         Parameters
         ----------
@@ -533,27 +557,11 @@ class State(ParentContainer):
         --------
         align_phase : rotate states such that their phases align
         """
-        snorm = self.norm2(False)
-        onorm = other.norm2(False)
-
-        # Now find new orderings
-        show_warn = False
-        idx = _a.fulli(len(other), -1)
-        idxr = _a.emptyi(len(other))
-        for i in range(len(other)):
-            R = snorm - onorm[i, :].reshape(1, -1)
-            R = einsum('ij,ij->i', R, R)
-
-            # Figure out which band it should correspond to
-            # find closest largest one
-            for j in np.argsort(R):
-                if j not in idx[:i]:
-                    idx[i] = j
-                    idxr[j] = i
-                    break
-                show_warn = True
-
-        if show_warn:
+        # Find the new ordering by minimizing the total residual
+        R = _norm2_residual(self.norm2(False), other.norm2(False))
+        idxr, unique = _assign(R)
+
+        if not unique:
             warn(self.__class__.__name__ + '.align_norm found multiple possible candidates with minimal residue, swapping not unique')
 
         if ret_index:
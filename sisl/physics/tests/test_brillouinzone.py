@@ -214,6 +214,91 @@ class TestBrillouinZone:
             else:
                 assert ((k == 0.).sum(1).astype(np.int32) == 3).sum() == 0
 
+    @pytest.mark.parametrize("n", [4, 5, 12])
+    @pytest.mark.parametrize("centered", [True, False])
+    def test_mp_symmetry_hexagonal(self, n, centered):
+        from sisl import Hamiltonian
+        H = Hamiltonian(geom.graphene())
+        H.construct([[0.1, 1.44], [0, -2.7]])
+        mp = MonkhorstPack(H, [n, n, 1], centered=centered, trs=False)
+        mps = MonkhorstPack(H, [n, n, 1], centered=centered, symmetry=True)
+        assert len(mps) < len(mp)
+        assert mps.weight.sum() == pytest.approx(1.)
+        assert np.allclose(mp.apply.average.eigh(), mps.apply.average.eigh())
+
+        # unfold to the full grid
+        k, idx = mps.unfold()
+        assert len(k) == n * n
+        assert np.allclose(mp.apply.array.eigh()[np.lexsort(mp.k.T)],
+                           mps.apply.array.eigh()[idx][np.lexsort(k.T)])
+
+    def test_mp_symmetry_cubic(self):
+        mp = MonkhorstPack(SuperCell(2.), [4, 4, 4], symmetry=True)
+        # irreducible wedge of a simple cubic Gamma-centered grid
+        assert len(mp) == 10
+        assert mp.weight.sum() == pytest.approx(1.)
+        assert np.allclose(np.sort(mp.weight * 64), [1, 1, 3, 3, 6, 6, 8, 12, 12, 12])
+
+    def test_mp_symmetry_ops(self):
+        # only mirror in x
+        op = np.diag([-1, 1, 1])
+        mp = MonkhorstPack(SuperCell(2.), [4, 1, 1], symmetry=[op], trs=False)
+        assert len(mp) == 3
+        mp2 = mp.copy()
+        assert np.allclose(mp.unfold()[1], mp2.unfold()[1])
+
+    def test_mp_symmetry_asgrid(self):
+        class Test(SuperCellChild):
+            def __init__(self, sc):
+                self.set_supercell(sc)
+            def eigh(self, k, *args, **kwargs):
+                return np.ones(3) * (np.asarray(k) ** 2).sum()
+        mp = MonkhorstPack(Test(SuperCell(2.)), [4, 4, 4], trs=False)
+        mps = MonkhorstPack(Test(SuperCell(2.)), [4, 4, 4], symmetry=True)
+        grid = mp.asgrid().eigh(wrap=lambda eig: eig[0])
+        grids = mps.asgrid().eigh(wrap=lambda eig: eig[0])
+        assert np.allclose(grid.grid, grids.grid)
+
+    def test_mp_symmetry_fail(self):
+        with pytest.raises(SislError):
+            MonkhorstPack(SuperCell(2.), [4, 4, 4], size=0.5, symmetry=True)
+
+        mp = MonkhorstPack(SuperCell(2.), [4, 4, 4])
+        with pytest.raises(SislError):
+            mp.unfold()
+
+    def test_mp_refine(self):
+        class Test(SuperCellChild):
+            def __init__(self, sc):
+                self.set_supercell(sc)
+            def eigh(self, k, *args, **kwargs):
+                return np.cos(2 * np.pi * np.asarray(k))
+        mp = MonkhorstPack(Test(SuperCell(2.)), [4, 4, 1], trs=False)
+        nk = len(mp)
+        # cos(2 pi k) in [-0.5, 0.5] refines all non-extremal k-points
+        mp.refine([-0.5, 0.5], levels=2)
+        assert len(mp) > nk
+        assert mp.weight.sum() == pytest.approx(1.)
+        # the z-direction is not refined
+        assert np.allclose(mp.k[:, 2], 0.)
+        # no k-points are duplicated
+        assert len(np.unique(mp.k.round(8), axis=0)) == len(mp)
+
+        mp2 = mp.copy()
+        assert np.allclose(mp.k, mp2.k)
+        mp2.refine(0., dE=0.2)
+        assert len(mp2) > len(mp)
+
+    def test_mp_refine_none(self):
+        class Test(SuperCellChild):
+            def __init__(self, sc):
+                self.set_supercell(sc)
+            def eigh(self, k, *args, **kwargs):
+                return np.ones(3)
+        mp = MonkhorstPack(Test(SuperCell(2.)), [4, 4, 1], trs=False)
+        mp.refine(0.)
+        assert len(mp) == 16
+
     def test_pbz1(self, setup):
         bz = BandStructure(setup.s1, [[0]*3, [.5]*3], 300)
         assert len(bz) == 300
@@ -453,6 +538,14 @@ class TestBrillouinZone:
         assert bz1.parent == bz2.parent
         assert bz1._centered == bz2._centered
 
+    def test_monkhorstpack_symmetry_pickle(self, setup):
+        import pickle as p
+        bz1 = MonkhorstPack(geom.graphene(), [10, 10, 1], symmetry=True)
+        bz2 = p.loads(p.dumps(bz1))
+        assert np.allclose(bz1.k, bz2.k)
+        assert np.allclose(bz1.weight, bz2.weight)
+        assert np.allclose(bz1.unfold()[1], bz2.unfold()[1])
+
     def test_bandstructure_pickle(self, setup):
         import pickle as p
         bz1 = BandStructure(setup.s1, [[0]*2, [.5]*2], 300, ['A', 'C'])
@@ -465,6 +558,33 @@ class TestBrillouinZone:
         assert np.allclose(bz1.division, bz2.division)
         assert bz1.name == bz2.name
 
+    @pytest.mark.parametrize("method", ["norm", "overlap"])
+    def test_bandstructure_align_index(self, method):
+        from sisl import Hamiltonian
+        # two decoupled chains with crossing bands
+        g = Geometry([[0, 0, 0], [0, 5, 0]], Atom(1, 1.001), sc=[1, 10, 10])
+        g.set_nsc([3, 1, 1])
+        H = Hamiltonian(g)
+        for ia, (e, t) in enumerate([(0.2, 1.), (-0.2, -0.5)]):
+            H[ia, ia] = e
+            for isc in [-1, 1]:
+                H[ia, ia + g.sc_index([isc, 0, 0]) * g.na] = t
+        bs = BandStructure(H, [[0] * 3, [0.5, 0, 0]], 51)
+        eigs = bs.apply.array.eigh()
+        idx = bs.align_index(method=method)
+        assert idx.shape == eigs.shape
+        eigs = np.take_along_axis(eigs, idx, axis=1)
+        k = bs.k[:, 0] * 2 * np.pi
+        band = np.array([0.2 + 2 * np.cos(k), -0.2 - np.cos(k)]).T
+        if not np.isclose(eigs[0, 0], band[0, 0]):
+            band = band[:, ::-1]
+        assert np.allclose(eigs, band)
+
+        states = bs.apply.list.eigenstate()
+        assert np.allclose(idx, bs.align_index(states, method=method))
+        with pytest.raises(ValueError):
+            bs.align_index(states, method="unknown")
+
     @pytest.mark.parametrize("n", [[0, 0, 1], [0.5] * 3])
     def test_param_circle(self, n):
         bz = BrillouinZone.param_circle(1, 10, 0.1, n, [1/2] * 3)
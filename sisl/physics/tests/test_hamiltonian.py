@@ -7,8 +7,10 @@ from scipy.linalg import block_diag
 from sisl import Geometry, Atom, SuperCell, Hamiltonian, Spin, BandStructure, MonkhorstPack, BrillouinZone
 from sisl import get_distribution
 from sisl import oplist
-from sisl import Grid, SphericalOrbital, SislError
-from sisl.physics.electron import berry_phase, spin_squared, conductivity
+from sisl import Grid, SphericalOrbital, SislError, geom
+from sisl.physics.electron import berry_phase, wilson_loop, spin_squared, conductivity
+from sisl.physics.electron import spin_moment, spin_orbital_moment, expectation
+from sisl.physics.electron import WavefunctionProjector, DOS, DOS_tetrahedron
 
 
 pytestmark = pytest.mark.hamiltonian
@@ -643,6 +645,61 @@ class TestHamiltonian:
         with pytest.raises(ValueError):
             berry_phase(bz, method='unknown')
 
+    def test_wilson_loop_zak(self):
+        # SSH model, topological cell
+        g = Geometry([[-.6, 0, 0], [0.6, 0, 0]], Atom(1, 1.001), sc=[2, 10, 10])
+        g.set_nsc([3, 1, 1])
+        H = Hamiltonian(g)
+        H.construct([(0.1, 1.0, 1.5), (0, 1., 0.5)])
+        k = np.linspace(0.0, 1.0, 101)
+        K = np.zeros([2, k.size, 3])
+        K[:, :, 0] = k
+        # the second contour is shifted by a reciprocal lattice vector
+        K[1, :, 0] += 1
+        phase = wilson_loop(H, K, sub=0)
+        assert phase.shape == (2, 1)
+        assert np.allclose(np.abs(phase), np.pi)
+        bz = BrillouinZone(H, K[0])
+        assert np.allclose(wilson_loop(H, K, nthreads=2),
+                           berry_phase(bz, method='zak', eigvals=True))
+
+    def test_wilson_loop_mixed_closed(self):
+        g = Geometry([[-.6, 0, 0], [0.6, 0, 0]], Atom(1, 1.001), sc=[2, 10, 10])
+        g.set_nsc([3, 1, 1])
+        H = Hamiltonian(g)
+        H.construct([(0.1, 1.0, 1.5), (0, 1., 0.5)])
+        K = np.zeros([2, 51, 3])
+        # first contour ends at k0 + G, the second is open
+        K[0, :, 0] = np.linspace(0.0, 1.0, 51)
+        K[1, :, 0] = np.linspace(0.0, 0.5, 51)
+        phase = wilson_loop(H, K, sub=0)
+        assert np.allclose(np.abs(phase[0]), np.pi)
+        assert np.allclose(phase[0], wilson_loop(H, K[:1], sub=0)[0])
+        assert np.allclose(phase[1], wilson_loop(H, K[1:], sub=0)[0])
+        # closed only affects the open contour
+        phase = wilson_loop(H, K, sub=0, closed=False)
+        assert np.allclose(np.abs(phase[0]), np.pi)
+        assert np.allclose(phase[1], wilson_loop(H, K[1:], sub=0, closed=False)[0])
+
+    def test_wilson_loop_berry_phase(self, setup):
+        R, param = [0.1, 1.5], [1., 0.1]
+        g = setup.g.tile(2, 0).tile(2, 1).tile(2, 2)
+        H = Hamiltonian(g)
+        H.construct((R, param))
+        bz1 = BandStructure.param_circle(H, 20, 0.01, [0, 0, 1], [1/3] * 3)
+        bz2 = BandStructure.param_circle(H, 20, 0.01, [0, 0, 1], [1/3] * 3, loop=True)
+        phase = wilson_loop(H, [bz1.k, bz2.k[::-1]], sub=[0, 1])
+        assert np.allclose(phase[0], berry_phase(bz1, sub=[0, 1], eigvals=True))
+        # reversed contour
+        assert np.allclose(phase[0], -phase[1][::-1])
+
+    def test_wilson_loop_fail(self, setup):
+        H = Hamiltonian(setup.g)
+        with pytest.raises(ValueError):
+            wilson_loop(H, [[0, 0, 0], [0.5, 0, 0]])
+        with pytest.raises(SislError):
+            wilson_loop(H.geometry, [[[0, 0, 0], [0.5, 0, 0]]])
+
     def test_berry_curvature(self, setup):
         R, param = [0.1, 1.5], [1., 0.1]
         g = setup.g.tile(2, 0).tile(2, 1).tile(2, 2)
@@ -663,6 +720,27 @@ class TestHamiltonian:
         mp = MonkhorstPack(H, [11, 11, 1])
         cond = conductivity(mp)
 
+    def test_conductivity_ahc(self):
+        # Haldane model
+        g = geom.graphene()
+        H = Hamiltonian(g, dtype=np.complex128)
+        H.construct([(0.1, 1.5), (0., -1.)])
+        H[0, 0] = 0.2
+        H[1, 1] = -0.2
+        for ia in range(2):
+            for ja in g.close(ia, R=(1.5, 2.6))[1]:
+                d = g.axyz(ja) - g.xyz[ia]
+                ang = np.floor(np.arctan2(d[1], d[0]) / (np.pi / 3) + 1e-6)
+                H[ia, ja] = 0.1j * (1 - 2 * ia) * (1 - 2 * (ang % 2))
+        H = H.tile(2, 0)
+        mp = MonkhorstPack(H, [9, 9, 1])
+        cond = conductivity(mp, complex=True)
+        assert np.allclose(cond.imag, conductivity(mp))
+        assert np.allclose(cond.imag, conductivity(mp, nthreads=2))
+        assert np.allclose(cond.imag, conductivity(mp, window=(-10, 10)))
+        assert not np.allclose(cond.imag, conductivity(mp, window=(-1.5, 1.5)))
+        assert abs(cond[0, 1].imag) > 1
+
     def test_gauge_inv_eff(self, setup):
         R, param = [0.1, 1.5], [1., 0.1]
         g = setup.g.tile(2, 0).tile(2, 1).tile(2, 2)
@@ -786,6 +864,39 @@ class TestHamiltonian:
             assert np.allclose(es.norm2(), 1)
             str(es)
 
+    def test_dos_tetrahedron(self, setup):
+        H = setup.H.copy()
+        H.construct([(0.1, 1.5), (0., 1.)])
+        E = np.linspace(-4, 4, 801)
+        n = 24
+        mp = MonkhorstPack(H, [n, n, 1], trs=False)
+        eig = mp.apply.array.eigh().reshape(n, n, 1, -1)
+        tDOS = DOS_tetrahedron(E, eig)
+        assert tDOS.shape == E.shape
+        assert np.all(tDOS >= 0)
+        # integrates to the number of bands (flat tetrahedra are neglected)
+        assert np.trapz(tDOS, E) == pytest.approx(len(H), abs=0.05)
+        # broadened it agrees with the Gaussian DOS
+        dist = get_distribution('gaussian', smearing=0.2)
+        gDOS = mp.apply.average.eigh(wrap=lambda eig: DOS(E, eig, dist))
+        tDOS = np.convolve(tDOS, dist(E - E[400]) * (E[1] - E[0]), mode='same')
+        assert np.allclose(gDOS[100:-100], tDOS[100:-100], atol=0.02)
+
+    def test_dos_tetrahedron_symmetry(self, setup):
+        H = setup.H.copy()
+        H.construct([(0.1, 1.5), (0., 1.)])
+        E = np.linspace(-4, 4, 101)
+        mp = MonkhorstPack(H, [12, 12, 1], trs=False)
+        eig = mp.apply.array.eigh().reshape(12, 12, 1, -1)
+        mps = MonkhorstPack(H, [12, 12, 1], symmetry=True)
+        _, idx = mps.unfold()
+        eigs = mps.apply.array.eigh()[idx].reshape(12, 12, 1, -1)
+        assert np.allclose(DOS_tetrahedron(E, eig), DOS_tetrahedron(E, eigs))
+
+    def test_dos_tetrahedron_fail(self):
+        with pytest.raises(ValueError):
+            DOS_tetrahedron([0.], np.zeros([4, 4]))
+
     def test_pdos1(self, setup):
         HS = setup.HS.copy()
         HS.construct([(0.1, 1.5), ((0., 1.), (1., 0.1))])
@@ -931,6 +1042,51 @@ class TestHamiltonian:
         assert len(sup) == 2
         assert len(sdn) == 1
 
+    def test_spin_stacked(self, setup):
+        g = Geometry([[i, 0, 0] for i in range(10)], Atom(6, R=1.01), sc=SuperCell([10, 1, 1], nsc=[3, 1, 1]))
+        H = Hamiltonian(g, dtype=np.float64, orthogonal=False, spin=Spin('non-collinear'))
+        for i in range(10):
+            H[i, i, :4] = [0.1, 0.05, 0.1, 0.1]
+            H.S[i, i] = 1.
+            H[i, (i+1) % 10, :2] = [1., 1.]
+            H[i, (i-1) % 10, :2] = [1., 1.]
+            H.S[i, (i+1) % 10] = 0.1
+            H.S[i, (i-1) % 10] = 0.1
+        ks = [[0, 0, 0], [0.1, 0, 0], [0.25, 0, 0]]
+        es = [H.eigenstate(k) for k in ks]
+        states = np.stack([e.state for e in es])
+        Sk = [H.Sk(k) for k in ks]
+
+        sm = spin_moment(states, Sk)
+        om = spin_orbital_moment(states, Sk)
+        assert sm.shape == (3, H.no * 2, 3)
+        assert om.shape == (3, H.no * 2, H.no, 3)
+        # dense stacked overlap matrices yields the same
+        assert np.allclose(sm, spin_moment(states, np.stack([S.toarray() for S in Sk])))
+        Sz = np.stack([np.kron(S.toarray()[::2, ::2], np.diag([1, -1])) for S in Sk])
+        assert np.allclose(sm[..., 2], expectation(states, Sz).real)
+        for i, e in enumerate(es):
+            assert np.allclose(sm[i], e.spin_moment())
+            assert np.allclose(om[i], e.spin_orbital_moment())
+            assert np.allclose(expectation(states, Sz, diag=False)[i], e.expectation(Sz[i], diag=False))
+
+    def test_spin_squared_stacked(self, setup):
+        g = Geometry([[i, 0, 0] for i in range(10)], Atom(6, R=1.01), sc=SuperCell(1, nsc=[3, 1, 1]))
+        H = Hamiltonian(g, spin=Spin.POLARIZED)
+        H.construct(([0.1, 1.1], [[0, 0.1], [1, 1.1]]))
+        H[0, 0] = (0.1, 0.)
+        H[0, 1] = (0.5, 0.4)
+        ks = [[0, 0, 0], [0.1, 0, 0]]
+        alpha = np.stack([H.eigenstate(k, spin=0).state for k in ks])
+        beta = np.stack([H.eigenstate(k, spin=1).state[:4] for k in ks])
+        sup, sdn = spin_squared(alpha, beta)
+        assert sup.shape == (2, H.no)
+        assert sdn.shape == (2, 4)
+        for i in range(len(ks)):
+            sup1, sdn1 = spin_squared(alpha[i], beta[i])
+            assert np.allclose(sup[i], sup1)
+            assert np.allclose(sdn[i], sdn1)
+
     def test_non_colinear1(self, setup):
         g = Geometry([[i, 0, 0] for i in range(10)], Atom(6, R=1.01), sc=SuperCell(100, nsc=[3, 3, 1]))
         H = Hamiltonian(g, dtype=np.float64, spin=Spin.NONCOLINEAR)
@@ -1383,6 +1539,19 @@ class TestHamiltonian:
         H.shift(-Ef)
         assert H.fermi_level(bz, q=q) == pytest.approx(0., abs=1e-6)
 
+    def test_fermi_level_eig(self, setup):
+        R, param = [0.1, 1.5], [(1., 1.), (2.1, 0.1)]
+        H = Hamiltonian(setup.g.copy(), orthogonal=False)
+        H.construct([R, param])
+        bz = MonkhorstPack(H, [10, 10, 1])
+        eig = bz.apply.array.eigh()
+        q = 0.9
+        for kT in [0.01, 0.1]:
+            dist = get_distribution('fermi_dirac', smearing=kT)
+            Ef = H.fermi_level(bz, q=q, distribution=dist, eig=eig)
+            assert Ef == pytest.approx(H.fermi_level(bz, q=q, distribution=dist))
+            assert (dist(eig, mu=Ef) * bz.weight.reshape(-1, 1)).sum() == pytest.approx(q)
+
     def test_fermi_level_spin(self, setup):
         R, param = [0.1, 1.5], [(1., 1.), (2.1, 0.1)]
         H = Hamiltonian(setup.g.copy(), spin=Spin('P'))
@@ -1520,6 +1689,54 @@ def test_wavefunction3():
     ES.sub(0).wavefunction(grid)
 
 
+@pytest.sisl_travis_skip
+def test_wavefunction_projector():
+    N = 50
+    o1 = SphericalOrbital(0, (np.linspace(0, 2, N), np.exp(-np.linspace(0, 100, N))))
+    G = Geometry([[1] * 3, [2] * 3], Atom(6, o1), sc=[4, 4, 4])
+    H = Hamiltonian(G)
+    R, param = [0.1, 1.5], [1., 0.1]
+    H.construct([R, param])
+    ES = H.eigenstate(dtype=np.float64)
+    grid = Grid(0.1, geometry=H.geometry)
+    proj = WavefunctionProjector(grid)
+    psi = proj.project(ES.state)
+    assert psi.shape == (len(ES),) + grid.shape
+    # threaded version yields the same
+    assert np.allclose(psi, proj.project(ES.state, nthreads=2))
+
+    # independent reference: sum the orbitals (and their periodic images) on all grid points
+    r = np.linspace(0, 2, N)
+    o2 = SphericalOrbital(0, (r, np.exp(-2 * r ** 2)))
+    G2 = Geometry([[1] * 3, [2.5, 1.5, 3.2]], Atom(6, o2), sc=[4, 4, 4])
+    grid2 = Grid(0.2, geometry=G2)
+    state = np.array([[0.7, -0.3], [0.4, 1.1]])
+    psi2 = WavefunctionProjector(grid2).project(state)
+    xyz = grid2.index2xyz(grid2.mgrid(*[slice(0, n) for n in grid2.shape]))
+    isc = np.stack(np.meshgrid(*[[-1, 0, 1]] * 3, indexing='ij'), -1).reshape(-1, 3)
+    ref = np.zeros([len(state), len(xyz)])
+    for off in isc.dot(G2.cell):
+        for ia in range(G2.na):
+            ref += state[:, ia:ia+1] * o2.psi(xyz - G2.xyz[ia] - off).reshape(1, -1)
+    assert np.allclose(psi2.reshape(len(state), -1), ref)
+
+    # adding to an existing grid
+    grid.fill(0.)
+    proj.project(ES.state[0], out=grid.grid)
+    assert np.allclose(grid.grid, psi[0])
+
+
+@pytest.sisl_travis_skip
+def test_wavefunction_projector_complex_fail():
+    N = 50
+    o1 = SphericalOrbital(0, (np.linspace(0, 2, N), np.exp(-np.linspace(0, 100, N))))
+    G = Geometry([[1] * 3, [2] * 3], Atom(6, o1), sc=[4, 4, 4])
+    grid = Grid(0.1, geometry=G)
+    proj = WavefunctionProjector(grid)
+    with pytest.raises(SislError):
+        proj.project(np.ones(2, np.complex128), out=grid.grid)
+
+
 @pytest.sisl_travis_skip
 def test_wavefunction_eta():
     N = 50
@@ -0,0 +1,95 @@
+import pytest
+
+import numpy as np
+
+from sisl import geom, Hamiltonian, KPM, get_distribution
+from sisl.physics.kpm import jackson_kernel, lorentz_kernel
+
+
+pytestmark = pytest.mark.kpm
+
+
+@pytest.fixture
+def setup():
+    class t():
+        def __init__(self):
+            g = geom.graphene()
+            self.H = Hamiltonian(g)
+            self.H.construct([(0.1, 1.5), (0., -2.7)])
+            self.H = self.H.tile(6, 0).tile(6, 1)
+            self.HS = Hamiltonian(g, orthogonal=False)
+            self.HS.construct([(0.1, 1.5), ((0., 1.), (-2.7, 0.1))])
+            self.HS = self.HS.tile(6, 0).tile(6, 1)
+    return t()
+
+
+def test_kernels():
+    for kernel in (jackson_kernel, lorentz_kernel):
+        g = kernel(100)
+        assert len(g) == 100
+        assert g[0] == pytest.approx(1.)
+        assert np.all(np.diff(g) <= 0)
+
+
+@pytest.mark.parametrize("orthogonal", [True, False])
+def test_kpm_bounds(setup, orthogonal):
+    H = setup.H if orthogonal else setup.HS
+    k = [0.1, 0.2, 0]
+    eig = H.eigh(k)
+    kpm = H.kpm(k)
+    assert isinstance(kpm, KPM)
+    emin, emax = kpm.bounds
+    assert emin < eig.min()
+    assert eig.max() < emax
+
+
+@pytest.mark.parametrize("orthogonal", [True, False])
+def test_kpm_dos(setup, orthogonal):
+    H = setup.H if orthogonal else setup.HS
+    k = [0.1, 0.2, 0]
+    kpm = H.kpm(k)
+    emin, emax = kpm.bounds
+    E = np.linspace(emin, emax, 2001)
+    DOS = kpm.DOS(E, n=128, R=5, seed=1)
+    assert DOS.shape == E.shape
+    # exact trace of the zeroth moment
+    assert np.trapz(DOS, E) == pytest.approx(len(H), rel=1e-2)
+
+
+@pytest.mark.parametrize("orthogonal", [True, False])
+def test_kpm_pdos(setup, orthogonal):
+    H = setup.H if orthogonal else setup.HS
+    k = [0.1, 0.2, 0]
+    kpm = H.kpm(k)
+    emin, emax = kpm.bounds
+    E = np.linspace(emin, emax, 2001)
+    PDOS = kpm.PDOS(E, [0, 1, 5], n=128)
+    assert PDOS.shape == (3, len(E))
+    # Mulliken charges sum to 1 for each orbital
+    assert np.allclose(np.trapz(PDOS, E), 1, rtol=1e-2)
+
+    # Compare integrated charge against exact Mulliken charges
+    es = H.eigenstate(k)
+    eig = es.eig
+    i = np.argmax(np.diff(eig[1:-1])) + 1
+    Ec = (eig[i] + eig[i + 1]) / 2
+    PDOS_es = es.PDOS([0.], np.ones_like)[[0, 1, 5], 0]
+    q_es = es.sub(range(i + 1)).PDOS([0.], np.ones_like)[[0, 1, 5], 0]
+    idx = E <= Ec
+    q = np.trapz(PDOS[:, idx], E[idx])
+    assert np.allclose(PDOS_es, 1)
+    assert np.allclose(q, q_es, atol=0.02)
+
+
+@pytest.mark.parametrize("orthogonal", [True, False])
+def test_kpm_fermi_operator(setup, orthogonal):
+    H = setup.H if orthogonal else setup.HS
+    k = [0.1, 0.2, 0]
+    kpm = H.kpm(k)
+    dist = get_distribution('fermi_dirac', smearing=0.2, x0=0.5)
+    D = kpm.fermi_operator(dist, orbitals=[0, 3], n=256)
+    es = H.eigenstate(k)
+    C = es.state.T
+    D_es = (C * dist(es.eig)) @ C.conj().T
+    assert D.shape == (len(H), 2)
+    assert np.allclose(D, D_es[:, [0, 3]], atol=1e-4)
@@ -3,7 +3,7 @@ import pytest
 import math as m
 import numpy as np
 
-from sisl import geom, Atom, Geometry, Spin
+from sisl import geom, Atom, Geometry, Spin, MonkhorstPack
 from sisl.physics.sparse import SparseOrbitalBZ, SparseOrbitalBZSpin
 
 pytestmark = pytest.mark.sparse
@@ -66,11 +66,34 @@ def test_eigsh_orthogonal():
 
 
 def test_eigsh_non_orthogonal():
-    gr = _get()
+    gr = _get().tile(4, 0).tile(4, 1)
     sp = SparseOrbitalBZ(gr, orthogonal=False)
-    # not possible in non-orthogonal basis
-    with pytest.raises(ValueError):
-        sp.eigsh()
+    sp.construct([(0.1, 1.5), ((0., 1.), (1., 0.1))])
+    k = [0.1, 0.2, 0]
+    eig = sp.eigh(k)
+    # closest to 0
+    idx = np.sort(np.argsort(np.abs(eig))[:4])
+    assert np.allclose(sp.eigsh(k, n=4), eig[idx])
+    # shift-invert around a target energy
+    idx = np.sort(np.argsort(np.abs(eig - 1.))[:4])
+    e, v = sp.eigsh(k, n=4, sigma=1., eigvals_only=False)
+    assert np.allclose(e, eig[idx])
+    Hk = sp.Pk(k, format='array')
+    Sk = sp.Sk(k, format='array')
+    assert np.allclose(Hk @ v, Sk @ v * e)
+    # regular mode
+    assert np.allclose(sp.eigsh(k, n=2, which='LA'), eig[-2:])
+
+
+def test_eigsh_bz_apply():
+    gr = _get().tile(4, 0).tile(4, 1)
+    sp = SparseOrbitalBZ(gr, orthogonal=False)
+    sp.construct([(0.1, 1.5), ((0., 1.), (1., 0.1))])
+    bz = MonkhorstPack(sp, [2, 2, 1])
+    eigs = bz.apply.array.eigsh(n=2, sigma=0.5)
+    for k, eig in zip(bz.k, eigs):
+        e = sp.eigh(k)
+        assert np.allclose(eig, np.sort(e[np.argsort(np.abs(e - 0.5))[:2]]))
 
 
 def test_pickle_non_orthogonal():
@@ -1,6 +1,5 @@
 from numbers import Integral
 from functools import reduce
-from operator import eq as op_eq
 from itertools import zip_longest
 
 import numpy as np
@@ -31,7 +30,7 @@ from ._indices import indices, indices_only, sorted_unique
 from .messages import warn, SislError
 from ._help import array_fill_repeat, get_dtype, isiterable
 from .utils.ranges import array_arange
-from ._sparse import sparse_dense
+from ._sparse import sparse_dense, union_csr_matrix
 
 # Although this re-implements the CSR in scipy.sparse.csr_matrix
 # we use it slightly differently and thus require this new sparse pattern.
@@ -1572,7 +1571,7 @@ def _get_bcast_shape(*shapes):
     res_shape = ()
     for shape in shapes:
         shape = shape[::-1]
-        if not all((l1 == l2) or (l1 == 1)
+        if not all((l1 == l2) or (l1 == 1) or (l2 == 1)
                    for l1, l2 in zip(shape, res_shape)):
             raise ValueError(f"operands could not be broadcast together "
                              f"with shapes {shape[::-1]}, {res_shape[::-1]} <- ({shapes})")
@@ -1646,32 +1645,56 @@ def _ufunc_sp_sp(ufunc, a, b, **kwargs):
     elif not isinstance(b, SparseCSR):
         b = SparseCSR.fromsp(b)
 
-    if not (reduce(op_eq, zip(a.shape[:2], b.shape[:2])) and
-            a.shape[2] == 1 or b.shape[2] == 1 or a.shape[2] == b.shape[2]):
+    if a.shape[:2] != b.shape[:2] or not (a.shape[2] == 1 or b.shape[2] == 1 or a.shape[2] == b.shape[2]):
         raise ValueError(f"could not broadcast sparse matrices {a.shape} and {b.shape}")
 
-    shape = a.shape
+    shape = a.shape[:2] + (max(a.shape[2], b.shape[2]),)
     dtype = kwargs.get("dtype", np.result_type(a.dtype, b.dtype))
-    out = SparseCSR(shape, dtype=dtype, nnzpr=1, nnz=a.shape[0])
 
-    # Now we need to add things to the sparsity pattern
-    for r in range(shape[0]):
-        asl = np.arange(a.ptr[r], a.ptr[r] + a.ncol[r])
-        aidx = out._extend(r, a.col[asl])
-        bsl = np.arange(b.ptr[r], b.ptr[r] + b.ncol[r])
-        bidx = out._extend(r, b.col[bsl])
+    def compact_data(m):
+        if m.ptr[-1] == m.nnz:
+            return m._D[:m.nnz]
+        return m._D[array_arange(m.ptr[:-1], n=m.ncol)]
 
-        # Find common indices
-        idx, aover, bover = np.intersect1d(aidx, bidx, return_indices=True)
-        out._D[idx, :] = ufunc(a._D[asl[aover], :],
-                               b._D[bsl[bover], :], **kwargs)
-
-        aonly = np.delete(aidx, aover)
-        out._D[aonly, :] = ufunc(a._D[np.delete(asl, aover), :], 0, **kwargs)
-        bonly = np.delete(bidx, bover)
-        out._D[bonly, :] = ufunc(0, b._D[np.delete(bsl, bover), :], **kwargs)
-
-    return out
+    # Fast path for identical sparsity patterns (no pattern work needed)
+    if np.array_equal(a.ncol, b.ncol):
+        if a.ptr[-1] == a.nnz and b.ptr[-1] == b.nnz:
+            same = np.array_equal(a.col[:a.nnz], b.col[:b.nnz])
+        else:
+            same = np.array_equal(a.col[array_arange(a.ptr[:-1], n=a.ncol)],
+                                  b.col[array_arange(b.ptr[:-1], n=b.ncol)])
+        if same:
+            ptr = insert(_a.cumsumi(a.ncol), 0, 0)
+            col = a.col[array_arange(a.ptr[:-1], n=a.ncol)]
+            D = np.empty([len(col), shape[2]], dtype=dtype)
+            D[...] = ufunc(compact_data(a), compact_data(b), **kwargs)
+            return SparseCSR((D, col, ptr), shape=shape, dtype=dtype)
+
+    # Merge the two sparsity patterns in one pass
+    ptr, col, aidx, bidx = union_csr_matrix(a.ptr, a.ncol, a.col,
+                                            b.ptr, b.ncol, b.col, shape[1])
+    aD = compact_data(a)
+    bD = compact_data(b)
+
+    # Index of b-elements in the union pattern
+    b_union = np.full(len(col), -1, dtype=np.int32)
+    b_union[bidx] = _a.arangei(len(bidx))
+    in_a = np.zeros(len(col), dtype=np.bool_)
+    in_a[aidx] = True
+
+    D = np.empty([len(col), shape[2]], dtype=dtype)
+    # overlapping elements
+    ib = b_union[aidx]
+    both = ib >= 0
+    D[aidx[both]] = ufunc(aD[both], bD[ib[both]], **kwargs)
+    # only in a
+    aonly = np.logical_not(both)
+    D[aidx[aonly]] = ufunc(aD[aonly], 0, **kwargs)
+    # only in b
+    bonly = np.logical_not(in_a[bidx])
+    D[bidx[bonly]] = ufunc(0, bD[bonly], **kwargs)
+
+    return SparseCSR((D, col, ptr), shape=shape, dtype=dtype)
 
 
 def _ufunc_pre(ufunc, *in_args, **kwargs):
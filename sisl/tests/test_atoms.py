@@ -48,6 +48,26 @@ def test_create4():
         Atoms({0: Atom(4)})
 
 
+def test_create_list_order():
+    # unique atoms are in order of first appearance
+    atoms = Atoms(['O', 'H', 'H', 'C', 'O'])
+    assert [a.Z for a in atoms.atom] == [8, 1, 6]
+    assert np.allclose(atoms.specie, [0, 1, 1, 2, 0])
+    atoms = Atoms(np.array([8, 1, 1, 6, 8]))
+    assert [a.Z for a in atoms.atom] == [8, 1, 6]
+    assert np.allclose(atoms.specie, [0, 1, 1, 2, 0])
+
+    # equal atoms (different objects) are merged
+    C1, C2, H = Atom(6), Atom(6), Atom(1)
+    atoms = Atoms([H, C1, C2, H, C1])
+    assert len(atoms.atom) == 2
+    assert atoms.atom[0] is H
+    assert np.allclose(atoms.specie, [0, 1, 1, 0, 1])
+    atoms = Atoms([H, Atom(6, R=1.), C2])
+    assert len(atoms.atom) == 3
+    assert np.allclose(atoms.specie, [0, 1, 2])
+
+
 def test_len(setup):
     atom = Atoms([setup.C, setup.C3, setup.Au])
     assert len(atom) == 3
@@ -5,8 +5,8 @@ import numpy as np
 from scipy.sparse import csr_matrix
 
 from sisl import SuperCell, SphericalOrbital, Atom, Geometry
-from sisl import Grid
-from sisl import Ellipsoid, Cuboid
+from sisl import Grid, SislError
+from sisl import Sphere, Ellipsoid, Cuboid
 
 
 @pytest.fixture
@@ -428,6 +428,247 @@ class TestGrid:
         g.pyamg_boundary_condition(A, b)
 
 
+@pytest.mark.parametrize("bc", [[[Grid.PERIODIC] * 2, [Grid.NEUMANN, Grid.DIRICHLET], [Grid.DIRICHLET, Grid.NEUMANN]],
+                                [[Grid.NEUMANN] * 2, [Grid.PERIODIC] * 2, [Grid.NEUMANN, Grid.DIRICHLET]],
+                                Grid.PERIODIC, Grid.NEUMANN, Grid.DIRICHLET])
+def test_grid_pyamg_operator(bc):
+    pyamg = pytest.importorskip("pyamg")
+    g = Grid([4, 5, 6], bc=bc)
+    # reference matrix from the pyamg gallery
+    A0 = pyamg.gallery.poisson(g.shape, format='csr')
+    b0 = np.zeros(A0.shape[0])
+    g.pyamg_boundary_condition(A0, b0)
+
+    A, b = g.topyamg()
+    op, b1 = g.pyamg_operator()
+    assert abs(A0 - A).max() == 0.
+    x = np.random.rand(A.shape[0])
+    assert np.allclose(op @ x, A @ x)
+    assert np.allclose(op.matmat(np.stack([x, x], 1))[:, 1], A @ x)
+
+    # fixing points is the same for all
+    idx = g.pyamg_index([[0, 1, 2], [3, 4, 5], [1, 1, 1]])
+    g.pyamg_fix(A0, b0, idx, 2.)
+    g.pyamg_fix(A, b, idx, [2., 2., 2.])
+    g.pyamg_fix(op, b1, idx, 2.)
+    assert abs(A0 - A).max() == 0.
+    assert abs(op.tocsr() - A).max() == 0.
+    assert np.allclose(op @ x, A @ x)
+    assert np.allclose(b0, b)
+    assert np.allclose(b1, b)
+
+
+@pytest.mark.parametrize("shape", [[4, 5, 6], [3, 2, 5], [2, 3, 2]])
+@pytest.mark.parametrize("bc", [[[Grid.NEUMANN] * 2, [Grid.PERIODIC] * 2, [Grid.DIRICHLET] * 2],
+                                [[Grid.PERIODIC] * 2, [Grid.NEUMANN, Grid.DIRICHLET], [Grid.PERIODIC] * 2],
+                                [[Grid.DIRICHLET, Grid.NEUMANN], [Grid.NEUMANN] * 2, [Grid.PERIODIC] * 2],
+                                Grid.PERIODIC, Grid.NEUMANN])
+def test_grid_pyamg_operator_kron(shape, bc):
+    from scipy.sparse import kron, identity, diags
+    g = Grid(shape, bc=bc)
+    # reference 7-point Laplacian (same as pyamg.gallery.poisson)
+    def lap(n):
+        return diags([-1, 2, -1], [-1, 0, 1], shape=(n, n))
+    I = [identity(n) for n in shape]
+    A0 = (kron(kron(lap(shape[0]), I[1]), I[2])
+          + kron(kron(I[0], lap(shape[1])), I[2])
+          + kron(kron(I[0], I[1]), lap(shape[2]))).tocsr()
+    b0 = np.zeros(A0.shape[0])
+    g.pyamg_boundary_condition(A0, b0)
+
+    A, b = g.topyamg()
+    op, _ = g.pyamg_operator()
+    assert abs(A0 - A).max() == 0.
+    x = np.random.rand(A.shape[0])
+    assert np.allclose(op @ x, A0 @ x)
+
+
+def test_grid_pyamg_operator_solve():
+    from scipy.sparse.linalg import lgmres
+    g = Grid([10, 10, 10], bc=Grid.DIRICHLET)
+    A, b = g.pyamg_operator()
+    idx = g.pyamg_index(g.mgrid(slice(4, 6), slice(4, 6), slice(4, 6)))
+    g.pyamg_fix(A, b, idx, 1.)
+    # fixed rows make the operator non-symmetric
+    x, info = lgmres(A, b, tol=1e-10, atol=0)
+    assert info == 0
+    assert np.allclose(x[idx], 1.)
+    assert np.allclose(A.tocsr() @ x, b, atol=1e-8)
+
+
+def test_grid_index_shapes():
+    sc = SuperCell([[10., 0, 0], [3., 9., 0], [1., 1., 8.]])
+    grid = Grid([17, 20, 15], sc=sc)
+    shapes = [Sphere(1.5, [1., 2., 3.]),
+              Cuboid([[2., 0.5, 0], [0, 3., 0.], [0.5, 0.5, 2.]], [-1., 5., 2.]),
+              Ellipsoid([1., 2., 1.5], [5., 5., 5.]),
+              Sphere(0.01, [0.3, 0.3, 0.3]),
+              Sphere(2., [11., 9., 7.])]
+    ptr, idx = grid.index_shapes(shapes)
+    assert len(ptr) == len(shapes) + 1
+    assert ptr[-1] == len(idx)
+    for i, shape in enumerate(shapes):
+        ref = grid.index(shape).reshape(-1, 3)
+        assert np.array_equal(np.unique(ref, axis=0), np.unique(idx[ptr[i]:ptr[i+1]], axis=0))
+    assert ptr[4] == ptr[3]
+
+    # spheres
+    xyz = np.array([s.center for s in shapes])
+    ptr_s, idx_s = grid.index_spheres(xyz[[0, 3, 4]], [1.5, 0.01, 2.])
+    assert np.array_equal(np.diff(ptr_s), np.diff(ptr)[[0, 3, 4]])
+    assert np.array_equal(idx_s[ptr_s[0]:ptr_s[1]], idx[ptr[0]:ptr[1]])
+    assert np.array_equal(idx_s[ptr_s[2]:], idx[ptr[4]:])
+    ptr_s, idx_s = grid.index_spheres(xyz, 1.5)
+    assert len(ptr_s) == len(xyz) + 1
+    assert np.array_equal(idx_s[ptr_s[0]:ptr_s[1]], idx[ptr[0]:ptr[1]])
+
+
+@pytest.mark.parametrize("method", ["voronoi", "becke"])
+def test_grid_integrate_atoms_symmetric(method):
+    n = 10
+    geom = Geometry([[0.25 + 0.5 / n, 0.5, 0.5],
+                     [0.75 + 0.5 / n, 0.5, 0.5]], Atom(6), sc=[4., 3., 3.])
+    geom.xyz[:, :] = geom.xyz.dot(np.diag([4., 3., 3.]))
+    grid = Grid([n, 6, 6], geometry=geom)
+    grid.fill(1.)
+    q, V, d = grid.integrate_atoms(method, ret_volume=True, ret_dipole=True)
+    assert np.allclose(q, grid.volume / 2)
+    assert np.allclose(V, grid.volume / 2)
+    assert d.shape == (2, 3)
+
+
+@pytest.mark.parametrize("method", ["voronoi", "becke"])
+def test_grid_integrate_atoms_total(method):
+    sc = SuperCell([[4., 0, 0], [1., 3.5, 0], [0, 0, 5.]])
+    geom = Geometry(np.random.rand(5, 3).dot(sc.cell) + [0, 0, 6.], Atom(6), sc=sc)
+    grid = Grid([9, 8, 11], geometry=geom)
+    grid.grid = np.random.rand(*grid.shape)
+    q, V = grid.integrate_atoms(method, ret_volume=True)
+    assert q.sum() == pytest.approx(grid.grid.sum() * grid.dvolume)
+    assert V.sum() == pytest.approx(grid.volume)
+    # chunks do not change the result
+    assert np.allclose(q, grid.integrate_atoms(method, chunk=10))
+
+    grid.grid = grid.grid + 1j
+    qc = grid.integrate_atoms(method)
+    assert np.allclose(qc.real, q)
+    assert np.allclose(qc.imag, V)
+
+
+def test_grid_integrate_atoms_voronoi():
+    sc = SuperCell([[4., 0, 0], [1., 3.5, 0], [0, 0, 5.]])
+    geom = Geometry(np.random.rand(4, 3).dot(sc.cell), Atom(6), sc=sc)
+    grid = Grid([9, 8, 11], geometry=geom)
+    grid.grid = np.random.rand(*grid.shape)
+    q, d = grid.integrate_atoms(ret_dipole=True)
+
+    # brute force nearest atom (including periodic images)
+    isc = np.stack(np.meshgrid([-1, 0, 1], [-1, 0, 1], [-1, 0, 1], indexing='ij'), -1).reshape(-1, 3)
+    xyz = (geom.xyz.reshape(1, -1, 3) + isc.dot(sc.cell).reshape(-1, 1, 3)).reshape(-1, 3)
+    r = grid.index2xyz(grid.mgrid(*[slice(0, n) for n in grid.shape]))
+    dist = ((r.reshape(-1, 1, 3) - xyz.reshape(1, -1, 3)) ** 2).sum(-1)
+    img = dist.argmin(1)
+    atom = img % geom.na
+    f = grid.grid.ravel() * grid.dvolume
+    assert np.allclose(q, np.bincount(atom, f, geom.na))
+    dr = r - xyz[img]
+    for i in range(3):
+        assert np.allclose(d[:, i], np.bincount(atom, f * dr[:, i], geom.na))
+
+
+def test_grid_integrate_atoms_skewed():
+    sc = SuperCell([[4., 0, 0], [7.5, 1., 0], [0, 0, 5.]])
+    geom = Geometry([[0.1, 0.2, 0.3], [0.6, 0.5, 0.7]], Atom(6), sc=sc)
+    geom.xyz[:, :] = geom.xyz.dot(sc.cell)
+    grid = Grid([12, 10, 8], geometry=geom)
+    grid.grid = np.random.rand(*grid.shape)
+    q = grid.integrate_atoms()
+
+    # brute force nearest atom (including 4 shells of periodic images)
+    isc = np.stack(np.meshgrid(*[np.arange(-4, 5)] * 3, indexing='ij'), -1).reshape(-1, 3)
+    xyz = (geom.xyz.reshape(1, -1, 3) + isc.dot(sc.cell).reshape(-1, 1, 3)).reshape(-1, 3)
+    r = grid.index2xyz(grid.mgrid(*[slice(0, n) for n in grid.shape]))
+    dist = ((r.reshape(-1, 1, 3) - xyz.reshape(1, -1, 3)) ** 2).sum(-1)
+    atom = dist.argmin(1) % geom.na
+    f = grid.grid.ravel() * grid.dvolume
+    assert np.allclose(q, np.bincount(atom, f, geom.na))
+
+
+@pytest.mark.parametrize("method", ["voronoi", "becke"])
+def test_grid_integrate_atoms_origo(method):
+    sc = SuperCell([[4., 0, 0], [1., 3.5, 0], [0, 0, 5.]])
+    geom = Geometry(np.random.rand(4, 3).dot(sc.cell), Atom(6), sc=sc)
+    grid = Grid([9, 8, 11], geometry=geom)
+    grid.grid = np.random.rand(*grid.shape)
+    q, d = grid.integrate_atoms(method, ret_dipole=True)
+
+    # shifting the grid origin and the atoms equally does not change anything
+    origo = np.array([1.3, -2.1, 0.7])
+    sc_o = SuperCell(sc.cell, origo=origo)
+    geom_o = Geometry(geom.xyz + origo, Atom(6), sc=sc_o)
+    grid_o = Grid([9, 8, 11], geometry=geom_o)
+    grid_o.grid = grid.grid.copy()
+    q_o, d_o = grid_o.integrate_atoms(method, ret_dipole=True)
+    assert np.allclose(q, q_o)
+    assert np.allclose(d, d_o)
+
+
+def test_grid_integrate_atoms_fail():
+    grid = Grid([4, 4, 4])
+    with pytest.raises(SislError):
+        grid.integrate_atoms()
+    grid.set_geometry(Geometry([0] * 3, Atom(1), sc=grid.sc))
+    with pytest.raises(ValueError):
+        grid.integrate_atoms("unknown")
+
+
+@pytest.mark.parametrize("mode", ["wrap", "nearest", "constant", None])
+@pytest.mark.parametrize("method", ["gaussian", "uniform"])
+def test_grid_smooth_chunked(mode, method):
+    grid = Grid([23, 10, 12], sc=20., bc=[[Grid.NEUMANN] * 2, [Grid.PERIODIC] * 2, [Grid.DIRICHLET] * 2])
+    grid.grid = np.random.rand(*grid.shape)
+    ref = grid.smooth(1.5, method=method, mode=mode)
+    for chunk, nthreads in [(300, None), (None, 3), (1, 2)]:
+        g = grid.smooth(1.5, method=method, mode=mode, chunk=chunk, nthreads=nthreads)
+        assert np.allclose(ref.grid, g.grid)
+        # in-place
+        g = grid.copy()
+        out = g.smooth(1.5, method=method, mode=mode, chunk=chunk, nthreads=nthreads, out=g)
+        assert out is g
+        assert np.allclose(ref.grid, g.grid)
+
+
+@pytest.mark.parametrize("mode", ["wrap", "nearest", "reflect", "constant"])
+@pytest.mark.parametrize("order", [0, 1, 2, 3])
+def test_grid_interp_chunked(mode, order):
+    grid = Grid([23, 10, 12], sc=20.)
+    grid.grid = np.random.rand(*grid.shape)
+    for shape in [[40, 15, 7], [11, 10, 30]]:
+        ref = grid.interp(shape, order=order, mode=mode)
+        for chunk, nthreads in [(300, None), (None, 3)]:
+            g = grid.interp(shape, order=order, mode=mode, chunk=chunk, nthreads=nthreads)
+            assert g.shape == ref.shape
+            assert np.allclose(ref.grid, g.grid)
+
+
+def test_grid_apply_out():
+    grid = Grid([10, 11, 12])
+    grid.grid = np.random.rand(*grid.shape)
+    ref = grid.apply(np.sqrt)
+    assert np.allclose(ref.grid, np.sqrt(grid.grid))
+    g = grid.apply(np.sqrt, chunk=200, nthreads=2)
+    assert np.allclose(ref.grid, g.grid)
+    out = np.empty(grid.shape)
+    g = grid.apply(np.sqrt, out=out)
+    assert g.grid is out
+    g = grid.copy()
+    assert g.apply(np.sqrt, halo=0, chunk=200, out=g) is g
+    assert np.allclose(ref.grid, g.grid)
+    # functions must retain the shape when applied in slabs
+    with pytest.raises(ValueError):
+        grid.apply(np.sum, axis=0, keepdims=True, chunk=200)
+
+
 def test_grid_fold():
     grid = Grid([4, 5, 6])
     # Assert shapes
@@ -479,3 +720,92 @@ def test_grid_tile_geom():
     assert grid.shape[2] == grid4.shape[2] // 2
     assert grid.volume * 4 == pytest.approx(grid4.volume)
     assert grid.geometry.na * 4 == grid4.geometry.na
+
+
+def test_grid_poisson_periodic():
+    sc = SuperCell([[4., 0, 0], [2., 3.5, 0], [0, 0, 5.]])
+    grid = Grid([20, 24, 10], sc=sc)
+    f = [np.arange(n).reshape(-1, 1, 1) / n for n in grid.shape]
+    f[1] = f[1].reshape(1, -1, 1)
+    f[2] = f[2].reshape(1, 1, -1)
+    # cos(G.r) with G = b1 + b2 + b3
+    grid.grid = np.cos(2 * np.pi * (f[0] + f[1] + f[2])) + 0.5
+    G2 = (sc.rcell.sum(0) ** 2).sum()
+    V = grid.poisson()
+    assert V.shape == grid.shape
+    assert V.dtype == grid.dtype
+    assert np.allclose(V.grid, (grid.grid - 0.5) / G2)
+    assert V.grid.mean() == pytest.approx(0.)
+
+    # complex valued grids
+    grid.grid = grid.grid + 1j * grid.grid
+    V = grid.poisson()
+    assert np.allclose(V.grid, (grid.grid - 0.5 - 0.5j) / G2)
+
+
+def test_grid_poisson_real_complex():
+    # skewed cell with even number of points (Nyquist frequencies)
+    sc = SuperCell([[4., 0, 0], [3., 2.5, 0], [1., 1., 5.]])
+    grid = Grid([12, 10, 8], sc=sc)
+    grid.grid = np.random.rand(*grid.shape)
+    V = grid.poisson()
+    grid.grid = grid.grid.astype(np.complex128)
+    Vc = grid.poisson()
+    assert np.allclose(Vc.grid.real, V.grid)
+    assert np.allclose(Vc.grid.imag, 0.)
+
+    # integer sources
+    grid.grid = (np.random.rand(*grid.shape) * 10).astype(np.int32)
+    V = grid.poisson()
+    assert V.dtype == np.float64
+    grid.grid = grid.grid.astype(np.float64)
+    assert np.allclose(V.grid, grid.poisson().grid)
+    assert not np.allclose(V.grid, 0.)
+
+
+def test_grid_poisson_dirichlet_neumann():
+    grid = Grid([10, 12, 15], sc=SuperCell([3., 4., 5.]))
+    h = grid.dcell.diagonal()
+    n = np.array(grid.shape)
+    x = np.arange(n[0]).reshape(-1, 1, 1) / n[0]
+    y = np.arange(1, n[1] + 1).reshape(1, -1, 1)
+    z = np.arange(n[2]).reshape(1, 1, -1) + 0.5
+    grid.grid = (np.cos(2 * np.pi * x)
+                 * np.sin(np.pi * 2 * y / (n[1] + 1))
+                 * np.cos(np.pi * 3 * z / n[2]))
+    G2 = ((2 * np.pi / grid.cell[0, 0]) ** 2
+          + (np.pi * 2 / ((n[1] + 1) * h[1])) ** 2
+          + (np.pi * 3 / (n[2] * h[2])) ** 2)
+    bc = [Grid.PERIODIC, Grid.DIRICHLET, Grid.NEUMANN]
+    V = grid.poisson(bc=bc)
+    assert np.allclose(V.grid, grid.grid / G2)
+    # the grid boundary conditions are unaltered
+    assert np.all(grid.bc == Grid.PERIODIC)
+
+    grid.set_bc(Grid.DIRICHLET)
+    x = np.arange(1, n[0] + 1).reshape(-1, 1, 1)
+    grid.grid = (np.sin(np.pi * x / (n[0] + 1))
+                 * np.sin(np.pi * 2 * y / (n[1] + 1))
+                 * np.cos(np.pi * 3 * z / n[2]))
+    G2 = ((np.pi / ((n[0] + 1) * h[0])) ** 2
+          + (np.pi * 2 / ((n[1] + 1) * h[1])) ** 2
+          + (np.pi * 3 / (n[2] * h[2])) ** 2)
+    V = grid.poisson(bc=[Grid.DIRICHLET, Grid.DIRICHLET, Grid.NEUMANN])
+    assert np.allclose(V.grid, grid.grid / G2)
+    # a source with non-zero average is allowed for Dirichlet boundary conditions
+    grid.grid = np.ones(grid.shape)
+    V = grid.poisson()
+    assert np.all(V.grid > 0.)
+
+
+def test_grid_poisson_fail():
+    grid = Grid([10, 10, 10], sc=SuperCell([[4., 0, 0], [2., 3.5, 0], [0, 0, 5.]]))
+    grid.grid = np.random.rand(*grid.shape)
+    # z is orthogonal to the others
+    grid.poisson(bc=[Grid.PERIODIC, Grid.PERIODIC, Grid.DIRICHLET])
+    with pytest.raises(ValueError):
+        grid.poisson(bc=[Grid.DIRICHLET, Grid.PERIODIC, Grid.PERIODIC])
+    with pytest.raises(ValueError):
+        grid.poisson(bc=Grid.OPEN)
+    with pytest.raises(ValueError):
+        grid.poisson(bc=[[Grid.PERIODIC, Grid.DIRICHLET]] * 3)
@@ -273,6 +273,35 @@ class Test_sphericalorbital:
         with pytest.raises(ValueError):
             o.toGrid(R=-1)
 
+    @pytest.mark.parametrize("kind", ['cubic', 'linear'])
+    def test_tabulate(self, kind):
+        r = np.linspace(0, 4, 300)
+        o = SphericalOrbital(1, (r, np.exp(-r)))
+        R = np.linspace(0, 5, 1000)
+        f = o.radial(R)
+        o.tabulate(dr=0.0005, kind=kind)
+        assert np.allclose(f, o.radial(R), atol=1e-6)
+        assert np.allclose(f, o.f(R), atol=1e-6)
+        # revert to original function
+        o.tabulate(None)
+        assert np.allclose(f, o.f(R))
+
+    def test_tabulate_shared(self):
+        r = np.linspace(0, 4, 300)
+        o = SphericalOrbital(1, (r, np.exp(-r)))
+        ao = o.toAtomicOrbital()
+        xyz = np.random.rand(100, 3)
+        psi = [a.psi(xyz) for a in ao]
+        ao[0].tabulate(dr=0.0005)
+        assert all(a.f is o.f for a in ao)
+        for a, p in zip(ao, psi):
+            assert np.allclose(a.psi(xyz), p, atol=1e-6)
+
+    def test_tabulate_fail(self):
+        o = SphericalOrbital(1, r_f(6))
+        with pytest.raises(ValueError):
+            o.tabulate(kind='unknown')
+
 
 @pytest.mark.orbital
 class Test_atomicorbital:
@@ -361,3 +390,19 @@ class Test_atomicorbital:
         assert o0 != l1
         assert o1 != l0
         assert o2 != l0
+
+
+@pytest.mark.orbital
+def test_rspherical_harm_lpmv():
+    from scipy.special import lpmv
+    from sisl.orbital import _rspherical_harm, _rspher_harm_fact
+    theta = np.linspace(-np.pi, np.pi, 50)
+    cos_phi = np.linspace(-1, 1, 50)
+    for l in range(5):
+        for m in range(-l, l + 1):
+            Y = _rspher_harm_fact[l][m] * lpmv(m, l, cos_phi)
+            if m < 0:
+                Y *= np.sin(m * theta)
+            elif m > 0:
+                Y *= np.cos(m * theta)
+            assert np.allclose(Y, _rspherical_harm(m, l, theta, cos_phi))
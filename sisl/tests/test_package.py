@@ -47,3 +47,34 @@ def test_import3():
     # The imports should only be visible in the io module
     with pytest.raises(ImportError):
         from sisl import xyzSile
+
+
+def test_import_lazy():
+    # sub-packages are imported on first access
+    import subprocess
+    import sys
+    code = ("import sys, sisl;"
+            "print(all(m not in sys.modules for m in "
+            "['sisl.physics', 'sisl.io', 'sisl.geom', 'sisl.mixing', 'xarray', 'tqdm']))")
+    out = subprocess.run([sys.executable, "-c", code], check=True,
+                         capture_output=True, text=True)
+    assert out.stdout.strip() == "True"
+
+
+def test_import_lazy_attributes():
+    assert sisl.Hamiltonian is sisl.physics.Hamiltonian
+    assert sisl.get_sile is sisl.io.get_sile
+    assert sisl.geom.graphene is not None
+    assert 'Hamiltonian' in dir(sisl)
+    assert 'Hamiltonian' in sisl.__all__
+    assert 'get_sile' in sisl.__all__
+    ns = {}
+    exec("from sisl import *", ns)
+    assert ns['Hamiltonian'] is sisl.Hamiltonian
+    assert ns['Geometry'] is sisl.Geometry
+    with pytest.raises(AttributeError):
+        sisl.this_does_not_exist
+    # only the public names of physics are exposed
+    assert 'kpm' not in sisl.__all__
+    with pytest.raises(AttributeError):
+        sisl.kpm
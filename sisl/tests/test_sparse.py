@@ -992,6 +992,44 @@ def test_op_csr(setup):
         assert s[0, 0] == i ** 2
 
 
+def test_op_sp_sp_union():
+    a = SparseCSR((10, 20), dim=2)
+    b = SparseCSR((10, 20), dim=1)
+    # unsorted columns in the rows
+    a[0, [5, 1, 3]] = [[1, 2]]
+    a[2, [7, 0]] = [[3, 4]]
+    b[0, [3, 8, 5]] = 2.
+    b[4, 2] = 3.
+    A = a.todense()
+    B = b.todense()
+    for op in (np.add, np.subtract, np.multiply, np.maximum):
+        s = op(a, b)
+        assert s.shape == (10, 20, 2)
+        assert np.allclose(s.todense(), op(A, B))
+        s = op(b, a)
+        assert np.allclose(s.todense(), op(B, A))
+    assert (a + b).nnz == 7
+
+
+def test_op_sp_sp_same():
+    a = SparseCSR((10, 20), dim=2)
+    for i in range(10):
+        a[i, [i + 3, i]] = i + 1
+    a.finalize()
+    b = a.copy()
+    s = a * b
+    assert s.spsame(a)
+    assert np.allclose(s.todense(), a.todense() ** 2)
+    # non-finalized with empty space
+    c = SparseCSR((10, 20), dim=2, nnzpr=4)
+    for i in range(10):
+        c[i, [i + 3, i]] = 1
+    assert c.ptr[-1] != c.nnz
+    s = a - c
+    assert s.spsame(a)
+    assert np.allclose(s.todense(), a.todense() - c.todense())
+
+
 def test_op3(setup):
     S = SparseCSR((10, 100), dtype=np.int32)
     # Create initial stuff
@@ -0,0 +1,120 @@
+import pytest
+
+import numpy as np
+
+from sisl import Geometry, Trajectory
+from sisl.geom import graphene
+
+
+pytestmark = [pytest.mark.geometry, pytest.mark.trajectory]
+
+
+@pytest.fixture
+def setup():
+    class t():
+        def __init__(self):
+            self.g = graphene(orthogonal=True)
+            rng = np.random.RandomState(1234)
+            self.geoms = []
+            for i in range(10):
+                g = self.g.copy()
+                g.xyz += rng.rand(*g.xyz.shape) * 0.1
+                g.cell[:, :] *= 1 + i * 0.01
+                self.geoms.append(g)
+            self.traj = Trajectory.fromgeometry(self.geoms)
+    return t()
+
+
+def test_trajectory_init(setup):
+    traj = setup.traj
+    assert len(traj) == 10
+    assert traj.nframes == 10
+    assert traj.na == setup.g.na
+    assert traj.xyz.shape == (10, setup.g.na, 3)
+    assert traj.cell.shape == (10, 3, 3)
+    assert np.allclose(traj.nsc, setup.g.nsc)
+    str(traj)
+    repr(traj)
+
+
+def test_trajectory_single_cell(setup):
+    g = setup.g
+    traj = Trajectory(np.stack([g.xyz] * 3), g.atoms, g.sc)
+    assert traj.cell.shape == (3, 3, 3)
+    assert np.allclose(traj.cell, g.cell)
+    assert np.allclose(traj.nsc, g.nsc)
+    with pytest.raises(ValueError):
+        Trajectory(np.stack([g.xyz] * 3), g.atoms, np.stack([g.cell] * 2))
+
+
+def test_trajectory_geometry(setup):
+    traj = setup.traj
+    for g, tg in zip(setup.geoms, traj):
+        assert g == tg
+        assert isinstance(tg, Geometry)
+    assert traj[3] == setup.geoms[3]
+    assert traj[-1] == setup.geoms[-1]
+
+    # views share the data
+    g = traj.geometry(2)
+    g.xyz[0, 0] = 100.
+    assert traj.xyz[2, 0, 0] == 100.
+    assert g.atoms is traj.atoms
+
+
+def test_trajectory_slice(setup):
+    traj = setup.traj[2:8:2]
+    assert isinstance(traj, Trajectory)
+    assert len(traj) == 3
+    assert traj[1] == setup.geoms[4]
+    traj = setup.traj.append(setup.traj[0])
+    assert len(traj) == 11
+    assert traj[-1] == setup.geoms[0]
+    traj = setup.traj.append(setup.geoms[3])
+    assert traj[-1] == setup.geoms[3]
+
+
+@pytest.mark.parametrize("what", ['xyz', 'mm(xyz)', 'mass', 'cell'])
+def test_trajectory_center(setup, what):
+    C = setup.traj.center(what=what)
+    assert C.shape == (10, 3)
+    for g, c in zip(setup.geoms, C):
+        assert np.allclose(g.center(what=what), c)
+    C = setup.traj.center([0, 2], what='xyz')
+    for g, c in zip(setup.geoms, C):
+        assert np.allclose(g.center([0, 2]), c)
+
+
+def test_trajectory_rij(setup):
+    r = setup.traj.rij(0, [1, 2])
+    assert r.shape == (10, 2)
+    for g, d in zip(setup.geoms, r):
+        assert np.allclose(g.rij(0, [1, 2]), d)
+    assert setup.traj.rij(0, 1).shape == (10,)
+
+
+def test_trajectory_rij_mic(setup):
+    traj = setup.traj
+    xyz = traj.xyz.copy()
+    # move atom 1 by a lattice vector
+    xyz[:, 1] += traj.cell[:, 0]
+    shifted = Trajectory(xyz, traj.atoms, traj.cell, traj.nsc)
+    assert not np.allclose(shifted.rij(0, 1), traj.rij(0, 1))
+    assert np.allclose(shifted.rij(0, 1, mic=True), traj.rij(0, 1, mic=True))
+    assert np.all(traj.rij(0, 1, mic=True) <= traj.rij(0, 1) + 1e-10)
+
+
+def test_trajectory_msd(setup):
+    msd = setup.traj.msd()
+    assert msd.shape == (10,)
+    assert msd[0] == 0.
+    g0 = setup.geoms[0]
+    for g, m in zip(setup.geoms, msd):
+        assert m == pytest.approx(((g.xyz - g0.xyz) ** 2).sum(1).mean())
+
+
+def test_trajectory_fromgeometry_fail(setup):
+    with pytest.raises(ValueError):
+        Trajectory.fromgeometry()
+    with pytest.raises(ValueError):
+        Trajectory.fromgeometry(setup.g, setup.g.tile(2, 0))
@@ -0,0 +1,289 @@
+from numbers import Integral
+
+import numpy as np
+
+from ._internal import set_module
+from . import _array as _a
+from .atom import Atoms
+from .supercell import SuperCell
+from .geometry import Geometry
+from ._namedindex import NamedIndex
+from .utils.mathematics import fnorm
+
+
+__all__ = ['Trajectory']
+
+
+@set_module("sisl")
+class Trajectory:
+    r""" Sequence of geometries (frames) sharing the same atoms
+
+    The coordinates of all frames are stored in a single ``(nframes, na, 3)`` array
+    and the lattice vectors in a ``(nframes, 3, 3)`` array. The atoms (and the number
+    of supercells) are shared between all frames. `Geometry` objects are only created
+    when requested, see `geometry`.
+
+    Parameters
+    ----------
+    xyz : array_like
+        atomic coordinates for all frames, ``xyz[f, i, :]`` is the coordinate of the
+        i'th atom in the f'th frame.
+    atoms : array_like or Atoms, optional
+        atomic species, shared between all frames
+    cell : array_like or SuperCell, optional
+        lattice vectors, either one for each frame ``(nframes, 3, 3)``, or one
+        ``(3, 3)`` for all frames. Defaults to the unit cell of the first frame
+        as estimated by `Geometry`.
+    nsc : array_like of int, optional
+        number of supercells along each lattice vector, defaults to the
+        ones of `cell` if it is a `SuperCell`, otherwise ``[1, 1, 1]``
+
+    Examples
+    --------
+    >>> traj = outSileSiesta('RUN.out').read_trajectory()
+    >>> traj.center().shape
+    (nframes, 3)
+    >>> traj[-1]
+    Geometry{...}
+
+    See Also
+    --------
+    Geometry : a single frame of the trajectory
+    """
+
+    def __init__(self, xyz, atoms=None, cell=None, nsc=None):
+        xyz = _a.asarrayd(xyz)
+        if xyz.ndim == 2:
+            xyz = xyz.reshape(1, -1, 3)
+        self.xyz = xyz.reshape(xyz.shape[0], -1, 3)
+        self._atoms = Atoms(atoms, na=self.na)
+
+        if cell is None:
+            cell = Geometry(self.xyz[0], self.atoms).sc
+        if isinstance(cell, SuperCell):
+            if nsc is None:
+                nsc = cell.nsc
+            cell = cell.cell
+        if nsc is None:
+            nsc = [1, 1, 1]
+        cell = _a.asarrayd(cell).reshape(-1, 3, 3)
+        if cell.shape[0] == 1:
+            cell = np.repeat(cell, len(self), axis=0)
+        if cell.shape[0] != len(self):
+            raise ValueError(f"{self.__class__.__name__} requires the cell to be defined "
+                             "for all frames (or a single cell for all frames).")
+        self.cell = cell
+        self.nsc = _a.arrayi(nsc).ravel()
+
+    @classmethod
+    def fromgeometry(cls, *geometries):
+        """ Create a trajectory from a list of geometries
+
+        The atoms and the number of supercells are taken from the first geometry.
+
+        Parameters
+        ----------
+        *geometries : Geometry or list of Geometry
+           the frames of the trajectory, all of them must have the same number of atoms
+        """
+        geoms = []
+        for g in geometries:
+            if isinstance(g, Geometry):
+                geoms.append(g)
+            else:
+                geoms.extend(g)
+        if len(geoms) == 0:
+            raise ValueError(f"{cls.__name__}.fromgeometry requires at least one geometry")
+        na = geoms[0].na
+        if any(g.na != na for g in geoms):
+            raise ValueError(f"{cls.__name__}.fromgeometry requires all geometries to have the same number of atoms")
+        xyz = np.stack([g.xyz for g in geoms])
+        cell = np.stack([g.cell for g in geoms])
+        return cls(xyz, geoms[0].atoms, cell, geoms[0].nsc)
+
+    @property
+    def atoms(self):
+        """ Atoms shared between all frames """
+        return self._atoms
+
+    @property
+    def na(self):
+        """ Number of atoms in each frame """
+        return self.xyz.shape[1]
+
+    @property
+    def nframes(self):
+        """ Number of frames in the trajectory """
+        return self.xyz.shape[0]
+
+    def __len__(self):
+        """ Number of frames in the trajectory """
+        return self.nframes
+
+    def __str__(self):
+        """ String of the trajectory """
+        s = self.__class__.__name__ + f'{{nframes: {self.nframes}, na: {self.na},\n '
+        s += str(self.atoms).replace('\n', '\n ')
+        return s + f',\n nsc: {self.nsc}\n}}'
+
+    def __repr__(self):
+        return f"<{self.__module__}.{self.__class__.__name__} nframes={self.nframes}, na={self.na}>"
+
+    def geometry(self, frame):
+        """ Geometry of a single frame
+
+        The returned geometry shares its coordinates and atoms with the trajectory,
+        i.e. in-place changes are reflected in the trajectory.
+
+        Parameters
+        ----------
+        frame : int
+           frame index
+        """
+        g = Geometry.__new__(Geometry)
+        g.xyz = self.xyz[frame]
+        g._atoms = self._atoms
+        g._names = NamedIndex()
+        g.set_supercell(SuperCell(self.cell[frame], nsc=self.nsc))
+        return g
+
+    def __getitem__(self, key):
+        """ Geometry of a frame, or a trajectory of the selected frames """
+        if isinstance(key, Integral):
+            return self.geometry(key)
+        return self.__class__(self.xyz[key], self.atoms, self.cell[key], self.nsc)
+
+    def __iter__(self):
+        """ Iterate geometries of all frames """
+        for i in range(len(self)):
+            yield self.geometry(i)
+
+    def copy(self):
+        """ A copy of the trajectory """
+        return self.__class__(self.xyz.copy(), self.atoms.copy(), self.cell.copy(), self.nsc)
+
+    def append(self, other):
+        """ Append the frames of `other` to this trajectory and return a new trajectory
+
+        Parameters
+        ----------
+        other : Trajectory or Geometry
+           frames to append, the atoms are assumed to be the same
+        """
+        if isinstance(other, Geometry):
+            other = self.__class__.fromgeometry(other)
+        return self.__class__(np.concatenate([self.xyz, other.xyz]), self.atoms,
+                              np.concatenate([self.cell, other.cell]), self.nsc)
+
+    def center(self, atoms=None, what='xyz'):
+        """ Center of the geometry for each frame
+
+        Parameters
+        ----------
+        atoms : array_like, optional
+            list of atomic indices to find center of
+        what : {'xyz', 'mm(xyz)', 'mass', 'cell'}
+            determine whether center should be of 'cell', mass-centered ('mass'),
+            center of minimum/maximum position of atoms or absolute center of the positions.
+
+        Returns
+        -------
+        numpy.ndarray
+            center for each frame, shape ``(nframes, 3)``
+
+        See Also
+        --------
+        Geometry.center : the equivalent method for a single geometry
+        """
+        if 'cell' == what:
+            return self.cell.sum(1) * 0.5
+        if atoms is None:
+            xyz = self.xyz
+            mass = self.atoms.mass
+        else:
+            atoms = _a.asarrayi(atoms).ravel()
+            xyz = self.xyz[:, atoms]
+            mass = self.atoms.mass[atoms]
+        if 'mass' == what:
+            return np.einsum('i,fij->fj', mass, xyz) / np.sum(mass)
+        if 'mm(xyz)' == what:
+            return (xyz.min(1) + xyz.max(1)) / 2
+        if not ('xyz' in what or 'position' in what):
+            raise ValueError(
+                'Unknown what, not one of [xyz,position,mass,cell]')
+        return xyz.mean(1)
+
+    def Rij(self, ia, ja, mic=False):
+        r""" Vectors between atoms `ia` and `ja` for all frames
+
+        Parameters
+        ----------
+        ia : int or array_like
+           atomic index of first atom (unit-cell indices)
+        ja : int or array_like
+           atomic indices (unit-cell indices)
+        mic : bool, optional
+           whether the minimum image convention is used, i.e. the vectors are
+           folded into the cell of each frame using fractional coordinates.
+
+        Returns
+        -------
+        numpy.ndarray
+            vectors with shape ``(nframes, ..., 3)``
+        """
+        xi = self.xyz[:, ia]
+        xj = self.xyz[:, ja]
+        if xi.ndim < xj.ndim:
+            xi = np.expand_dims(xi, 1)
+        R = xj - xi
+        if mic:
+            shape = R.shape
+            R = R.reshape(shape[0], -1, 3)
+            icell = np.linalg.inv(self.cell)
+            frac = np.einsum('fij,fjk->fik', R, icell)
+            frac -= np.rint(frac)
+            R = np.einsum('fij,fjk->fik', frac, self.cell).reshape(shape)
+        return R
+
+    def rij(self, ia, ja, mic=False):
+        r""" Distances between atoms `ia` and `ja` for all frames
+
+        Parameters
+        ----------
+        ia : int or array_like
+           atomic index of first atom (unit-cell indices)
+        ja : int or array_like
+           atomic indices (unit-cell indices)
+        mic : bool, optional
+           whether the minimum image convention is used
+
+        Returns
+        -------
+        numpy.ndarray
+            distances with shape ``(nframes, ...)``
+        """
+        return fnorm(self.Rij(ia, ja, mic))
+
+    def msd(self, atoms=None, frame=0):
+        r""" Mean square displacement of atoms relative to a reference frame
+
+        .. math::
+            \mathrm{MSD}_f = \frac1N\sum_i |\mathbf r_{f,i} - \mathbf r_{\mathrm{frame},i}|^2
+
+        Parameters
+        ----------
+        atoms : array_like, optional
+           atoms to calculate the displacement of, defaults to all atoms
+        frame : int, optional
+           reference frame
+
+        Returns
+        -------
+        numpy.ndarray
+            mean square displacement for each frame
+        """
+        if atoms is None:
+            xyz = self.xyz
+        else:
+            xyz = self.xyz[:, _a.asarrayi(atoms).ravel()]
+        return ((xyz - xyz[frame]) ** 2).sum(2).mean(1)